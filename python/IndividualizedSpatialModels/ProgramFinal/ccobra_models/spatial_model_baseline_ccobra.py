@@ -3,12 +3,12 @@ Module for the original spatial model to be used in the CCOBRA Framework.
 
 @author: Christian Breu <breuch@web.de>
 '''
-from copy import deepcopy
-
 import ccobra
 
 from spatial_reasoner import main_module_param
 
+from spatial_reasoner import compiled_problem
+
 class SpatialModelParam(ccobra.CCobraModel):
     """
     Model for the standard spatial model. To be compared with the individualizations
@@ -17,6 +17,8 @@ class SpatialModelParam(ccobra.CCobraModel):
     """
     parameter_assignment = [[False, False, False, False, False, False],
                             [False, False, False, False, False]]
+    # random number generator for the guessing, set for each participant
+    rng = None
 
     def __init__(self, name='baseline spatial model'):
         """ Initializes the Model by calling the parent-class constructor
@@ -43,6 +45,8 @@ class SpatialModelParam(ccobra.CCobraModel):
         **Attention**: Should reset the internal state of the model.
 
         """
+        # random numbers for the guessing of this participant(see participant_rng)
+        self.rng = main_module_param.participant_rng(kwargs.get("id"))
         # reset the parameters for the next participant
         self.parameter_assignment = [[False, False, False, False, False, False],
                                      [False, False, False, False, False]]
@@ -69,40 +73,9 @@ class SpatialModelParam(ccobra.CCobraModel):
         """
         parameters = self.parameter_assignment
         # initialize the spatial model
-        spatial_model = main_module_param.MainModule()
-        rel_prob = deepcopy(item.task) # get the problem premises
-        # convert the premises to the form [A, relation, B] to be used by the spatial model
-        for rel_prem in rel_prob:
-            relation = rel_prem[0]
-            rel_prem[0] = rel_prem[1]
-            rel_prem[1] = relation
-        # checks for the response type to choose an appropriate function from the
-        # spatial model and a correct conversion of the question premise format.
-        if item.response_type == "single-choice":
-            # for single choice problems, the format of the question premises
-            # is different.
-            rel_questions = deepcopy(item.choices)
-            for rel_pre in rel_questions:
-                rel_pr = rel_pre[0] # unwrap the list of the actual premise
-                relation = rel_pr[0]
-                rel_pr[0] = rel_pr[1]
-                rel_pr[1] = relation
-                rel_pre = rel_pr
-                rel_prob.append(rel_pr)
-            # calls an apropriate function from the spatial model that will return
-            # the given answer with the correct format for the evaluation in the framework.
-            answer = spatial_model.interpret_spatial2exp_parameters(rel_prob, deepcopy(parameters))
-            # store the answer given by the model for later use in the adapt function.
-            return answer
-        # for all verification problems the standard function will be called from the
-        # spatial model. The format of the question premises is different, that's
-        # why the conversion is different.
-        rel_questions = deepcopy(item.choices[0]) # get the question premise
-        for rel_pre in rel_questions:
-            relation = rel_pre[0]
-            rel_pre[0] = rel_pre[1]
-            rel_pre[1] = relation
-            rel_prob.append(rel_pre)
-        answer = spatial_model.interpret_spatial_parameters(rel_prob, deepcopy(parameters))
-        # store the answer given by the model for later use in the adapt function.
+        spatial_model = main_module_param.MainModule(self.rng)
+        # the problem is converted and parsed only once(see compiled_problem), the
+        # interpret function works for verification and single choice problems.
+        answer = spatial_model.interpret_compiled(compiled_problem.compile_item(item),
+                                                  parameters)
         return answer
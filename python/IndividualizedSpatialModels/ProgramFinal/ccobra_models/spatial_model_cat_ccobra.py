@@ -44,6 +44,8 @@ class SpatialModelParam(ccobra.CCobraModel):
     cat_params = [[False, False, False], [False, False], [False, False, False, False]]
     # Variable for the parameter assignment for the spatial model
     parameter_assignment = [[False, False, False, False, False, False], [False, False]]
+    # random number generator for the guessing, set for each participant
+    rng = None
 
     def __init__(self, name='SpatialModelCat'):
         """ Initializes the Model by calling the parent-class constructor
@@ -70,6 +72,8 @@ class SpatialModelParam(ccobra.CCobraModel):
         **Attention**: Should reset the internal state of the model.
 
         """
+        # random numbers for the guessing of this participant(see participant_rng)
+        self.rng = main_module_param.participant_rng(kwargs.get("id"))
         #reset the collect problems/answers from the adapt function
         self.problem_type1 = []
         self.problem_type2 = []
@@ -109,7 +113,7 @@ class SpatialModelParam(ccobra.CCobraModel):
         # variable to make the model answer wrong/invert the answer
         invert_ans = False
         # initialize the spatial model
-        spatial_model = main_module_param.MainModule()
+        spatial_model = main_module_param.MainModule(self.rng)
         rel_prob = self.convert_premises(deepcopy(item.task)) # get the problem premises
         #print("item task: ", rel_prob)
         # convert the premises to the form [A, relation, B] to be used by the spatial
@@ -5,12 +5,22 @@ Module for the Spatial Model with Parameters to be used in the CCOBRA Framework.
 '''
 from copy import deepcopy
 
+import random
+
+import unittest
+
+import numpy as np
+
 import ccobra
 
 from spatial_reasoner import low_level_functions_param as helper
 
 from spatial_reasoner import main_module_param
 
+from spatial_reasoner import parameter_sweep
+
+from spatial_reasoner import problem_generator
+
 class SpatialModelParam(ccobra.CCobraModel):
     """
     Model for the Spatial Model with parameters. The Model will call the main
@@ -18,6 +28,9 @@ class SpatialModelParam(ccobra.CCobraModel):
     up to 8 parameters, an other version of the interpret function of the spatial
     model is used.
     Only uses the adapt function. The pretrain function is not used.
+    In the incremental mode, the model keeps a running count of the correct
+    predictions of every parameter assignment instead of evaluating the candidate
+    assignments with all previous problems in every adaption.
     """
     # list to store all Problems and answers from the vp, contains tuples (problem, answer)
     previous_problems_ans = []
@@ -25,8 +38,21 @@ class SpatialModelParam(ccobra.CCobraModel):
     previous_model_ans = []
     # Variable for the parameter assignment for the spatial model
     parameter_assignment = [[False, False, False, False, False, False], [False, False]]
+    # rows of the correctness matrix for the previous problems(see correctness_matrix)
+    correct_rows = []
+    # number of correct predictions of each parameter assignment(incremental mode),
+    # an array of each model(see __init__)
+    hit_counts = None
+    # assignments that give the participant answer for a problem, that the model
+    # answered differently(incremental mode), an array of each model(see __init__)
+    candidates = None
+    # whether the last problem, that the model answered differently, has candidates
+    # (incremental mode)
+    last_candidates = False
+    # random number generator for the guessing, set for each participant
+    rng = None
 
-    def __init__(self, name='SpatialModelParam'):
+    def __init__(self, name='SpatialModelParam', incremental=False):
         """ Initializes the Model by calling the parent-class constructor
         and passing information about the name as well as supported domains
         and response-types.
@@ -39,9 +65,17 @@ class SpatialModelParam(ccobra.CCobraModel):
             Name of the model. Will be used as an identifier throughout the
             evaluation phase. Should be unique.
 
+        incremental : bool
+            If True, adapt updates running counts of the correct predictions
+            of all parameter assignments, so each adaption has constant cost.
+
         """
         super(SpatialModelParam, self).__init__(
             name, ["spatial-relational"], ["verify", "single-choice"])
+        self.incremental = incremental
+        # the arrays are changed in place, so each model needs its own
+        self.hit_counts = np.zeros(64, dtype=int)
+        self.candidates = np.zeros(64, dtype=bool)
 
     def start_participant(self, **kwargs):
         """ Model initialization method. Used to setup the initial state of its
@@ -50,9 +84,15 @@ class SpatialModelParam(ccobra.CCobraModel):
         **Attention**: Should reset the internal state of the model.
 
         """
+        # random numbers for the guessing of this participant(see participant_rng)
+        self.rng = main_module_param.participant_rng(kwargs.get("id"))
         #reset the collect problems/answers from the adapt function
         self.previous_problems_ans = []
         self.previous_model_ans = []
+        self.correct_rows = []
+        self.hit_counts = np.zeros(64, dtype=int)
+        self.candidates = np.zeros(64, dtype=bool)
+        self.last_candidates = False
         # reset the parameters for the next participant
         self.parameter_assignment = [[False, False, False, False, False, False], [False, False]]
 
@@ -75,15 +115,46 @@ class SpatialModelParam(ccobra.CCobraModel):
 
         """
         # initialize the spatial model
-        spatial_model = main_module_param.MainModule()
+        spatial_model = main_module_param.MainModule(self.rng)
+        rel_prob = self.convert_item(item)
+        # checks for the response type to choose an appropriate function from the
+        # spatial model.
+        if item.response_type == "single-choice":
+            # calls an apropriate function from the spatial model that will return
+            # the given answer with the correct format for the evaluation in the framework.
+            answer = spatial_model.interpret_spatial2exp_parameters(
+                rel_prob, deepcopy(self.parameter_assignment))
+            self.previous_model_ans.append(answer)
+            return answer
+        # for all verification problems the standard function will be called from the
+        # spatial model.
+        answer = spatial_model.interpret_spatial_parameters_old(
+            rel_prob, deepcopy(self.parameter_assignment))
+        self.previous_model_ans.append(answer)
+        return answer
+
+    @staticmethod
+    def convert_item(item):
+        """
+        Converts the premises and the question premises of the given item to the
+        format of the spatial model([A, relation, B]). The question premises are
+        appended to the premises of the problem.
+        Parameters
+        ----------
+        item : ccobra.data.Item
+            Task item container.
+
+        Returns
+        -------
+        list
+            list of all premises of the problem.
+        """
         rel_prob = deepcopy(item.task) # get the problem premises
         # convert the premises to the form [A, relation, B] to be used by the spatial model
         for rel_prem in rel_prob:
             relation = rel_prem[0]
             rel_prem[0] = rel_prem[1]
             rel_prem[1] = relation
-        # checks for the response type to choose an appropriate function from the
-        # spatial model and a correct conversion of the question premise format.
         if item.response_type == "single-choice":
             # for single choice problems, the format of the question premises
             # is different than for the other problem_types.
@@ -93,28 +164,17 @@ class SpatialModelParam(ccobra.CCobraModel):
                 relation = rel_pr[0]
                 rel_pr[0] = rel_pr[1]
                 rel_pr[1] = relation
-                rel_pre = rel_pr
                 rel_prob.append(rel_pr)
-            # calls an apropriate function from the spatial model that will return
-            # the given answer with the correct format for the evaluation in the framework.
-            answer = spatial_model.interpret_spatial2exp_parameters(
-                rel_prob, deepcopy(self.parameter_assignment))
-            self.previous_model_ans.append(answer)
-            return answer
-        # for all verification problems the standard function will be called from the
-        # spatial model. The format of the question premises is different, tha's
-        # why the conversion is different aswell.
+            return rel_prob
+        # the format of the question premises is different for verification problems,
+        # that's why the conversion is different aswell.
         rel_questions = deepcopy(item.choices[0]) # get the question premise
-        #print("item choices: ", item.choices)
         for rel_pre in rel_questions:
             relation = rel_pre[0]
             rel_pre[0] = rel_pre[1]
             rel_pre[1] = relation
             rel_prob.append(rel_pre)
-        answer = spatial_model.interpret_spatial_parameters_old(
-            rel_prob, deepcopy(self.parameter_assignment))
-        self.previous_model_ans.append(answer)
-        return answer
+        return rel_prob
 
     def adapt(self, item, target, **kwargs):
         """
@@ -147,6 +207,9 @@ class SpatialModelParam(ccobra.CCobraModel):
         """
         # store the problem and the response from the participant
         self.previous_problems_ans.append((item, target))
+        if self.incremental:
+            self.adapt_incremental(item, target)
+            return
         # check if there are enough collected data to find parameter assignments
         # maybe implement counter to reassign the parameters every n problems.
         if len(self.previous_problems_ans) >= 20 and (
@@ -160,23 +223,27 @@ class SpatialModelParam(ccobra.CCobraModel):
             params = None
             current_top_param = []
             current_top_prec = 0
+            # boolean matrix(problems x assignments), that shows for which assignments
+            # the answer of the model is the same as the participant answer.
+            correct = self.correctness_matrix(self.previous_problems_ans)
             # check for each answer from the model
             for i, prev_ans in enumerate(self.previous_model_ans):
                 if prev_ans != self.previous_problems_ans[i][1]:
-                    params = self.find_params(deepcopy(
-                        self.previous_problems_ans[i][0]),
-                                              deepcopy(self.previous_problems_ans[i][1]))
+                    # the assignments that result in the participant answer are already
+                    # contained in the row of the problem(see find_params).
+                    params = [parameter_sweep.assignment(j, [False, False])
+                              for j in np.flatnonzero(correct[i])]
                     top_params = self.compute_compare_answers(
-                        params, deepcopy(self.previous_problems_ans))
+                        params, self.previous_problems_ans, correct)
                     if top_params[1] > current_top_prec:
                         current_top_param = top_params[0][0] # store the current best parameters
                         current_top_prec = top_params[1] # store the current best precision.
             if not params: #if no pronlem was found where the answer was different
-                params = self.find_params(
-                    deepcopy(item), deepcopy(target))
+                params = [parameter_sweep.assignment(j, [False, False])
+                          for j in np.flatnonzero(correct[-1])]
                 top_params = self.compute_compare_answers(
-                    params, deepcopy(self.previous_problems_ans))
-                if not top_params[0]:
+                    params, self.previous_problems_ans, correct)
+                if top_params[0]:
                     current_top_param = top_params[0][0]
                     current_top_prec = top_params[1]
             if current_top_prec > 0.8: # check if the best parameter assignment is above a threshold
@@ -186,13 +253,60 @@ class SpatialModelParam(ccobra.CCobraModel):
                 self.parameter_assignment = [
                     [False, False, False, False, False, False], [False, False]]
 
+    def adapt_incremental(self, item, target):
+        """
+        Incremental version of adapt. The correct predictions of all parameter
+        assignments for the new problem are added to running counts. If the
+        model answer was different to the participant answer, the assignments that
+        result in the participant answer become candidates.
+        The parameters are searched at the same points as in adapt: the candidate
+        with the most correct predictions is used, if its precision is above the
+        threshold. Like in adapt, the assignments that result in the answer for the
+        current problem are the candidates, if the model didn't give a wrong answer so
+        far or if no assignment results in the participant answer for the last wrong
+        answer. The chosen assignment has the same precision as the one of adapt, but
+        of several best candidates the one with the lowest index is used, while adapt
+        uses the first best candidate of the first wrong answer.
+
+        Parameters
+        ----------
+        item : ccobra.data.Item
+            Task information container.
+
+        target : str
+            True response given by the human reasoner.
+
+        """
+        correct = self.correct_answers(item, target)
+        self.hit_counts += correct
+        index = len(self.previous_problems_ans) - 1 # index of the problem
+        if index < len(self.previous_model_ans) and self.previous_model_ans[index] != target:
+            self.candidates |= correct
+            self.last_candidates = bool(correct.any())
+        if len(self.previous_problems_ans) >= 20 and (
+                len(self.previous_problems_ans) % 10) == 0:
+            candidates = self.candidates
+            # no problem was found where the answer was different(or the last one has no
+            # candidates), use the assignments for the current problem like adapt
+            if not self.last_candidates and correct.any():
+                candidates = correct
+            # only consider the candidates, the others get a count below 0
+            counts = np.where(candidates, self.hit_counts, -1)
+            best = int(np.argmax(counts))
+            precision = float(counts[best]) / len(self.previous_problems_ans)
+            if precision > 0.8: # check if the best parameter assignment is above a threshold
+                self.parameter_assignment = parameter_sweep.assignment(best, [False, False])
+            else: # use no parameters
+                self.parameter_assignment = [
+                    [False, False, False, False, False, False], [False, False]]
+
     @staticmethod
     def find_params(problem, answer):
         """
         This function finds all possible parameters to get the given result with
-        a given problem. The function will iterate over all possible parameter assignments
-        and will store all assignments that result in the specified answer. This list will
-        be returned. The answer needs to be a boolean value.
+        a given problem. The function will compute the answers for all possible parameter
+        assignments in one sweep and will store all assignments that result in the specified
+        answer. This list will be returned. The answer needs to be a boolean value.
         Parameters
         ----------
         problem : list
@@ -201,69 +315,158 @@ class SpatialModelParam(ccobra.CCobraModel):
         answer : bool
             True response given by the human reasoner.
         """
-        spatial_model = SpatialModelParam() # initiate the spatial model
-        matching_params = []
-        i = 0
-        # iterates over all possible variable assignments
-        while i < 64:
-            prob = deepcopy(problem) # problem = item
-            b_num = format(i, '06b')
-            params = [[bool(int(b_num[0])), bool(int(b_num[1])), bool(int(b_num[2])),
-                       bool(int(b_num[3])), bool(int(b_num[4])), bool(int(b_num[5]))],
-                      [False, False]]
-            # check if the result with these parameters is the same as answer
-            para = deepcopy(params)
-            spatial_model.parameter_assignment = para # set the parameter assignment to use predict
-            prediction = spatial_model.predict(prob)
-            if prediction == answer:
-                matching_params.append(params)
-            elif prob.response_type == "single-choice":
-                if helper.list_equal(prediction, answer):
-                    matching_params.append(params)
-            i += 1
+        # the answers for all 64 assignments are computed in one sweep over the parameters
+        correct = SpatialModelParam.correct_answers(problem, answer)
+        matching_params = [parameter_sweep.assignment(i, [False, False])
+                           for i in np.flatnonzero(correct)]
         return matching_params # returns all lists of parameter values that did match
 
+    def correctness_matrix(self, problems):
+        """
+        Returns a boolean matrix with a row for each of the given problems and a
+        column for each of the 64 parameter assignments. An entry is True, if the
+        assignment results in the answer of the participant for the problem.
+        The rows are kept for the problems of the participant(previous_problems_ans),
+        so each problem is only processed once.
+        Parameters
+        ----------
+        problems : list
+            list of tuples with the item and the answer of the participant.
+        """
+        while len(self.correct_rows) < len(problems):
+            problem = problems[len(self.correct_rows)]
+            self.correct_rows.append(self.correct_answers(problem[0], problem[1]))
+        return np.array(self.correct_rows[:len(problems)], dtype=bool)
+
+    @staticmethod
+    def correct_answers(problem, answer):
+        """
+        Returns a boolean array that contains for each of the 64 parameter assignments
+        whether the assignment results in the given answer for the problem. The index
+        of an assignment is the binary number of its parameters(see find_params).
+        Parameters
+        ----------
+        problem : ccobra.data.Item
+            the item of the problem.
+
+        answer : bool/list
+            True response given by the human reasoner.
+        """
+        spatial_model = main_module_param.MainModule() # initiate the spatial model
+        single_choice = problem.response_type == "single-choice"
+        answers = parameter_sweep.answer_table(
+            spatial_model, SpatialModelParam.convert_item(problem), single_choice,
+            [False, False])
+        correct = np.zeros(len(answers), dtype=bool)
+        for i, prediction in enumerate(answers):
+            correct[i] = prediction == answer or (
+                single_choice and helper.list_equal(prediction, answer))
+        return correct
+
     @staticmethod
-    def compute_compare_answers(params, problems):
+    def compute_compare_answers(params, problems, correct=None):
         """
-        Computes all answers for each of the given parameters with the given problems.
-        After the answers for one parameter list is computed, the results will be directly
-        evaluated with respect to the precision of the participant prediction.
-        The currently best parameter assignment will be stored. After all parameter
-        assignments are processed, the best one will  be returned.
+        Computes the accuracy of each of the given parameters with the given problems.
+        The answers of all parameter assignments for the problems are taken from a
+        boolean matrix(problems x assignments, see correctness_matrix), so the accuracy
+        of all assignments is computed with one comparison. The best parameter
+        assignment will be returned.
         Parameters
         ----------
         params : list
              contains parameter assigment lists(of bools)
 
         problems : list
-            list of problems(list containing the premises)
+            list of problems(tuples of the item and the answer of the participant)
+
+        correct : numpy.ndarray
+            the correctness matrix of the problems. Will be computed if it isn't given.
         Returns
         ---------
         bestparam: tuple
-            tuple containing the best parameter and the accuracy of it. (e.g.
-            (parameter assignment, accuracy))
+            tuple containing the best parameters and the accuracy of them. (e.g.
+            ([parameter assignment, ...], accuracy))
+        """
+        if not params:
+            return ([], 0)
+        if correct is None:
+            correct = np.array([SpatialModelParam.correct_answers(problem[0], problem[1])
+                                for problem in problems], dtype=bool)
+        # the columns of the given parameter assignments
+        columns = [parameter_sweep.assignment_index(param, False) for param in params]
+        # accuracy of all parameter assignments at once
+        accuracy = correct[:, columns].mean(axis=0)
+        best = int(np.argmax(accuracy))
+        # return all assignments with the best accuracy, in the order of params
+        best_params = [params[i] for i in np.flatnonzero(accuracy == accuracy[best])]
+        return (best_params, float(accuracy[best]))
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the adaption of the parameter model.
+    """
+    @staticmethod
+    def session(responses):
+        """Runs a session with the batch and the incremental model. Returns the
+        precision of the assignments, that both models use after 20 and 30 problems,
+        and the assignments.
+        """
+        items = [problem_generator.generate_problem(
+            4, 4, kind, problem_generator.ONE_D, random.Random(i)).ccobra_item(i, i)
+                 for i, kind in enumerate(problem_generator.KINDS * 10)]
+        models = [SpatialModelParam("batch"), SpatialModelParam("incremental", True)]
+        results = []
+        for model in models:
+            model.start_participant(id=1)
+        for i, item in enumerate(items):
+            target = responses(i, item)
+            for model in models:
+                model.predict(item)
+                model.adapt(item, target)
+            if i + 1 in (20, 30):
+                results.append([(SpatialModelParam.compute_compare_answers(
+                    [model.parameter_assignment], models[0].previous_problems_ans,
+                    models[0].correctness_matrix(models[0].previous_problems_ans))[1],
+                                 model.parameter_assignment) for model in models])
+        return results
+
+    def test_incremental(self):
+        """Tests that the incremental and the batch mode use assignments with the same
+        precision and the fallback to the standard assignment.
+        """
+        spatial_model = main_module_param.MainModule()
+        def answer(item, index):
+            """answer of the assignment with the index"""
+            return parameter_sweep.answer_table(
+                spatial_model, SpatialModelParam.convert_item(item), False,
+                [False, False])[index]
+        # a participant with the answers of an assignment, except two answers
+        for batch, incremental in self.session(
+                lambda i, item: answer(item, 17) != (i in (3, 25))):
+            self.assertEqual(batch[0], incremental[0])
+            self.assertGreater(incremental[0], 0.8)
+            self.assertNotEqual(incremental[1], [[False] * 6, [False] * 2])
+        # the model never answers differently than the participant
+        for batch, incremental in self.session(lambda i, item: answer(item, 0)):
+            self.assertEqual(batch[0], incremental[0])
+            self.assertEqual(incremental[0], 1.0)
+        # no assignment is precise enough: no parameters are used
+        rng = random.Random(3)
+        for batch, incremental in self.session(lambda i, item: rng.random() < 0.5):
+            self.assertEqual(batch[1], [[False] * 6, [False] * 2])
+            self.assertEqual(incremental[1], [[False] * 6, [False] * 2])
+
+    def test_own_arrays(self):
+        """Tests that the running counts of a model don't change the other models.
         """
-        #answers_list = [] # list for the lists of results
-        spatial_model = SpatialModelParam() # initiate the spatial model
-        best_param = [[], 0] # the tuple contains the parameter(s) with the best accuracy
-        for param in params:
-            correct_answers = 0 # results for each parameter and all problems
-            # now directly check if the answer is the same as the given answer from the data?
-            probs = deepcopy(problems)
-            for problem in probs: # problem is now just a tuple with the item and the answer
-                spatial_model.parameter_assignment = deepcopy(param)
-                answer = spatial_model.predict(problem[0]) # problem = (item, vp_answer)
-                if answer == problem[1]:
-                    correct_answers += 1
-            # determine how accurate the parameters were
-            acc_val = float(correct_answers) / len(problems)
-            if acc_val >= best_param[1]: # check if the current parameter is better
-                best_param[1] = acc_val # new accuracy threshold
-                best_param[0].append(param)
-        # reset the parameters
-        spatial_model.parameter_assignment = [
-            [False, False, False, False, False, False], [False, False]]
-        # returns tuple with the accuracy aswell
-        # return the best parameter assignment(or one of the best)
-        return (best_param[0], best_param[1])
+        item = problem_generator.generate_problem(
+            4, 4, problem_generator.CONSISTENT, problem_generator.ONE_D,
+            random.Random(1)).ccobra_item()
+        model = SpatialModelParam("incremental", True)
+        other = SpatialModelParam("other", True)
+        model.predict(item)
+        model.adapt(item, True)
+        self.assertTrue(model.hit_counts.any())
+        self.assertFalse(other.hit_counts.any())
+        self.assertIsNot(model.candidates, other.candidates)
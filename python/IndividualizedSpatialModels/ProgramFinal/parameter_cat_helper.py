@@ -8,14 +8,35 @@ In the old version, the model was not build by the actual model for
 convenience. Since the parameters need to be tested, the new, current version
 uses the modified spatial model.
 
+The answers of the spatial model to the fixed problem sets(PROBLEMS_TYPE12 and
+PROBLEMS_TYPE3) for all 256 parameter assignments are computed once and stored as
+.npy files(see build_answer_tables). The parameter approach only reads these answer
+tables. They are memory-mapped, so several processes share the same pages.
+The files are named after the problems and a checksum of the sources of the spatial
+reasoner, so a changed model gets new tables, which are computed when they are first
+used. They can also be built beforehand:
+python parameter_cat_helper.py --build-tables
+
 Created on 19.10.2018
 
 @author: Christian Breu <breuch@web.de>
 '''
-from copy import deepcopy
+import argparse
+
+import hashlib
+
+import os
+
+import tempfile
+
+import unittest
+
+import numpy as np
 
 from spatial_reasoner import main_module_param as model
 
+from spatial_reasoner import parameter_sweep
+
 # answers for only type3 questions, to compare them to the results of the program
 PARTICIPANT_ANSWERS_TYPE3 = [
     [True, True, True, True, True, True, False, False, True, False, False, False, False], #KGSKUR
@@ -243,6 +264,16 @@ CAT_TYPE13 = [[2, 6, 10, 14], [1, 5, 9, 13], [0, 4, 8, 12], [3, 7, 11, 15]]
 
 ########## task categories ###########
 
+# the correctly answered problems of type 1+2 and 3 of all participants(a row for each
+# participant), see evaluate_all_cats
+CORRECT_ANSWERS12 = np.asarray(PARTICIPANT_ANSWERS_TYPE12) == np.asarray(GROUND_TRUTH12)
+CORRECT_ANSWERS3 = np.asarray(PARTICIPANT_ANSWERS_TYPE3[:len(PARTICIPANT_ANSWERS_TYPE12)]) == \
+    np.asarray(GROUND_TRUTH3)
+
+# the differences of the encoded problems of type 1+2(False) and 3(True), see
+# problem_differences
+_PROBLEM_DIFFERENCES = {}
+
 def evaluate_cats(participant12, participant3, cat1, cat2, cat3):
     """Evaltuates the answers of the given participant with the ground truth.
     For each of the given Categories, iterates over each list and checks the
@@ -257,59 +288,62 @@ def evaluate_cats(participant12, participant3, cat1, cat2, cat3):
     there are the correct and incorrect lists.
     The function returns a tuple (precision values per category, correct/wrong answers per cat)
     """
-    result_prob_ans = [] # list for all correct and wrong problems for each vp, like result_all_cat
-    result_all_cat = [] #the complete results of 12 values for all 12 categories
-    # category for type 1 problems
-    result_cat = [] # list for results of one category
-    result_ans_cat = [] #correct + incorrect problem ids for a category
-    for cat in cat1:
-        sub_cat_correct = 0# counter for correct answers
-        cor_inc = [[], []]# list for all correct/incorrect ans
-        for i in cat: #all indices in the current subcategory
-            #print("answer: ", )
-            if participant12[i] == GROUND_TRUTH12[i]:
-                sub_cat_correct += 1
-                cor_inc[0].append(i) #add the id to the correct answers list
-            else: cor_inc[1].append(i) #add it to incorrect answers list
-        sub_cat_correct /= len(cat)
-        result_cat.append(round(sub_cat_correct, 2))
-        result_ans_cat.append(cor_inc) #add all correct/incorrect probs to cat_list
-    result_all_cat.append(result_cat)
-    result_prob_ans.append(result_ans_cat)
-    # category for type 2 problems
-    # Reset the lists!
-    result_cat = []
-    result_ans_cat = [] #correct + incorrect problem ids for a category
-    for cat in cat2:
-        sub_cat_correct = 0
-        cor_inc = [[], []]# list for all correct/incorrect ans
-        for i in cat: #all indices in the current subcategory
-            if participant12[i] == GROUND_TRUTH12[i]:
-                sub_cat_correct += 1
-                cor_inc[0].append(i) #add the id to the correct answers list
-            else: cor_inc[1].append(i) #add it to incorrect answers list
-        sub_cat_correct /= len(cat)
-        result_cat.append(round(sub_cat_correct, 2))
-        result_ans_cat.append(cor_inc) #add all correct/incorrect probs to cat_list
-    result_all_cat.append(result_cat)
-    result_prob_ans.append(result_ans_cat)
-    # Category 3; Reset lists
-    result_cat = []
-    result_ans_cat = [] #correct + incorrect problem ids for a category
-    for cat in cat3:
-        sub_cat_correct = 0
-        cor_inc = [[], []]# list for all correct/incorrect ans
-        for i in cat: #all indices in the current subcategory
-            if participant3[i] == GROUND_TRUTH3[i]:
-                sub_cat_correct += 1
-                cor_inc[0].append(i) #add the id to the correct answers list
-            else: cor_inc[1].append(i) #add it to incorrect answers list
-        sub_cat_correct /= len(cat)
-        result_cat.append(round(sub_cat_correct, 2))
-        result_ans_cat.append(cor_inc) #add all correct/incorrect probs to cat_list
-    result_all_cat.append(result_cat)
-    result_prob_ans.append(result_ans_cat)
-    return (result_all_cat, result_prob_ans)
+    correct12 = np.asarray([participant12]) == np.asarray(GROUND_TRUTH12)
+    correct3 = np.asarray([participant3]) == np.asarray(GROUND_TRUTH3)
+    all_res, all_corr = evaluate_correct_answers(correct12, correct3, cat1, cat2, cat3)
+    return (all_res[0], all_corr[0])
+
+def evaluate_correct_answers(correct12, correct3, cat1, cat2, cat3):
+    """Evaluates the answers of all participants at once. correct12 and correct3 contain
+    the correctly answered problems of type 1+2 and 3(a row for each participant). The
+    precision values of each list of categories are computed for all participants in one
+    step(see category_answers), only the distinct values are rounded.
+    Returns a tuple (precision values of all participants, correct/wrong answers of all
+    participants), the entries for each participant are like the result of evaluate_cats.
+    """
+    all_res = [[] for _ in range(len(correct12))] # precision values for each vp
+    all_corr = [[] for _ in range(len(correct12))] # correct/incorrect problems for each vp
+    for correct, cats in ((correct12, cat1), (correct12, cat2), (correct3, cat3)):
+        precision, answered = category_answers(correct, cats)
+        values, positions = np.unique(precision, return_inverse=True)
+        precision = np.array([round(value, 2) for value in values.tolist()])[positions]
+        # correct + incorrect problem ids for each participant and category
+        cor_inc = list(map(list, zip(category_ids(answered, cats),
+                                     category_ids(~answered, cats))))
+        for i, (vp_res, vp_corr, vp_prec) in enumerate(zip(all_res, all_corr,
+                                                           precision.tolist())):
+            vp_res.append(vp_prec)
+            vp_corr.append(cor_inc[i * len(cats):(i + 1) * len(cats)])
+    return (all_res, all_corr)
+
+def category_answers(correct, cats):
+    """Computes the precision values of a list of categories for all participants.
+    correct contains a row of correctly answered problems for each participant, the
+    categories are lists of problem indices. Returns the precision values(a row for each
+    participant, a column for each category) and the correct answers of the participants
+    to the problems of all categories, one category after the other.
+    """
+    sizes = np.array([len(cat) for cat in cats])
+    indices = np.concatenate([np.asarray(cat, dtype=np.intp) for cat in cats])
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    answered = correct[:, indices]
+    precision = np.add.reduceat(answered.astype(np.intp), starts, axis=1) / sizes
+    return precision, answered
+
+def category_ids(answered, cats):
+    """Returns the ids of the problems that are marked in answered(a row for each
+    participant, the problems of all categories one after the other, see
+    category_answers) as a list for each participant and category, participant after
+    participant. The marked problems are found at once for all participants, the flat
+    list of ids is split at the counts of the participants and categories.
+    """
+    indices = np.concatenate([np.asarray(cat, dtype=np.intp) for cat in cats])
+    cat_ids = np.repeat(np.arange(len(cats)), [len(cat) for cat in cats])
+    rows, cols = np.nonzero(answered)
+    counts = np.bincount(rows * len(cats) + cat_ids[cols], minlength=len(answered) * len(cats))
+    bounds = np.concatenate(([0], np.cumsum(counts))).tolist()
+    ids = indices[cols].tolist()
+    return [ids[start:end] for start, end in zip(bounds, bounds[1:])]
 
 def evaluate_all_cats(cat1, cat2, cat3):
     """Evaluates all participants in the 3 given categories. calls evaluate_cat
@@ -320,16 +354,9 @@ def evaluate_all_cats(cat1, cat2, cat3):
     the categories for all participant and with the list of all correct/wrong answers for problems
     when the precision is not 1.0 or 0.0.
     """
-    all_res = [] # list for the results of all vp
-    all_corr = [] # list for all the correct/incorrect problems wich are returned by evaluate cats
     print("Type1: 11A,11C,10A,10C |Type2: 2A1,2A0,2D1,2D0 |Type3: 3A1,3A0,3C1,3C0")
-    #iterate over all vps
-    for i, vp_ in enumerate(PARTICIPANT_ANSWERS_TYPE12):
-        vp_res = evaluate_cats(vp_, PARTICIPANT_ANSWERS_TYPE3[i], cat1, cat2, cat3)
-        all_res.append(vp_res[0])
-        all_corr.append(vp_res[1])
-        #print(vp_res[0])
-    return (all_res, all_corr)
+    # evaluate all vps at once
+    return evaluate_correct_answers(CORRECT_ANSWERS12, CORRECT_ANSWERS3, cat1, cat2, cat3)
 
 def check_all_categories(all_vp_precision, all_cor_inc):
     """Function that calls check_categories on all participants and prints the answer
@@ -371,10 +398,10 @@ def check_categories(vp_precision, cor_inc_probs):
                 #print("prec_val", prec_val)
                 corr_inc_ans = cor_inc_cat[k]
                 #print("correct/incorrect ids:", corr_inc_ans, "index of the category:", k, i)
-                # call compare problems to get all differences for a given category
-                corr_probs = fetch_problems(problem_type3, corr_inc_ans[0])
-                inc_probs = fetch_problems(problem_type3, corr_inc_ans[1])
-                diff = compare_problems(corr_probs, inc_probs)
+                # look up the differences of the correct and incorrect problems
+                differences = problem_differences(problem_type3)
+                diff = [i for cor in corr_inc_ans[0] for inc in corr_inc_ans[1]
+                        for i, differs in enumerate(differences[cor][inc]) if differs]
             cats_diff.append(diff)
         diff_list.append(cats_diff)
     return diff_list
@@ -398,22 +425,34 @@ def compare_problems(correct_probs, incorrect_probs):
     not the same, the index of the premise(0 = premises 1-3; 1 = question premise)
     will be added to the result list.
     """
-    differences_list = [] #list for all the indices where the encodings are different
-    enc_cor_probs = [] #list for encoded problems to be compared later.
-    enc_inc_probs = []
-    for prob in correct_probs:#encode correct problems
-        enc_cor_probs.append(encode_problem_rel(prob))
-    for prob in incorrect_probs:#encode incorrect problems
-        enc_inc_probs.append(encode_problem_rel(prob))
-    # now compare all correctly answered problems with all wrong answered problems
-    # iterate through all correct problems and compares them with all the incorrect ones
-    # if there is a difference, the index of the difference will be added to the differences_list.
-    for cor_prob in enc_cor_probs:
-        for inc_prob in enc_inc_probs:
-            for i, prem in enumerate(cor_prob): #iterate over the two problems to be checked
-                if prem != inc_prob[i]: #check if there is a difference in the premises
-                    differences_list.append(i)
-    return differences_list
+    enc_cor_probs = np.array([encode_problem_rel(prob) for prob in correct_probs])
+    enc_inc_probs = np.array([encode_problem_rel(prob) for prob in incorrect_probs])
+    return encoded_differences(enc_cor_probs, enc_inc_probs)
+
+def encoded_differences(enc_cor_probs, enc_inc_probs):
+    """Compares all encoded correct problems with all encoded incorrect problems(arrays
+    with a row for each problem). Returns the list of premise indices, where a correct
+    and an incorrect problem differ, for all pairs of problems in the order of the
+    correct problems and then the incorrect problems(see compare_problems).
+    """
+    if not len(enc_cor_probs) or not len(enc_inc_probs):
+        return []
+    different = enc_cor_probs[:, np.newaxis, :] != enc_inc_probs[np.newaxis, :, :]
+    return np.nonzero(different)[2].tolist()
+
+def problem_differences(problem_type3):
+    """Returns the differences of all pairs of encoded problems of the given type(see
+    encode_problem_rel). The differences are computed once for all pairs with an array
+    comparison, the entry [i][j] contains a bool for each premise, if the problems i and
+    j differ in this premise.
+    """
+    differences = _PROBLEM_DIFFERENCES.get(problem_type3)
+    if differences is None:
+        problems = PROBLEMS_TYPE3 if problem_type3 else PROBLEMS_TYPE12
+        encoded = np.array([encode_problem_rel(prob) for prob in problems])
+        differences = (encoded[:, np.newaxis, :] != encoded[np.newaxis, :, :]).tolist()
+        _PROBLEM_DIFFERENCES[problem_type3] = differences
+    return differences
 
 def encode_problem_rel(problem):
     """Function that takes a problem and returns a list with two relations. The first
@@ -673,6 +712,153 @@ def process_problem(problem_type3, problem, error_param):
         return process_problem_type3(problem, error_param)
     return process_problem_type1(problem, error_param)
 
+########### answer tables ####################################
+
+# directory of the precomputed answer tables
+ANSWER_TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "answer_tables")
+# codes of the answers in the answer tables
+ANSWER_CODES = {True: 1, False: 0, None: -1}
+# loaded answer tables: file name -> array
+_ANSWER_TABLES = {}
+# checksum of the sources of the spatial reasoner, see reasoner_checksum
+_REASONER_CHECKSUM = {}
+
+
+def fixed_problem_sets():
+    """
+    Returns the problem sets with precomputed answer tables.
+    """
+    return [PROBLEMS_TYPE12, PROBLEMS_TYPE3]
+
+def answer_code(answer):
+    """
+    Returns the code of an answer in the answer tables(see ANSWER_CODES).
+    """
+    return ANSWER_CODES[answer]
+
+def decode_answers(codes):
+    """
+    Returns the answers for a list of answer codes.
+    """
+    answers = {code: answer for answer, code in ANSWER_CODES.items()}
+    return [answers[code] for code in codes]
+
+def compute_answer_table(problems):
+    """
+    Computes the answer table of the problems: an array with a row for each problem
+    and the codes of the answers for all 256 parameter assignments(see
+    parameter_sweep.answer_table) in the columns.
+    """
+    spatial_model = model.MainModule()
+    table = np.empty((len(problems), 256), dtype=np.int8)
+    for i, problem in enumerate(problems):
+        table[i] = [answer_code(answer)
+                    for answer in parameter_sweep.answer_table(spatial_model, problem)]
+    return table
+
+def reasoner_checksum():
+    """
+    Returns a checksum of the sources of all modules of the spatial reasoner, which
+    compute the answers of the answer tables. The checksum is computed once.
+    """
+    if "checksum" not in _REASONER_CHECKSUM:
+        sha = hashlib.sha1()
+        reasoner_dir = os.path.dirname(os.path.abspath(parameter_sweep.__file__))
+        for name in sorted(os.listdir(reasoner_dir)):
+            if name.endswith(".py"):
+                with open(os.path.join(reasoner_dir, name), "rb") as source:
+                    sha.update(name.encode("utf-8") + source.read())
+        _REASONER_CHECKSUM["checksum"] = sha.hexdigest()
+    return _REASONER_CHECKSUM["checksum"]
+
+def answer_table_path(problems, directory=None):
+    """
+    Returns the file of the answer table for the problems. The name contains a hash
+    of the problems and of the sources of the spatial reasoner(see reasoner_checksum),
+    so a changed problem set or a changed model gets a new table.
+    """
+    digest = hashlib.sha1((repr(problems) + reasoner_checksum()).encode("utf-8"))
+    return os.path.join(directory or ANSWER_TABLE_DIR,
+                        "answers_{}.npy".format(digest.hexdigest()[:12]))
+
+def save_answer_table(path, table):
+    """
+    Stores the answer table in the file. The table is written to a temporary file in
+    the same directory first, which then replaces the file. So other processes never
+    read a partly written table.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(suffix=".npy", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(handle, "wb") as temp_file:
+            np.save(temp_file, table)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+def load_answer_table(path, problems):
+    """
+    Returns the answer table of the problems from the file as a read-only memory map,
+    or None if the file is missing, damaged(e.g. cut short) or has the wrong shape.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        table = np.load(path, mmap_mode="r")
+    except (ValueError, EOFError):
+        return None
+    if table.shape != (len(problems), 256):
+        return None
+    return table
+
+def build_answer_tables(directory=None):
+    """
+    Computes the answer tables of all fixed problem sets and stores them in the
+    directory(ANSWER_TABLE_DIR by default). Returns the list of the written files.
+    """
+    paths = []
+    for problems in fixed_problem_sets():
+        path = answer_table_path(problems, directory)
+        save_answer_table(path, compute_answer_table(problems))
+        _ANSWER_TABLES.pop(path, None)
+        paths.append(path)
+    return paths
+
+def answer_table(problems, directory=None):
+    """
+    Returns the answer table of the problems(see compute_answer_table). The tables of
+    the fixed problem sets are read from their files in the directory(ANSWER_TABLE_DIR
+    by default) as read-only memory maps. A missing or damaged table or a table with
+    the wrong shape is computed and stored first. For other problems, the table is
+    computed.
+    """
+    if problems not in fixed_problem_sets():
+        return compute_answer_table(problems)
+    path = answer_table_path(problems, directory)
+    table = _ANSWER_TABLES.get(path)
+    if table is None:
+        table = load_answer_table(path, problems)
+        if table is None:
+            table = compute_answer_table(problems)
+            try:
+                save_answer_table(path, table)
+                table = np.load(path, mmap_mode="r")
+            except OSError:
+                pass # the directory is read-only, use the computed table
+        _ANSWER_TABLES[path] = table
+    return table
+
+def problem_answers(problem):
+    """
+    Returns the codes of the answers to the problem for all 256 parameter assignments.
+    The row of the answer table is used, if the problem is in a fixed problem set.
+    """
+    for problems in fixed_problem_sets():
+        if problem in problems:
+            return answer_table(problems)[problems.index(problem)]
+    return compute_answer_table([problem])[0]
+
 ###########find parameters  ####################################
 
 def find_params_old(problem_type3, problem, answer):
@@ -708,27 +894,10 @@ def find_params(problem, answer):
     and will store all assignments that result in the specified answer. This list will
     be returned. The answer needs to be a boolean value.
     """
-    spatial_model = model.MainModule() # initiate the spatial model
-    matching_params = []
-    i = 0
-    # iterates over all 128 possible variable assignments
-    while i < 256:
-        prob = deepcopy(problem)
-        b_num = format(i, '08b')
-        #print(b_num)
-        #print("bool", bool(int(b_num[0])))
-        params = [[bool(int(b_num[0])), bool(int(b_num[1])), bool(int(b_num[2])),
-                   bool(int(b_num[3])), bool(int(b_num[4])), bool(int(b_num[5]))],
-                  [bool(int(b_num[6])), bool(int(b_num[7]))]]
-        # check if the result with these parameters is the same as answer
-        para = deepcopy(params)
-        if spatial_model.interpret_spatial_parameters(prob, para) == answer:
-            #print(answer, params)
-            matching_params.append(params)
-        i += 1
-        #print(problem, "problem after interpret spatial")
-    #print("matching params len", len(matching_params[0]))
-    return matching_params # returns all lists of parameter values that did match
+    # the answers for all 256 possible variable assignments(see answer_table)
+    matching = np.flatnonzero(problem_answers(problem) == answer_code(answer))
+    # returns all lists of parameter values that did match
+    return [parameter_sweep.assignment(i) for i in matching.tolist()]
     #print(matching_params[0])
 
 def compute_answers_old(problem_type3, params):
@@ -766,14 +935,10 @@ def compute_answers(params, problems):
     with the parameter assignments. The index of the answers will be in sync with the
     params list to acces them later on.
     """
-    answers_list = [] # list for the lists of results
-    spatial_model = model.MainModule() # initiate the spatial model
-    for param in enumerate(params):
-        answers = [] # results for each parameter and all problems
-        for problem in problems:
-            answers.append(spatial_model.interpret_spatial_parameters(deepcopy(problem), param))
-        answers_list.append(answers) # make sure the list is in correct order
-    return answers_list # returns all answers for all parameters
+    # the answers are read from the answer table of the problems
+    indices = [parameter_sweep.assignment_index(param) for param in params]
+    table = answer_table(problems)
+    return [decode_answers(codes) for codes in table[:, indices].T.tolist()]
 
 def compare_vp_params(vp_results, params_results):
     """Iterates through all the lists of answers for the parameters in the list.
@@ -863,8 +1028,13 @@ def find_params_prob_vp(problem, problems, participant, answer, print_params):
     if print_params:
         print("problem: ", problem, "vp_ans: ", answer)
     params = find_params(problem, answer)
-    answers = compute_answers(params, problems) #compute the answers to any set of given problems
-    comp_res = compare_vp_params(participant, answers)
+    matching = [parameter_sweep.assignment_index(param) for param in params]
+    # compare the participant with the answers of the matching assignments(see
+    # compare_vp_params) in the answer table of the problems
+    vp_codes = np.array([answer_code(vp_ans) for vp_ans in participant], dtype=np.int8)
+    answers = answer_table(problems)[:len(participant), matching]
+    hits = (answers == vp_codes[:, np.newaxis]).sum(axis=0)
+    comp_res = [round(hit / len(participant), 2) for hit in hits.tolist()]
     print(comp_res)
     max_ind = find_n_max_vals(comp_res, 20) #finds the top 20 parameter assignments
     if print_params:
@@ -914,6 +1084,14 @@ def main():
     Main-function.
     calls all relevant functions
     """
+    parser = argparse.ArgumentParser(
+        description="Helper programs for the categories and parameter approach.")
+    parser.add_argument("--build-tables", action="store_true",
+                        help="compute and store the answer tables of the problem sets")
+    args = parser.parse_args()
+    if args.build_tables:
+        for path in build_answer_tables():
+            print("answer table stored in", path)
     #### categorization ####
     # usage of the categorization helperprogram
     #prec_result = evaluate_all_cats(CAT_TYPE13, CAT_TYPE23, CAT_TYPE32)
@@ -927,5 +1105,46 @@ def main():
     #                             PARTICIPANT_ANSWERS_TYPE3[3], True, True)
     #params = find_params(PROBLEMS_TYPE3[9], False)
 
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the answer tables.
+    """
+    def test_answer_table(self):
+        """Tests the answers of the table and that missing or stale tables are rebuilt.
+        """
+        spatial_model = model.MainModule()
+        with tempfile.TemporaryDirectory() as directory:
+            path = answer_table_path(PROBLEMS_TYPE3, directory)
+            # a copy, the file is damaged below
+            table = np.array(answer_table(PROBLEMS_TYPE3, directory))
+            self.assertTrue(os.path.exists(path))
+            for problem, codes in zip(PROBLEMS_TYPE3, table.tolist()):
+                self.assertEqual(decode_answers(codes),
+                                 parameter_sweep.answer_table(spatial_model, problem))
+            # a table with the wrong shape is computed again
+            _ANSWER_TABLES.pop(path)
+            np.save(path, np.zeros((1, 256), dtype=np.int8))
+            self.assertEqual(answer_table(PROBLEMS_TYPE3, directory).tolist(), table.tolist())
+            self.assertEqual(np.load(path).shape, table.shape)
+            # a table that was cut short is computed again
+            _ANSWER_TABLES.pop(path)
+            with open(path, "rb") as table_file:
+                data = table_file.read()
+            with open(path, "wb") as table_file:
+                table_file.write(data[:len(data) // 2])
+            self.assertEqual(answer_table(PROBLEMS_TYPE3, directory).tolist(), table.tolist())
+            self.assertEqual(np.load(path).shape, table.shape)
+            # a changed reasoner uses a new table
+            checksum = reasoner_checksum()
+            _REASONER_CHECKSUM["checksum"] = "changed"
+            try:
+                self.assertNotEqual(answer_table_path(PROBLEMS_TYPE3, directory), path)
+                answer_table(PROBLEMS_TYPE3, directory)
+                self.assertEqual(len(os.listdir(directory)), 2)
+            finally:
+                _REASONER_CHECKSUM["checksum"] = checksum
+            _ANSWER_TABLES.clear() # the memory maps of the files are released
+
 if __name__ == '__main__':
     main()
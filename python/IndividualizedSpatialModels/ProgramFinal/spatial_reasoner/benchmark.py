@@ -0,0 +1,288 @@
+'''Module for measuring the throughput of the spatial model. The interpret functions
+and the sweep over all 256 parameter assignments(see parameter_sweep) are run over the
+problem sets of the main module and over synthetic problems of growing size.
+For each function and problem set the problems per second, the peak memory and the
+functions with the most time(from the profiler) are reported. The results are stored
+as JSON, so the runs before and after a change can be compared.
+
+The synthetic problems are chains of items and problems of the problem generator(see
+problem_generator) with all three kinds of problems.
+
+The problem sets of the main module are sentences for the parser of the original
+spatial model. They are converted to premises in the format [A, relation, B]; the
+last premise is the question premise. For the single choice problems, the question
+premise is replaced by the eight relations between its items.
+
+Usage: python -m spatial_reasoner.benchmark [-o results.json] [-c previous.json]
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import argparse
+
+import cProfile
+
+import json
+
+import platform
+
+import pstats
+
+import time
+
+import tracemalloc
+
+import unittest
+
+from spatial_reasoner import main_module_param
+
+from spatial_reasoner import parameter_sweep
+
+from spatial_reasoner import problem_generator
+
+# the relation words of the sentences and the relations for parse_relation. The temporal
+# relations of the figural problems are read as left and right(see EXP_PROBLEMS_FIG).
+RELATION_WORDS = {"left": "left", "right": "right", "before": "left", "after": "right",
+                  "front": "front", "behind": "behind", "above": "above", "below": "below"}
+
+# problem sets of the main module
+PROBLEM_SETS = ("EXP_PROBLEMS_FIG", "COMBO_PROBLEMS", "DEDUCTIVE_PROBLEMS",
+                "INDETERMINATE_PROBLEMS", "INCONSISTENT_PROBLEMS")
+
+# number of items of the synthetic problems
+SYNTHETIC_SIZES = (4, 8, 16, 32, 64)
+
+# number of generated problems for each size
+GENERATED_PROBLEMS = 12
+
+# the benchmarked functions
+FUNCTIONS = ("interpret_spatial_parameters", "interpret_spatial2exp_parameters",
+             "answer_table")
+
+# number of functions in the time breakdown of each benchmark
+PROFILE_FUNCTIONS = 10
+
+
+def convert_sentence(sentence):
+    """
+    Converts a sentence of the problem sets(e.g. ["the", "square", "is", "behind", "the",
+    "circle"]) to a premise [subject, relation, object].
+    """
+    for word in sentence[2:-1]:
+        if word in RELATION_WORDS:
+            return [sentence[1], RELATION_WORDS[word], sentence[-1]]
+    raise ValueError("no relation in the sentence {}".format(sentence))
+
+def problem_set(name):
+    """
+    Returns the problems of the problem set of the main module with the given name,
+    converted to premises.
+    """
+    return [[convert_sentence(sentence) for sentence in problem]
+            for problem in getattr(main_module_param, name)]
+
+def chain_problem(size):
+    """
+    Returns a synthetic problem with size items in a row(I0 left of I1, ...). The
+    question premise is about the first and the last item.
+    """
+    items = ["I{}".format(i) for i in range(size)]
+    prem = [[items[i], "left", items[i + 1]] for i in range(size - 1)]
+    prem.append([items[0], "left", items[-1]])
+    return prem
+
+def single_choice_problem(prem):
+    """
+    Returns the single choice version of a problem: the question premise is replaced
+    by the eight answer choices between its items.
+    """
+    subj, _, obj = prem[-1]
+    return [list(pre_) for pre_ in prem[:-1]] + [
+        [subj, relation, obj] for relation in problem_generator.CHOICE_RELATIONS]
+
+def workloads(synthetic_sizes=SYNTHETIC_SIZES):
+    """
+    Returns the problem sets for the benchmark as (name, problems) pairs. The
+    generated problems have a quarter more premises than items and only depend on
+    the size.
+    """
+    sets = [(name, problem_set(name)) for name in PROBLEM_SETS]
+    for size in synthetic_sizes:
+        sets.append(("chain_{}".format(size), [chain_problem(size)]))
+        generated = problem_generator.generate_problems(GENERATED_PROBLEMS, size,
+                                                        size + size // 4, seed=size)
+        sets.append(("generated_{}".format(size), [problem.premises
+                                                   for problem in generated]))
+    return sets
+
+def _runner(function):
+    """
+    Returns a function that solves one problem with the benchmarked function and the
+    standard parameter assignment. The problems are copied, since the interpret
+    functions change them.
+    """
+    spatial_model = main_module_param.MainModule()
+    if function == "interpret_spatial_parameters":
+        return lambda prem: spatial_model.interpret_spatial_parameters(
+            [list(pre_) for pre_ in prem], [[False] * 6, [False] * 5])
+    if function == "interpret_spatial2exp_parameters":
+        return lambda prem: spatial_model.interpret_spatial2exp_parameters(
+            single_choice_problem(prem), [[False] * 6, [False] * 5])
+    if function == "answer_table":
+        return lambda prem: parameter_sweep.answer_table(spatial_model, prem)
+    raise ValueError("unknown function {}".format(function))
+
+def measure(function, problems, repeat=3):
+    """
+    Runs the function over all problems and returns a dictionary with the
+    problems per second(best of repeat runs), the peak memory of one run and the
+    functions of the spatial model with the most time in a profiled run.
+    """
+    run = _runner(function)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for prem in problems:
+            run(prem)
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best:
+            best = seconds
+    tracemalloc.start()
+    try:
+        for prem in problems:
+            run(prem)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for prem in problems:
+        run(prem)
+    profiler.disable()
+    return {"problems": len(problems), "seconds": best,
+            "problems_per_second": len(problems) / best if best else None,
+            "peak_memory": peak_memory, "profile": profile_breakdown(profiler)}
+
+def profile_breakdown(profiler, count=PROFILE_FUNCTIONS):
+    """
+    Returns the functions of the spatial reasoner with the most own time in the
+    profile as a list of dictionaries(function, calls, own and cumulative seconds).
+    """
+    entries = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in \
+            pstats.Stats(profiler).stats.items():
+        if "spatial_reasoner" not in filename:
+            continue
+        module = filename.replace("\\", "/").rsplit("/", 1)[-1][:-3]
+        entries.append({"function": "{}.{}:{}".format(module, name, line), "calls": calls,
+                        "own_seconds": own, "cumulative_seconds": cumulative})
+    entries.sort(key=lambda entry: entry["own_seconds"], reverse=True)
+    return entries[:count]
+
+def run_benchmark(functions=FUNCTIONS, synthetic_sizes=SYNTHETIC_SIZES, repeat=3,
+                  use_cache=False):
+    """
+    Runs all functions over all problem sets and returns the results as a dictionary,
+    which can be stored as JSON. The answer caches are turned off unless use_cache is
+    True, so the model construction is measured.
+    """
+    results = {"python": platform.python_version(), "use_cache": use_cache,
+               "repeat": repeat, "benchmarks": []}
+    old_cache = main_module_param.USE_CACHE
+    main_module_param.USE_CACHE = use_cache
+    try:
+        for function in functions:
+            for name, problems in workloads(synthetic_sizes):
+                result = measure(function, problems, repeat)
+                result.update({"function": function, "problem_set": name})
+                results["benchmarks"].append(result)
+    finally:
+        main_module_param.USE_CACHE = old_cache
+    return results
+
+def compare(results, previous):
+    """
+    Returns the speedups of the benchmarks in results compared to the previous
+    results as a list of (function, problem set, speedup) tuples. A speedup above 1
+    means that the benchmark is faster now.
+    """
+    old_times = {(bench["function"], bench["problem_set"]): bench["seconds"]
+                 for bench in previous["benchmarks"]}
+    speedups = []
+    for bench in results["benchmarks"]:
+        old_time = old_times.get((bench["function"], bench["problem_set"]))
+        if old_time and bench["seconds"]:
+            speedups.append((bench["function"], bench["problem_set"],
+                             old_time / bench["seconds"]))
+    return speedups
+
+def print_results(results, previous=None):
+    """
+    Prints a table of the results and the speedups compared to previous results.
+    """
+    speedups = {}
+    if previous is not None:
+        speedups = {(function, name): speedup for function, name, speedup
+                    in compare(results, previous)}
+    for bench in results["benchmarks"]:
+        line = "{:34} {:24} {:>12.1f} problems/s {:>10.1f} KiB".format(
+            bench["function"], bench["problem_set"], bench["problems_per_second"],
+            bench["peak_memory"] / 1024)
+        speedup = speedups.get((bench["function"], bench["problem_set"]))
+        if speedup is not None:
+            line += "  x{:.2f}".format(speedup)
+        print(line)
+        for entry in bench["profile"][:3]:
+            print("    {:60} {:>8} calls {:>8.4f}s".format(entry["function"], entry["calls"],
+                                                           entry["own_seconds"]))
+
+def main():
+    """
+    Runs the benchmark with the options of the command line.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the spatial model.")
+    parser.add_argument("-o", "--output", help="file for the results(JSON)")
+    parser.add_argument("-c", "--compare", help="results of a previous run(JSON)")
+    parser.add_argument("-r", "--repeat", type=int, default=3,
+                        help="number of timed runs, the best one is reported")
+    parser.add_argument("-s", "--sizes", type=int, nargs="*", default=SYNTHETIC_SIZES,
+                        help="numbers of items of the synthetic problems")
+    parser.add_argument("-f", "--functions", nargs="*", default=FUNCTIONS,
+                        choices=FUNCTIONS, help="benchmarked functions")
+    parser.add_argument("--cache", action="store_true", help="use the answer caches")
+    args = parser.parse_args()
+    results = run_benchmark(args.functions, args.sizes, args.repeat, args.cache)
+    previous = None
+    if args.compare:
+        with open(args.compare) as previous_file:
+            previous = json.load(previous_file)
+    print_results(results, previous)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=1)
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the benchmark.
+    """
+    def test_convert_sentence(self):
+        """Tests the conversion of the sentences of the problem sets.
+        """
+        self.assertEqual(convert_sentence(["the", "square", "is", "in", "front", "of", "the",
+                                           "circle"]), ["square", "front", "circle"])
+        self.assertEqual(convert_sentence(["the", "A", "happens", "before", "the", "B"]),
+                         ["A", "left", "B"])
+        for name in PROBLEM_SETS:
+            self.assertEqual(len(problem_set(name)), len(getattr(main_module_param, name)))
+
+    def test_run_benchmark(self):
+        """Tests that a small benchmark gives results for each function and problem set.
+        """
+        results = run_benchmark(synthetic_sizes=(4,), repeat=1)
+        self.assertEqual(len(results["benchmarks"]), len(FUNCTIONS) * (len(PROBLEM_SETS) + 2))
+        self.assertEqual(json.loads(json.dumps(results)), results)
+        self.assertEqual(len(compare(results, results)), len(results["benchmarks"]))
+
+if __name__ == "__main__":
+    main()
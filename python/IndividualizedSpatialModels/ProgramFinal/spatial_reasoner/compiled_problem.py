@@ -0,0 +1,199 @@
+'''Module for compiling the problems of the CCOBRA items into a compact form. The
+premises of an item are converted to the format of the spatial model([A, relation, B])
+and parsed only once. The compiled problem can be given directly to the function
+interpret_compiled of the main module, without copying and parsing the premises for
+each prediction.
+
+The items are numbered(interned) in the order of their first occurrence, so the
+premises of a compiled problem are also the canonical form of the problem that is
+used by the problem cache.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import copy
+
+import pickle
+
+import sys
+
+import unittest
+
+from spatial_reasoner import problem_cache
+
+from spatial_reasoner.main_module_param import MainModule
+
+# cache for the compiled problems of the items: item content -> compiled problem
+COMPILED_CACHE = problem_cache.LRUCache(10000)
+
+
+class CompiledProblem:
+    """
+    Immutable, compact form of a problem. Contains the names of the items(the
+    index of a name is the id of the item), the premises as tuples
+    (subject id, relation tuple, object id), the original relations(strings) of the
+    premises and a flag for each premise, whether it is a question premise.
+    """
+    __slots__ = ("names", "premises", "relations", "questions", "single_choice")
+
+    def __init__(self, names, premises, relations, questions, single_choice=False):
+        object.__setattr__(self, "names", tuple(names))
+        object.__setattr__(self, "premises", tuple(premises))
+        object.__setattr__(self, "relations", tuple(relations))
+        object.__setattr__(self, "questions", tuple(questions))
+        object.__setattr__(self, "single_choice", single_choice)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("a compiled problem can't be changed")
+
+    # the compiled problem is immutable, so copies are the problem itself. Pickled
+    # problems are rebuilt with the constructor, since __setattr__ can't be used.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (CompiledProblem, (self.names, self.premises, self.relations, self.questions,
+                                  self.single_choice))
+
+    def premise_list(self):
+        """
+        Returns the parsed premises in the format of the spatial model, in new lists
+        ([[A, relation tuple, B], ...]).
+        """
+        names = self.names
+        return [[names[subj], relation, names[obj]] for subj, relation, obj in self.premises]
+
+    def original_premises(self):
+        """
+        Returns the premises with the original relations in new lists
+        ([[A, relation string, B], ...]), like they were given to the interpret
+        functions before. Used by the verbal memory and guessing, which can change them.
+        """
+        names = self.names
+        return [[names[subj], rel_string, names[obj]] for (subj, _, obj), rel_string
+                in zip(self.premises, self.relations)]
+
+    def __eq__(self, other):
+        if not isinstance(other, CompiledProblem):
+            return NotImplemented
+        return (self.names == other.names and self.premises == other.premises and
+                self.relations == other.relations and self.questions == other.questions
+                and self.single_choice == other.single_choice)
+
+    def __hash__(self):
+        return hash((self.names, self.relations, self.single_choice))
+
+    def __repr__(self):
+        return "CompiledProblem({})".format(self.original_premises())
+
+
+def compile_premises(prem, questions=1, single_choice=False):
+    """
+    Compiles a list of premises in the format of the spatial model([A, relation, B]
+    with the relation as a string). The last questions premises are the question
+    premises. The given premises are not changed.
+    """
+    ids = {}
+    names = []
+    premises = []
+    relations = []
+    for subj, relation, obj in prem:
+        subj_id = ids.get(subj)
+        if subj_id is None:
+            subj_id = ids[subj] = len(names)
+            names.append(sys.intern(subj))
+        obj_id = ids.get(obj)
+        if obj_id is None:
+            obj_id = ids[obj] = len(names)
+            names.append(sys.intern(obj))
+        premises.append((subj_id, MainModule.parse_relation([subj, relation, obj]), obj_id))
+        relations.append(relation)
+    flags = [i >= len(prem) - questions for i in range(len(prem))]
+    return CompiledProblem(names, premises, relations, flags, single_choice)
+
+def compile_item(item):
+    """
+    Returns the compiled problem of a ccobra item. The premises of the item
+    (item.task) and the question premises(item.choices) are in the format
+    [relation, A, B]. For verification problems, the first choice contains the
+    question premises, for single choice problems each choice contains one question
+    premise. The compiled problems are cached, since the same items are predicted
+    many times during the adaption.
+    """
+    single_choice = item.response_type == "single-choice"
+    if single_choice:
+        questions = [choice[0] for choice in item.choices]
+    else:
+        questions = item.choices[0]
+    key = (single_choice, tuple([tuple(pre_) for pre_ in item.task]),
+           tuple([tuple(pre_) for pre_ in questions]))
+    problem = COMPILED_CACHE.get(key)
+    if problem is problem_cache.MISSING:
+        # convert the premises to the form [A, relation, B] to be used by the spatial model
+        prem = [[pre_[1], pre_[0], pre_[2]] for pre_ in key[1] + key[2]]
+        problem = compile_premises(prem, len(questions), single_choice)
+        COMPILED_CACHE.put(key, problem)
+    return problem
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class _Item:
+    """Minimal item with the attributes of a ccobra item, that are used by compile_item.
+    """
+    def __init__(self, task, choices, response_type):
+        self.task = task
+        self.choices = choices
+        self.response_type = response_type
+
+
+class Tests(unittest.TestCase):
+    """Unittest class for the compiled problems.
+    """
+    def test_compile_item(self):
+        """Tests the conversion of the items and the interned ids.
+        """
+        item = _Item([["Left", "A", "B"], ["Left", "B", "C"]], [[["Left", "A", "C"]]],
+                     "verify")
+        problem = compile_item(item)
+        self.assertEqual(problem.names, ("A", "B", "C"))
+        self.assertEqual(problem.premises, ((0, (-1, 0, 0), 1), (1, (-1, 0, 0), 2),
+                                            (0, (-1, 0, 0), 2)))
+        self.assertEqual(problem.questions, (False, False, True))
+        self.assertEqual(problem.original_premises(), [["A", "Left", "B"], ["B", "Left", "C"],
+                                                       ["A", "Left", "C"]])
+        self.assertIs(compile_item(item), problem)
+        self.assertEqual(problem.premises,
+                         problem_cache.canonical_problem(problem.premise_list()))
+        with self.assertRaises(AttributeError):
+            problem.names = ()
+
+    def test_copy(self):
+        """Tests that the compiled problems can be copied and pickled.
+        """
+        problem = compile_premises([["A", "Left", "B"], ["B", "Left", "C"], ["A", "Left", "C"]],
+                                   single_choice=True)
+        self.assertIs(copy.copy(problem), problem)
+        self.assertIs(copy.deepcopy([problem])[0], problem)
+        unpickled = pickle.loads(pickle.dumps(problem))
+        self.assertEqual(unpickled, problem)
+        self.assertEqual(unpickled.single_choice, True)
+        with self.assertRaises(AttributeError):
+            unpickled.names = ()
+
+    def test_interpret_compiled(self):
+        """Tests that the answers are the same as the ones of the interpret functions.
+        """
+        spatial_model = MainModule()
+        verify = [["A", "north", "B"], ["B", "east", "C"], ["A", "north-east", "C"]]
+        choice = [["A", "north", "B"], ["B", "east", "C"], ["A", "south", "C"],
+                  ["A", "north-east", "C"]]
+        params = [[False] * 6, [False] * 5]
+        self.assertEqual(spatial_model.interpret_compiled(compile_premises(verify), params),
+                         spatial_model.interpret_spatial_parameters(
+                             [list(pre_) for pre_ in verify], [[False] * 6, [False] * 5]))
+        self.assertEqual(spatial_model.interpret_compiled(
+            compile_premises(choice, 2, True), params), [["north-east", "A", "C"]])
+        self.assertEqual(params, [[False] * 6, [False] * 5])
@@ -0,0 +1,231 @@
+'''Module for deciding the validity of premises without building a model. The premises
+are treated as order constraints over the items, separately for each axis: a relation
+value of -1 or 1 is a strict order of the subject and the object in that axis, a value
+of 0 means that both items have the same coordinate(like in verify_spatial).
+Several items can be at the same position, so the axes don't depend on each other.
+
+For each axis, the items with the same coordinate are merged with a union-find
+structure and the strict orders are the edges of a graph over these groups. The
+premises are consistent, if no group is ordered before itself(no cycle). A question
+premise is necessary, if it holds in every model of the premises, possible, if it
+holds in at least one model and impossible otherwise. All decisions are polynomial
+in the number of items and premises.
+
+The oracle is used to compute the correct answers(ground truth) of a problem, see
+MainModule.ground_truth.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import unittest
+
+# the modalities of a question premise
+NECESSARY = "necessary"
+POSSIBLE = "possible"
+IMPOSSIBLE = "impossible"
+
+
+class AxisOrder:
+    """
+    Order constraints of the items in one axis. Items with the same coordinate are
+    in the same group(union-find), the strict orders are stored as edges from the
+    group with the smaller coordinate to the group with the bigger coordinate.
+    """
+    def __init__(self):
+        self.parent = {} # item -> parent item in the union-find structure
+        self.edges = [] # (smaller item, bigger item)
+        self._successors = None # group -> set of groups with bigger coordinates
+
+    def find(self, item):
+        """
+        Returns the representative of the group of the item.
+        """
+        parent = self.parent
+        root = parent.setdefault(item, item)
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[item] != root:
+            parent[item], item = root, parent[item]
+        return root
+
+    def add(self, subj, value, obj):
+        """
+        Adds the constraint of one relation value: -1 if the subject has a smaller
+        coordinate than the object, 1 if it has a bigger one and 0 if both have
+        the same coordinate.
+        """
+        self._successors = None
+        if value < 0:
+            self.edges.append((subj, obj))
+        elif value > 0:
+            self.edges.append((obj, subj))
+        else:
+            self.parent[self.find(subj)] = self.find(obj)
+
+    def copy(self):
+        """
+        Returns an independent copy of the constraints.
+        """
+        new_order = AxisOrder()
+        new_order.parent = dict(self.parent)
+        new_order.edges = list(self.edges)
+        return new_order
+
+    def successors(self):
+        """
+        Returns the graph of the groups: group -> set of the groups that are
+        directly ordered after it.
+        """
+        if self._successors is None:
+            successors = {}
+            for small, big in self.edges:
+                successors.setdefault(self.find(small), set()).add(self.find(big))
+            self._successors = successors
+        return self._successors
+
+    def consistent(self):
+        """
+        Returns True, if the constraints can be satisfied. This is the case, if the
+        graph of the groups has no cycle(topological sort).
+        """
+        successors = self.successors()
+        in_degree = {}
+        for group, bigger in successors.items():
+            in_degree.setdefault(group, 0)
+            for big in bigger:
+                in_degree[big] = in_degree.get(big, 0) + 1
+        open_groups = [group for group, degree in in_degree.items() if degree == 0]
+        sorted_count = 0
+        while open_groups:
+            group = open_groups.pop()
+            sorted_count += 1
+            for big in successors.get(group, ()):
+                in_degree[big] -= 1
+                if in_degree[big] == 0:
+                    open_groups.append(big)
+        return sorted_count == len(in_degree)
+
+    def smaller(self, item1, item2):
+        """
+        Returns True, if item1 has a smaller coordinate than item2 in every
+        solution, which is the case if there is a path from the group of item1
+        to the group of item2.
+        """
+        successors = self.successors()
+        target = self.find(item2)
+        stack = [self.find(item1)]
+        visited = set()
+        while stack:
+            group = stack.pop()
+            for big in successors.get(group, ()):
+                if big == target:
+                    return True
+                if big not in visited:
+                    visited.add(big)
+                    stack.append(big)
+        return False
+
+    def entails(self, subj, value, obj):
+        """
+        Returns True, if the constraint of the relation value holds in every
+        solution of the constraints.
+        """
+        if value < 0:
+            return self.smaller(subj, obj)
+        if value > 0:
+            return self.smaller(obj, subj)
+        return subj == obj or self.find(subj) == self.find(obj)
+
+
+class ConstraintOracle:
+    """
+    Decides the validity of question premises for a list of parsed premises
+    ([subject, relation tuple, object]), without building a model.
+    """
+    def __init__(self, premises):
+        self.axes = [AxisOrder(), AxisOrder(), AxisOrder()]
+        for premise in premises:
+            self.add(premise)
+
+    def add(self, premise):
+        """
+        Adds the constraints of a parsed premise.
+        """
+        subj, relation, obj = premise
+        for axis, value in zip(self.axes, relation):
+            axis.add(subj, value, obj)
+
+    def consistent(self):
+        """
+        Returns True, if there is a model in which all premises hold.
+        """
+        return all([axis.consistent() for axis in self.axes])
+
+    def necessary(self, question):
+        """
+        Returns True, if the question premise holds in every model of the premises.
+        The negation of the question would have to break the constraint of at least
+        one axis, so the question is necessary, if each axis entails its constraint.
+        """
+        subj, relation, obj = question
+        return all([axis.entails(subj, value, obj)
+                    for axis, value in zip(self.axes, relation)])
+
+    def possible(self, question):
+        """
+        Returns True, if the question premise holds in at least one model of the
+        premises.
+        """
+        subj, relation, obj = question
+        for axis, value in zip(self.axes, relation):
+            axis = axis.copy()
+            axis.add(subj, value, obj)
+            if not axis.consistent():
+                return False
+        return True
+
+    def modality(self, question):
+        """
+        Returns NECESSARY, POSSIBLE or IMPOSSIBLE for the question premise. If the
+        premises are inconsistent, None is returned.
+        """
+        if not self.consistent():
+            return None
+        if self.necessary(question):
+            return NECESSARY
+        if self.possible(question):
+            return POSSIBLE
+        return IMPOSSIBLE
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the constraint oracle.
+    """
+    def test_modality(self):
+        """Tests the modalities of question premises in one and two dimensions.
+        """
+        oracle = ConstraintOracle([["A", (-1, 0, 0), "B"], ["C", (-1, 0, 0), "B"]])
+        self.assertEqual(oracle.modality(["A", (-1, 0, 0), "B"]), NECESSARY)
+        self.assertEqual(oracle.modality(["A", (-1, 0, 0), "C"]), POSSIBLE)
+        self.assertEqual(oracle.modality(["B", (-1, 0, 0), "A"]), IMPOSSIBLE)
+        oracle = ConstraintOracle([["A", (0, 1, 0), "B"], ["B", (1, 0, 0), "C"]])
+        self.assertEqual(oracle.modality(["A", (1, 1, 0), "C"]), NECESSARY)
+        self.assertEqual(oracle.modality(["A", (1, 0, 0), "C"]), IMPOSSIBLE)
+        oracle.add(["C", (-1, -1, 0), "A"])
+        self.assertTrue(oracle.consistent())
+        oracle.add(["C", (1, 0, 0), "A"])
+        self.assertFalse(oracle.consistent())
+        self.assertEqual(oracle.modality(["A", (1, 0, 0), "C"]), None)
+
+    def test_ground_truth(self):
+        """Tests that the oracle gives the correct answers of the experiments.
+        """
+        import parameter_cat_helper as helper
+        from spatial_reasoner.main_module_param import MainModule
+        spatial_model = MainModule()
+        for problems, ground_truth in ((helper.PROBLEMS_TYPE12, helper.GROUND_TRUTH12),
+                                       (helper.PROBLEMS_TYPE3, helper.GROUND_TRUTH3)):
+            self.assertEqual([spatial_model.ground_truth(prem) for prem in problems],
+                             ground_truth)
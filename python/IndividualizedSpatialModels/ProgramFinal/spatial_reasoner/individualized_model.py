@@ -0,0 +1,553 @@
+'''
+Module for the individualized spatial models of the CCOBRA Framework. All individualized
+models work the same way: they predict with the current parameter assignment, rate their
+individualizations in adapt and activate them, if the rating and the prior(see pre_train)
+are over a threshold. The models only differ in their individualizations, so each model
+is a small subclass of IndividualizedModel with a list of Individualization objects,
+which describe the parameters, gains and thresholds of the individualizations.
+
+The predictions are stored in a prediction table, that is shared by all models and
+participants of a process. The same item is predicted with the same parameter
+assignments by many models, so the spatial model is only used for the first of them.
+Answers, that needed random numbers(guessing), are never stored in the table.
+
+The VariantPredictor predicts and adapts several models at once. For each item, the
+baseline(standard parameter assignment) and each other parameter assignment that the
+models need is only interpreted once.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import glob
+
+import importlib.machinery
+
+import os
+
+import random
+
+import unittest
+
+import ccobra
+
+from spatial_reasoner import compiled_problem
+
+from spatial_reasoner import main_module_param
+
+from spatial_reasoner import parallel_pretrain
+
+from spatial_reasoner import problem_cache
+
+from spatial_reasoner import problem_generator
+
+# table for the predictions: (compiled problem, parameters) -> answer
+PREDICTION_TABLE = problem_cache.LRUCache(100000)
+
+
+def assignment(bits):
+    """
+    Returns a parameter assignment for the spatial model, where only the given bits are
+    active. Each bit is a pair (list, index), e.g. (0, 4) for premise three
+    misinterpreted or (1, 1) for the guessing.
+    """
+    parameters = [[False] * 6, [False] * 5]
+    for row, index in bits:
+        parameters[row][index] = True
+    return parameters
+
+def predict_problem(problem, parameters, rng=None):
+    """
+    Returns the answer of the spatial model to a compiled problem(see compiled_problem)
+    with the given parameter assignment. The answer is looked up in the prediction
+    table first. rng is the random number generator for the guessing, the answer is only
+    stored in the table if no random number was used.
+    """
+    key = None
+    if main_module_param.USE_CACHE and not main_module_param.PRINT_MODEL:
+        key = (problem, tuple(parameters[0]), tuple(parameters[1]))
+        answer = PREDICTION_TABLE.get(key)
+        if answer is not problem_cache.MISSING:
+            return _copy_answer(answer)
+    answer, deterministic = _interpret(problem, parameters, rng)
+    if key is not None and deterministic:
+        PREDICTION_TABLE.put(key, _copy_answer(answer))
+    return answer
+
+def _interpret(problem, parameters, rng):
+    """
+    Interprets the compiled problem with the spatial model. Returns the answer and
+    whether it was found without random numbers.
+    """
+    counter = _CountingRandom(rng)
+    answer = main_module_param.MainModule(counter).interpret_compiled(problem, parameters)
+    return answer, not counter.draws
+
+def _copy_answer(answer):
+    """
+    Returns a copy of an answer, the answers of single choice problems are lists
+    ([[relation, A, B]]) and can be changed by the caller.
+    """
+    if isinstance(answer, list):
+        return [list(pre_) for pre_ in answer]
+    return answer
+
+
+class _CountingRandom:
+    """
+    Random number generator, that counts the random numbers taken from another
+    generator(the global random module if it is None).
+    """
+    def __init__(self, rng=None):
+        if rng is None:
+            rng = random
+        self.rng = rng
+        self.draws = 0
+
+    def randint(self, low, high):
+        """Returns the next random integer of the generator."""
+        self.draws += 1
+        return self.rng.randint(low, high)
+
+
+class Individualization:
+    """
+    Description of an individualization or a combination of individualizations.
+    bits are the parameters(see assignment) for the prediction with the
+    individualization. If the prediction is the participant's answer, the rating is
+    increased by gain, otherwise it is decreased by loss(only if it is at least
+    min_rating). The individualization is activated, if
+    rating + multiplier * prior >= threshold. A threshold of None means, that the
+    individualization is only rated, but never activated.
+    activates are the bits that are set when the individualization is activated(the
+    prediction bits by default). Below the threshold, the bits are deactivated again.
+    For combinations, release are the bits that are deactivated instead, if all check
+    bits(the activated bits by default) are active, so that only one of the single
+    individualizations remains. unless is the name of a combination, the
+    individualization is only checked if that combination wasn't activated.
+    rating and prior are the names of the attributes of the model, by default
+    ind_rating_<name> and ind_rating_prior_<name>(ind_rating for an empty name).
+    """
+    __slots__ = ("name", "bits", "gain", "multiplier", "threshold", "loss", "min_rating",
+                 "activates", "check", "release", "unless", "rating", "prior")
+
+    def __init__(self, name, bits, gain, multiplier, threshold, loss=0.1, min_rating=0.1,
+                 activates=None, check=None, release=None, unless=None, rating=None,
+                 prior=None):
+        self.name = name
+        self.bits = tuple(bits)
+        self.gain = gain
+        self.multiplier = multiplier
+        self.threshold = threshold
+        self.loss = loss
+        self.min_rating = min_rating
+        self.activates = self.bits if activates is None else tuple(activates)
+        self.check = self.activates if check is None else tuple(check)
+        self.release = release
+        self.unless = unless
+        suffix = "_" + name if name else ""
+        self.rating = rating or "ind_rating" + suffix
+        self.prior = prior or "ind_rating_prior" + suffix
+
+    def parameters(self):
+        """
+        Returns the parameter assignment for the prediction with the individualization.
+        """
+        return assignment(self.bits)
+
+    def __repr__(self):
+        return "Individualization({}, {})".format(self.name, self.bits)
+
+
+class IndividualizedModel(ccobra.CCobraModel):
+    """
+    Individualized spatial model. The subclasses describe their individualizations in
+    the class attribute individualizations. The individualizations are rated in this
+    order, activation_order contains the names in the order of the activation, if it
+    is different.
+    The individualizations can be activated and deactivated dynamically. The rating
+    and prior values need to be over a specified threshold, to activate an
+    individualization. Combinations of individualizations are used like a new, single
+    individualization and can therefore become activated independent from the other
+    individualizations.
+    """
+    # the individualizations of the model(see Individualization)
+    individualizations = ()
+    # names of the individualizations in the order of activation, None for the same order
+    activation_order = None
+
+    def __init__(self, name):
+        """ Initializes the Model by calling the parent-class constructor
+        and passing information about the name as well as supported domains
+        and response-types.
+        Each individualized model(except the categories model) can solve problems of
+        the "verify" and "single-choice" type.
+
+        Parameters
+        ----------
+        name : str
+            Name of the model. Will be used as an identifier throughout the
+            evaluation phase. Should be unique.
+
+        """
+        super(IndividualizedModel, self).__init__(
+            name, ["spatial-relational"], ["verify", "single-choice"])
+        # random number generator for the guessing, set for each participant
+        self.rng = None
+        # list for the previously given answers by the model
+        self.previous_model_ans = []
+        # Variable for the parameter assignment for the spatial model
+        self.parameter_assignment = assignment(())
+        for ind in self.individualizations:
+            setattr(self, ind.rating, 0)
+            setattr(self, ind.prior, 0)
+
+    def start_participant(self, **kwargs):
+        """ Model initialization method. Used to setup the initial state of its
+        datastructures, memory, etc.
+        Resets the ratings and activations of the individualizations and the stored
+        problem answers. The priors are kept.
+
+        **Attention**: Should reset the internal state of the model.
+
+        """
+        # random numbers for the guessing of this participant(see participant_rng)
+        self.rng = main_module_param.participant_rng(kwargs.get("id"))
+        self.previous_model_ans = []
+        self.parameter_assignment = assignment(())
+        for ind in self.individualizations:
+            setattr(self, ind.rating, 0)
+
+    def predict(self, item, parameters=None, **kwargs):
+        """ Generates a prediction based on a given task item.
+        Can make a prediction with verify and single-choice tasks.
+        The prediction will be made with the spatial model with the given parameter
+        assignment(the current assignment of the model, if it is None).
+
+        Parameters
+        ----------
+        item : ccobra.data.Item
+            Task item container. Holds information about the task, domain,
+            response type and response choices.
+
+        parameters : list
+            The list with the activation values for all the individualizations
+            in the model. (e.g., [[False, False, False, False, False, False],
+            [False, False, False, False, False]]).
+
+        Returns
+        -------
+        list(str)
+            Single-choice relational response in list representation (e.g.,
+            ['A', 'left', 'B']) or a verification relational response in Boolean
+            representation.
+
+        """
+        if parameters is None: # no parameters were given, use the current general assignment.
+            parameters = self.parameter_assignment
+        answer = predict_problem(compiled_problem.compile_item(item), parameters, self.rng)
+        # store the answer given by the model for later use in the adapt function.
+        self.previous_model_ans.append(answer)
+        return answer
+
+    def individualization_answers(self, item):
+        """
+        Returns the answers of the model with each of the individualizations, in the
+        order of the individualizations.
+        """
+        return [self.predict(item, ind.parameters()) for ind in self.individualizations]
+
+    def adapt(self, item, target, **kwargs):
+        """ The model will be adapted to the participant, if the model gave a different
+        answer than the participant. The model will make the previous prediction again
+        with each individualization. If the answer is now the same as the participant
+        answer, the rating of the individualization will be increased, otherwise it will
+        be decreased. After all individualizations are rated, they will be activated or
+        deactivated depending on their rating and their prior value, which is computed
+        in the pretrain function(rating + x * prior >= threshold; where x is a
+        multiplicator, to give the prior a certain weight).
+
+        Parameters
+        ----------
+        item : ccobra.data.Item
+            Task information container. Holds the task text, response type,
+            response choices, etc.
+
+        target : str
+            True response given by the human reasoner.
+
+        """
+        # first of all, check if the answer was correct with regard to the participant answer
+        if target != self.previous_model_ans[-1]:
+            self.rate_individualizations(self.individualization_answers(item), target)
+            self.activate_individualizations()
+
+    def rate_individualizations(self, answers, target):
+        """
+        Changes the ratings of the individualizations, answers are the answers of the
+        model with each of the individualizations(see adapt).
+        """
+        for ind, answer in zip(self.individualizations, answers):
+            rating = getattr(self, ind.rating)
+            if answer == target:
+                setattr(self, ind.rating, rating + ind.gain)
+            elif rating >= ind.min_rating:
+                setattr(self, ind.rating, rating - ind.loss)
+
+    def activate_individualizations(self):
+        """
+        Activates or deactivates the individualizations depending on their rating and
+        prior(see adapt).
+        """
+        individualizations = self.individualizations
+        if self.activation_order is not None:
+            by_name = {ind.name: ind for ind in individualizations}
+            individualizations = [by_name[name] for name in self.activation_order]
+        params = self.parameter_assignment
+        activated = set()
+        for ind in individualizations:
+            if ind.threshold is None or ind.unless in activated:
+                continue
+            if getattr(self, ind.rating) + (ind.multiplier * getattr(self, ind.prior)) \
+                    >= ind.threshold:
+                activated.add(ind.name)
+                for row, index in ind.activates:
+                    params[row][index] = True
+            elif ind.release is None:
+                for row, index in ind.activates:
+                    params[row][index] = False
+            elif all([params[row][index] for row, index in ind.check]):
+                for row, index in ind.release:
+                    params[row][index] = False
+
+    def pre_train(self, dataset):
+        """
+        In the pre_train function, a prior value for all individualizations will
+        be computed. The prior value represents, how often the corresponding
+        individualization was able to correct the answer of the original model.
+        The ratings are counted for each participant with adapt_prior, the prior is
+        the sum over all participants, normed by the number of problems.
+
+        Parameters
+        ----------
+        dataset : list(list(dict(str, object)))
+            Training data for the model. List of participants which each
+            contain lists of tasks represented as dictionaries with the
+            corresponding task information (e.g., the item container and
+            given response).
+
+        """
+        # the ratings of the participants are computed in parallel and summed up
+        ratings = parallel_pretrain.rate_participants(
+            self, dataset, [ind.rating for ind in self.individualizations])
+        for ind, rating in zip(self.individualizations, ratings):
+            prior = getattr(self, ind.prior) + rating
+            setattr(self, ind.prior, prior / (len(dataset) * len(dataset[-1])))
+        print("rating after pretrain: ", ", ".join(
+            ["{} {}".format(ind.name, getattr(self, ind.prior)).strip()
+             for ind in self.individualizations]))
+
+    def adapt_prior(self, item, target):
+        """
+        This adapt function only counts the times when the individualizations
+        lead to a better result than the baseline. It is used in the pre_train
+        function, no individualization will be activated or deactivated.
+
+        Parameters
+        ----------
+        item : ccobra.data.Item
+            Task information container. Holds the task text, response type,
+            response choices, etc.
+
+        target : str
+            True response given by the human reasoner.
+
+        """
+        # first of all, check if the answer was correct with regard to the participant answer
+        if target != self.previous_model_ans[-1]:
+            answers = self.individualization_answers(item)
+            for ind, answer in zip(self.individualizations, answers):
+                if answer == target:
+                    setattr(self, ind.rating, getattr(self, ind.rating) + 1)
+
+
+class VariantPredictor:
+    """
+    Predicts with several individualized models at once, e.g. to compare all models of
+    the ccobra_models directory on a dataset. For each item, the baseline(the standard
+    parameter assignment) and each parameter assignment that the models need for their
+    predictions and their individualizations are only interpreted once. Answers that
+    need random numbers are computed for each model with its own random numbers, so
+    each model gives the same answers as if it was used alone.
+    """
+    def __init__(self, models):
+        self.models = list(models)
+        # random number generator for the baseline, like the baseline model
+        self.rng = None
+        # the current problem and the answers without random numbers:
+        # parameters -> answer
+        self.problem = None
+        self.answers = {}
+        self.baseline = None
+
+    def start_participant(self, **kwargs):
+        """
+        Starts a new participant for all models.
+        """
+        self.rng = main_module_param.participant_rng(kwargs.get("id"))
+        for model in self.models:
+            model.start_participant(**kwargs)
+
+    def answer(self, parameters, rng=None):
+        """
+        Returns the answer to the current problem with the given parameter assignment.
+        The answer is only interpreted, if it isn't known for the problem yet or if it
+        needs random numbers(from rng).
+        """
+        key = (tuple(parameters[0]), tuple(parameters[1]))
+        answer = self.answers.get(key, problem_cache.MISSING)
+        if answer is not problem_cache.MISSING:
+            return _copy_answer(answer)
+        answer, deterministic = _interpret(self.problem, parameters, rng)
+        if deterministic:
+            self.answers[key] = _copy_answer(answer)
+        return answer
+
+    def predict(self, item):
+        """
+        Predicts the answer to the item with the baseline and all models. Returns a
+        dictionary with the name of each model and its answer, the answer of the
+        baseline is stored in baseline.
+        """
+        self.problem = compiled_problem.compile_item(item)
+        self.answers = {}
+        self.baseline = self.answer(assignment(()), self.rng)
+        predictions = {}
+        for model in self.models:
+            answer = self.answer(model.parameter_assignment, model.rng)
+            model.previous_model_ans.append(answer)
+            predictions[model.name] = answer
+        return predictions
+
+    def adapt(self, item, target):
+        """
+        Adapts all models to the participant's answer to the item, which was the last
+        predicted item(see IndividualizedModel.adapt).
+        """
+        for model in self.models:
+            if target != model.previous_model_ans[-1]:
+                model.rate_individualizations(
+                    [self.answer(ind.parameters(), model.rng)
+                     for ind in model.individualizations], target)
+                model.activate_individualizations()
+
+    def evaluate(self, dataset):
+        """
+        Predicts and adapts all participants of the dataset(see
+        IndividualizedModel.pre_train) and returns a dictionary with the names of the
+        models and the number of correctly predicted answers. The baseline is counted
+        as "baseline".
+        """
+        hits = dict.fromkeys(["baseline"] + [model.name for model in self.models], 0)
+        for part_id, part_data in enumerate(dataset):
+            self.start_participant(id=part_id)
+            for problem_data in part_data:
+                target = problem_data['response']
+                predictions = self.predict(problem_data['item'])
+                hits["baseline"] += self.baseline == target
+                for name, answer in predictions.items():
+                    hits[name] += answer == target
+                self.adapt(problem_data['item'], target)
+        return hits
+
+def load_models(directory):
+    """
+    Returns instances of all individualized models in the python files of the
+    directory(e.g. ccobra_models), in the order of the file names.
+    """
+    models = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.py"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        module = importlib.machinery.SourceFileLoader(name, path).load_module()
+        for value in vars(module).values():
+            if isinstance(value, type) and issubclass(value, IndividualizedModel) and \
+                    value is not IndividualizedModel:
+                models.append(value())
+    return models
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class _CombinedModel(IndividualizedModel):
+    """Model with two individualizations and their combination.
+    """
+    individualizations = (
+        Individualization("prem3", [(0, 4)], 0.1, 0.5, 1),
+        Individualization("altc", [(1, 4)], 0.1, 20, None),
+        Individualization("pr3altc", [(0, 4), (1, 4)], 0.1, 1, 0.2, release=[(1, 4)]))
+
+
+class Tests(unittest.TestCase):
+    """Unittest class for the individualized models.
+    """
+    def test_activation(self):
+        """Tests the activation of single individualizations and combinations.
+        """
+        model = _CombinedModel("test")
+        model.start_participant(id=1)
+        self.assertEqual(model.parameter_assignment, assignment(()))
+        model.ind_rating_prem3 = 1
+        model.ind_rating_altc = 5
+        model.activate_individualizations()
+        self.assertEqual(model.parameter_assignment, assignment([(0, 4)]))
+        model.ind_rating_pr3altc = 0.3
+        model.activate_individualizations()
+        self.assertEqual(model.parameter_assignment, assignment([(0, 4), (1, 4)]))
+        model.ind_rating_pr3altc = 0.1
+        model.activate_individualizations()
+        self.assertEqual(model.parameter_assignment, assignment([(0, 4)]))
+        model.start_participant(id=1)
+        self.assertEqual(model.ind_rating_prem3, 0)
+
+    def test_prediction_table(self):
+        """Tests that the prediction table gives the answers of the spatial model.
+        """
+        problem = compiled_problem.compile_premises([["A", "left", "B"], ["B", "left", "C"],
+                                                     ["A", "left", "C"]])
+        PREDICTION_TABLE.clear()
+        for parameters in [assignment(()), assignment([(0, 0)]), assignment([(1, 0)])]:
+            answer = main_module_param.MainModule().interpret_compiled(problem, parameters)
+            self.assertEqual(predict_problem(problem, parameters), answer)
+            self.assertEqual(predict_problem(problem, parameters), answer)
+        self.assertEqual(PREDICTION_TABLE.hits, 3)
+        # the guessing uses random numbers for the items of the second experiment
+        guessing = compiled_problem.compile_premises([["X", "left", "Y"], ["X", "left", "Y"]])
+        predict_problem(guessing, assignment([(1, 1)]), random.Random(1))
+        self.assertEqual(len(PREDICTION_TABLE.entries), 3)
+
+    def test_variant_predictor(self):
+        """Tests that the variant predictor gives the answers of the single models.
+        """
+        items = [problem_generator.generate_problem(4, 4, kind, problem_generator.ONE_D,
+                                                    random.Random(i)).ccobra_item(
+                                                        i, i, single_choice=bool(i % 2))
+                 for i, kind in enumerate(problem_generator.KINDS * 6)]
+        responses = [item.choices[i % 8] if item.response_type == "single-choice"
+                     else bool(i % 3) for i, item in enumerate(items)]
+        single = _CombinedModel("single")
+        single.ind_rating_prior_prem3 = 1
+        single.start_participant(id=3)
+        answers = []
+        for item, response in zip(items, responses):
+            answers.append(single.predict(item))
+            single.adapt(item, response)
+        predictor = VariantPredictor([_CombinedModel("a"), _CombinedModel("b")])
+        predictor.models[0].ind_rating_prior_prem3 = 1
+        predictor.start_participant(id=3)
+        for item, response, answer in zip(items, responses, answers):
+            self.assertEqual(predictor.predict(item)["a"], answer)
+            predictor.adapt(item, response)
+        self.assertEqual(predictor.models[0].parameter_assignment,
+                         single.parameter_assignment)
+        self.assertEqual(predictor.models[0].ind_rating_prem3, single.ind_rating_prem3)
+        hits = predictor.evaluate([[{'item': item, 'response': response} for item, response
+                                   in zip(items[:4], responses)]])
+        self.assertEqual(set(hits), {"baseline", "a", "b"})
@@ -0,0 +1,55 @@
+'''Module for the result of the model construction steps. Replaces the "T"/"F" that was
+written to the position (20, 20, 20) of a model to return the answer of a verification.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import unittest
+
+
+class InterpretResult:
+    """
+    Result of processing a premise or a whole problem. Contains the list of the
+    current models(the preferred model is the first one), the answer and the
+    statistics of the search for counterexamples(make_true/make_false).
+    The answer is True or False, if a premise was verified, otherwise None.
+    """
+    __slots__ = ("models", "answer", "stats")
+
+    def __init__(self, models, answer=None, stats=None):
+        self.models = models
+        self.answer = answer
+        if stats is None:
+            stats = {}
+        self.stats = stats # name of the statistic -> count
+
+    @property
+    def model(self):
+        """
+        The preferred model, which is the first model of the list.
+        """
+        return self.models[0]
+
+    def add_stats(self, stats):
+        """
+        Adds the counts of the given statistics to the statistics of this result.
+        """
+        for name, count in stats.items():
+            self.stats[name] = self.stats.get(name, 0) + count
+
+    def __repr__(self):
+        return "InterpretResult(answer={}, models={}, stats={})".format(
+            self.answer, self.models, self.stats)
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the interpret result.
+    """
+    def test_add_stats(self):
+        """Tests that the statistics are summed up.
+        """
+        result = InterpretResult([{(0, 0, 0): "A"}], True, {"switch": 2})
+        result.add_stats({"switch": 1, "make": 1})
+        self.assertEqual(result.stats, {"switch": 3, "make": 1})
+        self.assertEqual(result.model, {(0, 0, 0): "A"})
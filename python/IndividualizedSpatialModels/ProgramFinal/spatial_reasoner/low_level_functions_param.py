@@ -6,11 +6,6 @@ Created on 16.07.2018
 
 PRINT_MODEL = False # zwischenloesung
 
-import numpy as np
-
-import matplotlib.pyplot as plt
-from mpl_toolkits import mplot3d
-
 
 def invert_relation(relation):
     """inverts all values of numbers in the given relation 3-tuple
@@ -34,10 +29,11 @@ def find_first_item(item, models):
     """
     new version of find item with dictionary (replaces find_first_item, finders, finds,
     eq_or_inc and check_member of v.1)
-    Searches an item in all the models given as a dictionary.
-    Iterates over all models and checks if the item is in one of them.
-    Function works for both when the value is a list of items or when the
-    value itself is a single item.
+    Searches an item in all the given models.
+    Iterates over all models and checks if the item is in one of them. Each
+    SpatialModel keeps an index of its items, so the lookup in a model doesn't
+    need to search the coordinates.
+    Only the exact item is found, not items whose names contain it.
     Returns a list with a tuple of the coordinates of the item and the model
     where the item was found in. if it couldn´t be found, returns None.
     """
@@ -51,14 +47,12 @@ def find_first_item(item, models):
         #need to check if the model is None!!
         if model is not None:
             #checks if the item is in the current model, and if yes, where
-            coordinates = [key for key, val in model.items() if item in val]
-            if coordinates == []:
-                coordinates = [key for key, val in model.items() if item == val] # NEW FOR TEMPORAL
-            if coordinates != []:
+            coordinates = model.find(item)
+            if coordinates is not None:
                 #return the coordinates and the corresponding model when item found
                 if PRINT_MODEL:
-                    print("find_first_item returns:", coordinates[0])
-                return [coordinates[0], model]
+                    print("find_first_item returns:", coordinates)
+                return [coordinates, model]
     if PRINT_MODEL:
         print("new find itm failed, nothing found")
     return None
@@ -129,18 +123,11 @@ def tuple_add(tuple1, tuple2):
 # USED BY BOTH MODELS
 def dict_dimensions(dict1):
     """
-    Determines the dimensions of a model in dictionary form.
+    Determines the dimensions of a model.
     Returns a tuple with the max values of indices from the coords.
+    The model keeps track of its bounding box, so no iteration over the coords is needed.
     """
-    x_dim = []
-    y_dim = []
-    z_dim = []
-    for (i, j, k) in dict1.keys():
-        y_dim.append(j)
-        x_dim.append(i)
-        z_dim.append(k)
-    # add 1 to actually get the size of the model.
-    return tuple([max(x_dim)+1, max(y_dim)+1, max(z_dim)+1])
+    return dict1.dimensions()
 
 # USED BY BOTH MODELS
 def dict_mins(dict1):
@@ -148,20 +135,12 @@ def dict_mins(dict1):
     Determines the minima of all coordinates. returns the minima for the 3
     axes separately. Returns a tuple with min x, y and z
     """
-    x_dim = []
-    y_dim = []
-    z_dim = []
-    for (i, j, k) in dict1.keys():
-        y_dim.append(j)
-        x_dim.append(i)
-        z_dim.append(k)
-    # add 1 to actually get the size of the model.
-    return tuple([min(x_dim), min(y_dim), min(z_dim)])
+    return dict1.mins()
 
 # USED BY BOTH MODELS
 def normalize_coords(model):
     """
-    Function which normalizes a given model (dictionary) to get a model with only
+    Function which normalizes a given model to get a model with only
     positive coordinates.
     Function takes the minimum of the 3 coordinate components. For each of them,
     shift all coordinates to make the smallest number 0(if the minimum is
@@ -178,10 +157,8 @@ def normalize_coords(model):
         shift_vals[1] = abs(min_coords[1])
     if min_coords[2] < 0:
         shift_vals[2] = abs(min_coords[2])
-    # iterate through the model and copy the items into another dict with updated coordinates.
-    shifted_model = {}
-    for (x_co, y_co, z_co), value in model.items():
-        shifted_model[x_co + shift_vals[0], y_co + shift_vals[1], z_co + shift_vals[2]] = value
+    # copy the items into another model with updated coordinates.
+    shifted_model = model.shifted(shift_vals)
     if PRINT_MODEL:
         print("normalized model: ", shifted_model)
     return shifted_model
@@ -191,34 +168,9 @@ def normalize_coords(model):
 def print_models(model_list):
     """
     Prints all models in a given model_list the way they should look.
-    Uses matplotlib scatterplot.
-    """
-    plt.ioff()
-    fig = plt.figure()
-    model_objects = {'[]':'s', 'V': '^', 'O': 'o', 'I': '|', '+': 'X',
-                     'L': '$L$', 'A': '$A$','B': '$B$','C': '$C$','D': '$D$',
-                     '^': '$V$', '*': '*', 'S': '$S$'}
-    # compute the square root from the number of elements and then adjust the
-    # size for the grid to fit the number of models.
-    rows_cols = int(np.sqrt(len(model_list))+0.5)+1
-    #print("rows_cols ", rows_cols)
-    # iterate through the models
-    for index, model in enumerate(model_list):
-        ax_ = fig.add_subplot(rows_cols, rows_cols, index+1, projection='3d')
-        ax_.set_xlabel('X-Axis')
-        ax_.set_ylabel('Y-Axis')
-        ax_.set_zlabel('Z-Axis')
-        for (x_co, y_co, z_co), value in model.items():
-            if isinstance(value, list):
-                #model_obj = ''
-                for item in value:
-                    ax_.scatter(x_co, y_co, z_co, s=50, marker=model_objects[item])
-                    ax_.annotate("test", (x_co, y_co))
-
-                # print("double item found in model:", model_obj)
-            else:
-                ax_.scatter(x_co, y_co, z_co, s=40, marker=model_objects[value])
-    # print an asnwer or sth. like that
-    #fig.text(.5, .05, answer, ha='center')
-    fig.text(.5, .05, "all created models in their creation order", ha='center')
-    plt.show()
+    The plotting is done in the visualization module, which is only imported
+    when models are printed. This way matplotlib isn't loaded together with
+    the reasoner.
+    """
+    from spatial_reasoner import visualization
+    visualization.print_models(model_list)
@@ -5,8 +5,6 @@ model is not usable with this module.
 @author: Christian Breu <breuch@web.de>
 '''
 
-from copy import deepcopy
-
 import random
 
 import unittest
@@ -17,6 +15,14 @@ from spatial_reasoner import low_level_functions_param as helper
 
 from spatial_reasoner import verification_answer_param as ver_ans
 
+from spatial_reasoner import problem_cache
+
+from spatial_reasoner import constraint_oracle
+
+from spatial_reasoner.spatial_model import SpatialModel
+
+from spatial_reasoner.interpret_result import InterpretResult
+
 # GLOBAL VARIABLES
 
 # Global variable capacity illustrating the working memory (how many different models can be
@@ -30,6 +36,40 @@ PRINT_MODEL = False # global variable for whether to print model construction pr
 
 PRINT_INDIVIDUAL = False # global variable for whether to print all active individualizations.
 
+# global variable for whether to cache the answers of the model construction(see problem_cache)
+USE_CACHE = True
+
+
+def participant_rng(participant_id, seed=0):
+    """
+    Returns a random number generator for the guessing of one participant. The
+    generator only depends on the id of the participant and the seed, so the
+    answers of a participant are the same in serial and parallel runs.
+    """
+    return random.Random("{}:{}".format(seed, participant_id))
+
+
+class _ReplayRandom:
+    """
+    Random number generator that is used by MainModule.answer_distribution to go
+    through all outcomes of the guessing. The first calls of randint return the
+    given values, further calls return the lowest value. The range of each call is
+    recorded.
+    """
+    def __init__(self, values):
+        self.values = values
+        self.calls = [] # (low, high) of each call of randint
+
+    def randint(self, low, high):
+        """
+        Returns the next given value, or low if all given values are used.
+        """
+        self.calls.append((low, high))
+        if len(self.calls) <= len(self.values):
+            return self.values[len(self.calls) - 1]
+        return low
+
+
 class MainModule:
     """
     Main module for the individualized spatial model. The interpret function now
@@ -74,17 +114,27 @@ class MainModule:
     There is only one order for verifying the conflicting PREMISES that occur,
     so there are different models with a different outcome probably left out.
     """
+    def __init__(self, rng=None):
+        """
+        rng is the random number generator for the guessing(e.g. participant_rng).
+        If no generator is given, the global random module is used like before.
+        """
+        if rng is None:
+            rng = random
+        self.rng = rng
 
 # ---------------------------- SPATIAL MODEL FUNCTIONS --------------------------------------------
 
-    def interpret_spatial_parameters(self, prem, parameters):
+    def interpret_spatial_parameters(self, prem, parameters, full_result=False):
         """
         *This function can only be used for verification tasks*
         New version of interpret_spatial. does not use the parser.
         Parameters contains all the parameters to decide which individualisation
-        should be activated or not. Checks position (20, 20, 20) to get the answer
-        to the problem, when there is one.
-        Returns only the answer and doesn't print the model.
+        should be activated or not. Checks the answer of the InterpretResult of each
+        premise to get the answer to the problem, when there is one.
+        Returns only the answer and doesn't print the model. If full_result is True,
+        an InterpretResult with the final models, the answer and the statistics of
+        all premises is returned instead(the cache is not used then).
         The answer will be false, when at least one question premise couldn't be
         verified.
         There are 11 parameters with a boolean value. The first 6 parameters are
@@ -113,42 +163,12 @@ class MainModule:
             Returns the boolean value of the anwer for all verification problems
         """
         #first check whether the problem should be solved by another method(guessing/verbal memory)
-        if parameters[1][0]: # check for verbal memory
-            if PRINT_INDIVIDUAL:
-                print("verbal memory use")
-            if prem[-1][0] in ["A", "B", "C", "D"]:
-                #print("check with verbal memory")
-                return self.verbal_memory(prem[:-1], prem[-1])
-            if len(prem) == 8:
-                #the problem is from the trees experiment
-                verb_premises = prem[:4] # the first 4 premises are for the task
-                for q_prem in prem[4:]: #iterate over all question premises
-                    #print("check premise: ", q_prem, "with ", verb_premises)
-                    if not self.verbal_memory(verb_premises, q_prem):
-                        return False # at least one of the premises does not hold
-                return True # no premise could be falsified with the verb. memory.
-        #check for guessing
-        if parameters[1][1]:
-            if PRINT_INDIVIDUAL:
-                print("guessing with question: ", prem[-1])
-            # the standard modell NOTE: ONlY FOR CERTAIN DATA!!!!
-            # checks if the question premise is about  A,B,C or D
-            if prem[-1][0] in ["A", "B", "C", "D"]:
-                # the standard model for certain types of experiments.
-                model1 = {(0, 0, 0): 'A', (1, 0, 0): 'B', (2, 0, 0): 'C', (3, 0, 0): 'D'}
-                prem[-1][1] = self.parse_relation(prem[-1])
-                if ver_ans.verify_spatial(prem[-1], model1) is not None:
-                    return True # the question premise holds in the standard model
-                return False
-            #real guessing for the second experiment(trees/fruits)
-            #+print("guessing for second experiment: verify")
-            if random.randint(1, 10) < 5:
-                return True
-            return False
+        answer = self.verification_strategy(prem, parameters[1])
+        if answer is not None:
+            if full_result:
+                return InterpretResult([], answer)
+            return answer
         # no Parser
-        mods = []  # list of models
-        all_mods = []
-        answer = None # The answer that will be returned at the end
         # iterate over the list of PREMISES, return models when done
         for pre_ in prem:
             if PRINT_MODEL:
@@ -158,35 +178,23 @@ class MainModule:
             if PRINT_MODEL:
                 print("parsed premise: ", pre_)
             #print(parameters[0][:2])
-        for pre_ in prem:
-            mods = self.decide_spatial(pre_, mods, prem, parameters[0][:2],
-                                       parameters[1][2:]) # New! add other parameters
-            parameters[0] = parameters[0][2:]
-            #print(parameters[0])
-            if mods[0].get((20, 20, 20)) == "T" and answer is not False:
-                answer = True # The answer for the problem can only become True,
-                # if no previous verify returned a negative value.
-            elif mods[0].get((20, 20, 20)) == "F":
-                answer = False
-            #only preparation to print a model
-            #mods[0] = helper.normalize_coords(mods[0])
-            #mods[0] = modify.shrink_dict(mods[0])
-            # list for all models
-            all_mods.append(deepcopy(mods[0]))
-            if PRINT_MODEL:
-                print("current models after decide_spatial: ", mods)
-        # print out models in the list.
-        if PRINT_MODEL:
-            print("list of all resulting Models")
-            print(all_mods)
-        return answer # return only the answer, not the model(s)
+        # check if the answer for the problem is already known
+        cache_key = None
+        if USE_CACHE and not PRINT_MODEL and not full_result:
+            cache_key = problem_cache.answer_key(prem, parameters[0], parameters[1][2:])
+        result = self.construct_verification(prem, parameters, cache_key)
+        if full_result:
+            return result
+        return result.answer # return only the answer, not the model(s)
 
-    def interpret_spatial2exp_parameters(self, prem, parameters):
+    def interpret_spatial2exp_parameters(self, prem, parameters, full_result=False):
         """
         *Only for singel choiceproblems.*
         In this experiment, the participants had to choose an answer so the
         return value of the interpret function can't be True or False. The function
         returns the first question premise that evaluates to true in verify.
+        If full_result is True, an InterpretResult with the final models, the answer
+        and the statistics of all premises is returned instead(the cache is not used then).
         There are 11 parameters with a boolean value. The first 6 parameters are
         for understanding the premise and for correctly building the model in
         the 3 steps. Parameter 1,3,5 are for understanding the premises. Parameter
@@ -213,83 +221,33 @@ class MainModule:
             Returns the answer premise for the given problem
         """
         #first check whether the problem should be solved by another method(guessing/verbal memory)
-        if parameters[1][0]: # check for verbal memory
-            if PRINT_INDIVIDUAL:
-                print("verbal memory use")
-            question_prem = prem[2:]
-            model_prem = prem[:2]
-            for q_p in question_prem:
-                for m_p in model_prem:
-                    # check if the two lists are the same
-                    if q_p[0] == m_p[0] and q_p[1] == m_p[1] and q_p[2] == m_p[2]:
-                        #print("found the answer in the premises")
-                        ans_rel = m_p[1]
-                        m_p[1] = m_p[0]
-                        m_p[0] = ans_rel
-                        #print("answer with verbal: ", [m_p])
-                        return [m_p]
-            # the premise could'nt be found, guess an answer.
-            possible_ans = prem[-8:]
-            #print(possible_ans, "possible answers for guessing")
-            rand = random.randint(0, 7)
-            ans = possible_ans[rand]
-            ans_rel = ans[1]
-            ans[1] = ans[0]
-            ans[0] = ans_rel
-            #print("answer with verb: ", [ans])
-            return [ans]
-        #check for guessing
-        if parameters[1][1]:
-            if PRINT_INDIVIDUAL:
-                print("guessing with question: ", prem)
-            possible_ans = prem[-8:]
-            #print(possible_ans, "possible answers for guessing")
-            rand = random.randint(0, 7)
-            ans = possible_ans[rand]
-            ans_rel = ans[1]
-            ans[1] = ans[0]
-            ans[0] = ans_rel
-            #print("answer with guessing: ", [ans])
-            return [ans]
+        answer = self.single_choice_strategy(prem, parameters[1])
+        if answer is not None:
+            if full_result:
+                return InterpretResult([], answer)
+            return answer
         # no Parser
-        mods = []  # list of models
-        all_mods = []
-        answer = None # The answer that will be returned at the end
         # iterate over the list of PREMISES, return models when done
-        prems = deepcopy(prem)
-        for pre_ in prems:
+        # parsed premises in new lists, the premises of the problem are kept for the answer.
+        prems = []
+        for pre_ in prem:
             if PRINT_MODEL:
                 print(pre_, "premise")
-            pre_[1] = self.parse_relation(pre_) # convert the relation into a tupel
-            if PRINT_MODEL:
-                print("parsed premise: ", pre_)
-        for pre_ in prem:
-            pr_ = deepcopy(pre_)
-            pr_[1] = self.parse_relation(pr_) # convert the relation into a tupel
-            mods = self.decide_spatial(pr_, mods, prems, parameters[0][:2], parameters[1][2:])
-            parameters[0] = parameters[0][2:]
-            #print(parameters[0])
-            if mods[0].get((20, 20, 20)) == "T" and answer is None:
-                answer = pre_ # this question premise was verified as true and therefore
-                # is the correct answer based on this model
-            # list for all models
-            all_mods.append(deepcopy(mods[0]))
+            # convert the relation into a tupel
+            prems.append([pre_[0], self.parse_relation(pre_), pre_[2]])
             if PRINT_MODEL:
-                print("current models after decide_spatial: ", mods)
-        # print out models in the list.
-        if PRINT_MODEL:
-            print("list of all resulting Models")
-            print(all_mods)
-        if answer is None:
-            possible_ans = prem[-8:]
-            rand = random.randint(0, 7)
-            answer = possible_ans[rand]
-        # re-format the answer to fit ccobra evaluation
-        ans_rel = answer[1]
-        answer[1] = answer[0]
-        answer[0] = ans_rel
+                print("parsed premise: ", prems[-1])
+        # check if the answer for the problem is already known. The index of the
+        # answer premise is cached.
+        cache_key = None
+        if USE_CACHE and not PRINT_MODEL and not full_result:
+            cache_key = problem_cache.answer_key(prems, parameters[0], parameters[1][2:], True)
+        result = self.construct_single_choice(prems, parameters, cache_key)
         # the answer has to fit the format of the ccobra evaluation
-        return [answer] # return only the answer, not the model(s)
+        answer = self.answer_premise(prem, result.answer)
+        if full_result:
+            return InterpretResult(result.models, answer, result.stats)
+        return answer # return only the answer, not the model(s)
 
     def interpret_spatial_parameters_old(self, prem, parameters):
         """
@@ -298,7 +256,7 @@ class MainModule:
         that do still use all 8 original parameters.
         New version of interpret_spatial. does not use the parser.
         The parameters parameter contains all the parameters to decide which individualisation
-        should be activated or not. Checks position (20, 20, 20) to get the answer, when there
+        should be activated or not. Checks the InterpretResult to get the answer, when there
         is one. Returns only the answer and doesn't print the model. The answer will be false,
         when at least one question premise couldn't be verified.
         There are 8 parameters with a boolean value. The first 6 parameters are for understanding
@@ -343,20 +301,18 @@ class MainModule:
             # checks if the question premise is about  A,B,C or D
             if prem[-1][0] in ["A", "B", "C", "D"]:
                 # the standard model for certain types of experiments.
-                model1 = {(0, 0, 0): 'A', (1, 0, 0): 'B', (2, 0, 0): 'C', (3, 0, 0): 'D'}
+                model1 = SpatialModel({(0, 0, 0): 'A', (1, 0, 0): 'B', (2, 0, 0): 'C',
+                                       (3, 0, 0): 'D'})
                 prem[-1][1] = self.parse_relation(prem[-1])
                 if ver_ans.verify_spatial(prem[-1], model1) is not None:
                     return True # the question premise holds in the standard model
                 return False
             #real guessing for the second experiment(trees/fruits)
             print("guessing for second experiment: verify")
-            if random.randint(1, 10) < 5:
+            if self.rng.randint(1, 10) < 5:
                 return True
             return False
         # no Parser
-        mods = []  # list of models
-        all_mods = []
-        answer = None # The answer that will be returned at the end
         # iterate over the list of PREMISES, return models when done
         for pre_ in prem:
             if PRINT_MODEL:
@@ -366,56 +322,350 @@ class MainModule:
             if PRINT_MODEL:
                 print("parsed premise: ", pre_)
             #print(parameters[0][:2])
-        for pre_ in prem:
-            mods = self.decide_spatial(pre_, mods, prem, parameters[0][:2])
-            parameters[0] = parameters[0][2:]
-            #print(parameters[0])
-            if mods[0].get((20, 20, 20)) == "T" and answer is not False:
+        # check if the answer for the problem is already known
+        cache_key = None
+        if USE_CACHE and not PRINT_MODEL:
+            cache_key = problem_cache.answer_key(prem, parameters[0], [])
+        # the old models don't use the alternative parameters
+        return self.construct_verification(prem, [parameters[0], []], cache_key).answer
+
+    def interpret_compiled(self, problem, parameters, full_result=False):
+        """
+        Interprets a compiled problem(see compiled_problem) with the given parameter
+        assignment. Works for verification and single choice problems and returns
+        the same answers as interpret_spatial_parameters and
+        interpret_spatial2exp_parameters, but the premises are not converted and
+        parsed again. The parameters are not changed.
+        If full_result is True, an InterpretResult with the final models, the answer
+        and the statistics of all premises is returned instead(the cache is not used then).
+        """
+        strategy = self.verification_strategy
+        if problem.single_choice:
+            strategy = self.single_choice_strategy
+        if parameters[1][0] or parameters[1][1]:
+            # the strategies work with the original premises and can change them
+            answer = strategy(problem.original_premises(), parameters[1])
+            if answer is not None:
+                if full_result:
+                    return InterpretResult([], answer)
+                return answer
+        cache_key = None
+        if USE_CACHE and not PRINT_MODEL and not full_result:
+            # the premises of the compiled problem are already in the canonical form
+            cache_key = problem_cache.parameter_key(problem.premises, parameters[0],
+                                                    parameters[1][2:], problem.single_choice)
+        if problem.single_choice:
+            result = self.construct_single_choice(problem.premise_list(), parameters,
+                                                  cache_key)
+            result.answer = self.answer_premise(problem.original_premises(), result.answer)
+        else:
+            result = self.construct_verification(problem.premise_list(), parameters,
+                                                 cache_key)
+        if full_result:
+            return result
+        return result.answer
+
+    def construct_verification(self, prem, parameters, cache_key=None):
+        """
+        Constructs the models for the parsed premises of a verification problem.
+        Returns an InterpretResult with the final models, the answer and the statistics.
+        The answer will be false, when at least one question premise couldn't be
+        verified. If cache_key is given, the answer is looked up in the answer cache
+        first(the result has no models then) and stored in it afterwards.
+        The parameters are not changed.
+        """
+        if cache_key is not None:
+            answer = problem_cache.ANSWER_CACHE.get(cache_key)
+            if answer is not problem_cache.MISSING:
+                return InterpretResult([], answer)
+        mods = []  # list of models
+        all_mods = []
+        answer = None # The answer that will be returned at the end
+        stats = InterpretResult(mods) # only used to sum up the statistics
+        for i, pre_ in enumerate(prem):
+            # each of the first premises uses two of the construction parameters
+            result = self.decide_spatial(pre_, mods, prem, parameters[0][2 * i:2 * i + 2],
+                                         parameters[1][2:]) # New! add other parameters
+            mods = result.models
+            stats.add_stats(result.stats)
+            if result.answer is True and answer is not False:
                 answer = True # The answer for the problem can only become True,
                 # if no previous verify returned a negative value.
-            elif mods[0].get((20, 20, 20)) == "F":
+            elif result.answer is False:
                 answer = False
-            # list for all models
-            all_mods.append(deepcopy(mods[0]))
+            #only preparation to print a model
+            #mods[0] = helper.normalize_coords(mods[0])
+            #mods[0] = modify.shrink_dict(mods[0])
             if PRINT_MODEL:
+                # list for all models, only kept to print them. The copy shares the
+                # cells with the model until it is changed.
+                all_mods.append(mods[0].copy())
                 print("current models after decide_spatial: ", mods)
         # print out models in the list.
         if PRINT_MODEL:
             print("list of all resulting Models")
             print(all_mods)
-        return answer # return only the answer, not the model(s)
+        if cache_key is not None:
+            problem_cache.ANSWER_CACHE.put(cache_key, answer)
+        return InterpretResult(mods, answer, stats.stats)
+
+    def construct_single_choice(self, prems, parameters, cache_key=None):
+        """
+        Constructs the models for the parsed premises of a single choice problem.
+        Returns an InterpretResult with the final models, the statistics and the
+        index of the first question premise that evaluates to true in verify as the
+        answer(None, if there is no such premise). If cache_key is given, the index is
+        looked up in the answer cache first(the result has no models then) and stored
+        in it afterwards. The parameters are not changed.
+        """
+        if cache_key is not None:
+            answer_index = problem_cache.ANSWER_CACHE.get(cache_key)
+            if answer_index is not problem_cache.MISSING:
+                return InterpretResult([], answer_index)
+        mods = []  # list of models
+        all_mods = []
+        answer_index = None
+        stats = InterpretResult(mods) # only used to sum up the statistics
+        for i, pr_ in enumerate(prems):
+            result = self.decide_spatial(pr_, mods, prems, parameters[0][2 * i:2 * i + 2],
+                                         parameters[1][2:])
+            mods = result.models
+            stats.add_stats(result.stats)
+            if result.answer is True and answer_index is None:
+                answer_index = i # this question premise was verified as true and
+                # therefore is the correct answer based on this model
+            if PRINT_MODEL:
+                # list for all models, only kept to print them. The copy shares the
+                # cells with the model until it is changed.
+                all_mods.append(mods[0].copy())
+                print("current models after decide_spatial: ", mods)
+        # print out models in the list.
+        if PRINT_MODEL:
+            print("list of all resulting Models")
+            print(all_mods)
+        if cache_key is not None:
+            problem_cache.ANSWER_CACHE.put(cache_key, answer_index)
+        return InterpretResult(mods, answer_index, stats.stats)
+
+    def answer_distribution(self, problem, parameters):
+        """
+        Returns the distribution of the answers to a compiled problem with the given
+        parameter assignment, as a list of (answer, probability) pairs. The answers
+        are in the format of interpret_compiled. Instead of drawing one random answer
+        for the guessing, the problem is interpreted with each outcome of the random
+        numbers, so the expected accuracy can be computed without repeated runs.
+        The model construction is cached, so only the first run builds the models.
+        """
+        distribution = []
+        rng = self.rng
+        open_runs = [([], 1.0)] # given random values and the probability of the run
+        try:
+            while open_runs:
+                values, probability = open_runs.pop()
+                self.rng = _ReplayRandom(values)
+                answer = self.interpret_compiled(problem, parameters)
+                if len(self.rng.calls) > len(values):
+                    # the run used a new random number, try all of its values
+                    low, high = self.rng.calls[len(values)]
+                    share = probability / (high - low + 1)
+                    for value in range(high, low - 1, -1):
+                        open_runs.append((values + [value], share))
+                    continue
+                for entry in distribution:
+                    if entry[0] == answer:
+                        entry[1] += probability
+                        break
+                else:
+                    distribution.append([answer, probability])
+        finally:
+            self.rng = rng
+        return [(answer, probability) for answer, probability in distribution]
+
+    def answer_probability(self, problem, parameters, response):
+        """
+        Returns the probability that the answer to the compiled problem is the given
+        response(the expected accuracy for this problem), see answer_distribution.
+        """
+        return sum([probability for answer, probability
+                    in self.answer_distribution(problem, parameters) if answer == response])
+
+    def answer_premise(self, prem, answer_index):
+        """
+        Returns the answer to a single choice problem in the format of the ccobra
+        evaluation([[relation, A, B]]). answer_index is the index of the answer premise
+        in prem. If there is no answer, one of the question premises is guessed.
+        """
+        if answer_index is None:
+            possible_ans = prem[-8:]
+            rand = self.rng.randint(0, 7)
+            answer = possible_ans[rand]
+        else:
+            answer = prem[answer_index]
+        # re-format the answer to fit ccobra evaluation
+        return [[answer[1], answer[0], answer[2]]]
+
+    def ground_truth(self, prem, questions=1):
+        """
+        *This function can only be used for verification tasks*
+        Returns the correct answer to the problem without building a model. The
+        premises are checked with the constraint oracle(see constraint_oracle), the
+        answer is True, if all question premises(the last questions premises) hold
+        in every model of the other premises. The premises are not changed.
+        Returns None, if the premises are inconsistent.
+        """
+        prems = [[pre_[0], self.parse_relation(pre_), pre_[2]] for pre_ in prem]
+        oracle = constraint_oracle.ConstraintOracle(prems[:-questions])
+        if not oracle.consistent():
+            return None
+        for question in prems[-questions:]:
+            if not oracle.necessary(question):
+                return False
+        return True
+
+    def verification_strategy(self, prem, other_params):
+        """
+        Checks whether a verification problem should be solved by another method than
+        the model construction(verbal memory or guessing). other_params is the second
+        parameter list of the parameter assignment.
+        Returns the answer of the method, or None, if no method is used and the
+        model needs to be constructed.
+        """
+        if other_params[0]: # check for verbal memory
+            if PRINT_INDIVIDUAL:
+                print("verbal memory use")
+            if prem[-1][0] in ["A", "B", "C", "D"]:
+                #print("check with verbal memory")
+                return self.verbal_memory(prem[:-1], prem[-1])
+            if len(prem) == 8:
+                #the problem is from the trees experiment
+                verb_premises = prem[:4] # the first 4 premises are for the task
+                # the premises are indexed once for all question premises
+                memory = self.verbal_memory_index(verb_premises)
+                for q_prem in prem[4:]: #iterate over all question premises
+                    #print("check premise: ", q_prem, "with ", verb_premises)
+                    if not self.verbal_memory(verb_premises, q_prem, memory):
+                        return False # at least one of the premises does not hold
+                return True # no premise could be falsified with the verb. memory.
+        #check for guessing
+        if other_params[1]:
+            if PRINT_INDIVIDUAL:
+                print("guessing with question: ", prem[-1])
+            # the standard modell NOTE: ONlY FOR CERTAIN DATA!!!!
+            # checks if the question premise is about  A,B,C or D
+            if prem[-1][0] in ["A", "B", "C", "D"]:
+                # the standard model for certain types of experiments.
+                model1 = SpatialModel({(0, 0, 0): 'A', (1, 0, 0): 'B', (2, 0, 0): 'C',
+                                       (3, 0, 0): 'D'})
+                prem[-1][1] = self.parse_relation(prem[-1])
+                if ver_ans.verify_spatial(prem[-1], model1) is not None:
+                    return True # the question premise holds in the standard model
+                return False
+            #real guessing for the second experiment(trees/fruits)
+            #+print("guessing for second experiment: verify")
+            if self.rng.randint(1, 10) < 5:
+                return True
+            return False
+        return None # no strategy is used, the model has to be constructed
+
+    def single_choice_strategy(self, prem, other_params):
+        """
+        Checks whether a single choice problem should be solved by another method than
+        the model construction(verbal memory or guessing). other_params is the second
+        parameter list of the parameter assignment.
+        Returns the answer of the method in the format of interpret_spatial2exp_parameters,
+        or None, if no method is used and the model needs to be constructed.
+        """
+        if other_params[0]: # check for verbal memory
+            if PRINT_INDIVIDUAL:
+                print("verbal memory use")
+            question_prem = prem[2:]
+            # the model premises by their content, the first one is used for duplicates
+            model_prem = {}
+            for m_p in prem[:2]:
+                model_prem.setdefault((m_p[0], m_p[1], m_p[2]), m_p)
+            for q_p in question_prem:
+                # check if there is a model premise that is the same as the question premise
+                m_p = model_prem.get((q_p[0], q_p[1], q_p[2]))
+                if m_p is not None:
+                    #print("found the answer in the premises")
+                    ans_rel = m_p[1]
+                    m_p[1] = m_p[0]
+                    m_p[0] = ans_rel
+                    #print("answer with verbal: ", [m_p])
+                    return [m_p]
+            # the premise could'nt be found, guess an answer.
+            possible_ans = prem[-8:]
+            #print(possible_ans, "possible answers for guessing")
+            rand = self.rng.randint(0, 7)
+            ans = possible_ans[rand]
+            ans_rel = ans[1]
+            ans[1] = ans[0]
+            ans[0] = ans_rel
+            #print("answer with verb: ", [ans])
+            return [ans]
+        #check for guessing
+        if other_params[1]:
+            if PRINT_INDIVIDUAL:
+                print("guessing with question: ", prem)
+            possible_ans = prem[-8:]
+            #print(possible_ans, "possible answers for guessing")
+            rand = self.rng.randint(0, 7)
+            ans = possible_ans[rand]
+            ans_rel = ans[1]
+            ans[1] = ans[0]
+            ans[0] = ans_rel
+            #print("answer with guessing: ", [ans])
+            return [ans]
+        return None # no strategy is used, the model has to be constructed
+
+    def verbal_memory(self, premises, question, memory=None):
+        """checks if the question can be answered by only knowing all premises. Looks
+        for the first premise that contains both elements from the question(in any
+        order). If such a premise can be found, an answer can be returned based on the
+        information in the premise. If no such premise can be found, returns false as
+        the answer.
+        The premises are looked up in the index of verbal_memory_index, memory can be
+        an index of the premises that was built before(e.g. for several questions).
+        """
+        if memory is None:
+            memory = self.verbal_memory_index(premises)
+        entry = memory.get(frozenset((question[0], question[2])))
+        if entry is None:
+            return False # no premise could be found which contains the information to answer
+        prem, p_rel = entry
+        # now compute the answer
+        if question[1] == prem[1]:
+            # relation is equal. True if the exact same premise to the question exists,
+            # otherwise prem has information contrary to the question
+            return question[0] == prem[0] and question[2] == prem[2]
+        #relation is not the same, check if the premise and question is inverted
+        q_rel = self.parse_relation(question)
+        #print("check for inverted relations with: ", q_rel, p_rel)
+        return (helper.list_equal(helper.invert_relation(q_rel), p_rel) and (
+            question[2] == prem[0] and question[0] == prem[2]))
 
-    def verbal_memory(self, premises, question):
-        """checks if the question can be answered by only knowing all premises. Iterates
-        through a given list of premises and checks if both elements from the question
-        are contained in each premise. If such a premise can be found, an answer can be
-        returned based on the information in the premise. If no such premise can be found,
-        returns false as the answer.
+    def verbal_memory_index(self, premises):
         """
+        Returns the index of the premises for the verbal memory: the unordered pair of
+        the subject and the object(frozenset) -> (premise, parsed relation) of the
+        first premise about these items. Each single item is a key as well, for
+        questions about the same item as subject and object.
+        """
+        memory = {}
         for prem in premises:
-            if question[0] in prem and question[2] in prem:
-                # now compute the answer
-                if question[1] == prem[1]:
-                    # relation is equal
-                    if question[0] == prem[0] and question[2] == prem[2]:
-                        return True #the exact same premise to the question exists.
-                    return False # prem has information contrary to the question
-                if question[1] != prem[1]:
-                    #relation is not the same, check if the premise and question is inverted
-                    q_rel = self.parse_relation(question)
-                    p_rel = self.parse_relation(prem)
-                    #print("check for inverted relations with: ", q_rel, p_rel)
-                    if (helper.list_equal(helper.invert_relation(q_rel), p_rel) and (
-                            question[2] == prem[0] and question[0] == prem[2])):
-                        return True
-                    return False # prem has information contrary to the question
-        return False # no premise could be found which contains the information to answer
+            entry = (prem, self.parse_relation(prem))
+            for key in (frozenset((prem[0], prem[2])), frozenset((prem[0],)),
+                        frozenset((prem[2],))):
+                memory.setdefault(key, entry)
+        return memory
 
     @staticmethod
     def parse_relation(premise):
         """ 3-tuple really needed?
         Function that only parses a given Relation into a 3 tuple of
         coordinates that represent the direction of the relation.
+        The words front, behind, above and below of the sentences of the original
+        spatial model are parsed like in its lexicon.
         """
         relation_string = premise[1].split("-") # split the relation(for the 3rd experiment)
         relation = [0, 0, 0]
@@ -431,6 +681,14 @@ class MainModule:
                 relation[1] += 1
             elif relation_part == "south":
                 relation[1] -= 1
+            elif relation_part == "front":
+                relation[1] += 1
+            elif relation_part == "behind":
+                relation[1] -= 1
+            elif relation_part == "above":
+                relation[2] -= 1
+            elif relation_part == "below":
+                relation[2] += 1
         return (relation[0], relation[1], relation[2]) # return the resulting relation as a tuple
 
     def alt_insert(self, coordinates, relation, object1, model):
@@ -442,7 +700,7 @@ class MainModule:
         So B is the moved in the x axis by the relation.
         """
         # create new model to later insert all objects with the fixed coordinates.
-        new_model = {}
+        new_model = SpatialModel()
         # find out in which dimension the objects need to be moved
         # works also for two dimensional models and two dimensional relations
         if relation[0] != 0:
@@ -452,29 +710,28 @@ class MainModule:
         else:
             dimension_index = 2
         # first, move all objects by the relation from coordinates onwards
-        for coord in model.keys():
+        for coord, value in model.items():
             # iterate over the coordinates to check, wheter to  move the object or not.
             if relation[dimension_index] > 0:
                 # the relation is positive, search for bigger values than the coordinates
                 if coord[dimension_index] > coordinates[dimension_index]:
                     # the object needs to be moved in the corresponding dimension with the relation
                     new_coord = helper.tuple_add(coord, relation)
-                    new_model[new_coord] = deepcopy(model[coord])
+                    new_model[new_coord] = value
                     #print("new_coord at index", new_coord, "relation at index: ", relation)
                 else:
                     # copy the object to the new model normaly
-                    new_model[coord] = deepcopy(model[coord])
+                    new_model[coord] = value
             elif relation[dimension_index] < 0:
                 # the relation is positive, search for bigger values than the coordinates
                 if coord[dimension_index] < coordinates[dimension_index]:
                     # the object needs to be moved in the corresponding dimension with the relation
                     new_coord = helper.tuple_add(coord, relation)
-                    new_model[new_coord] = deepcopy(model[coord])
+                    new_model[new_coord] = value
                     #print("new_coord at index", new_coord, "relation at index: ", relation)
-                    new_model[new_coord] = deepcopy(model[coord])
                 else:
                     # copy the object to the new model normaly
-                    new_model[coord] = deepcopy(model[coord])
+                    new_model[coord] = value
         new_obj_co = helper.tuple_add(coordinates, relation)
         new_model[new_obj_co] = object1 # add the actual object to insert
         return new_model
@@ -491,7 +748,8 @@ class MainModule:
         calls helper function choose_function_spatial to decide_spatial what should
         be done depending on the
         premise and the current models.(see documentation of ddci for more detail)
-        returns list of current models as a result of choose_function_spatial.
+        returns the InterpretResult of choose_function_spatial with the list of
+        current models.
         """
         # check if alt_params is not None
         if len(alt_params) < 3:
@@ -530,23 +788,22 @@ class MainModule:
         if obj_mod in models:
             models.remove(obj_mod)
         #print("s_co and o_co:", s_co, o_co)
-        if not models:
-            # always uses just the preffered model to give the answer!
-            return [self.choose_function_spatial(proposition, s_co, o_co, relation, subject,
-                                                 object1, subj_mod, obj_mod,
-                                                 premises, param, alt_params)]
-
-        models.insert(0, self.choose_function_spatial(proposition, s_co, o_co, relation,
-                                                      subject, object1, subj_mod, obj_mod,
-                                                      premises, param, alt_params))
-        return models
+        # always uses just the preffered model to give the answer!
+        result = self.choose_function_spatial(proposition, s_co, o_co, relation, subject,
+                                              object1, subj_mod, obj_mod, premises, param,
+                                              alt_params)
+        # the new model is the first model in the list of the current models
+        models.insert(0, result.model)
+        result.models = models
+        return result
 
     def choose_function_spatial(self, proposition, s_co, o_co, relation, subject,
                                 object1, subj_mod, obj_mod, premises, param,
                                 alt_params):
         """
-        Modifications: add "T" or "F" to the model at a certain position to be able
-        to retrieve the answer later on without changing the return type of the function.
+        Modifications: returns an InterpretResult with the resulting model. If the
+        premise was verified, the result contains the answer(True or False), instead
+        of adding "T" or "F" to the model at a certain position.
         takes a premise(proposition), subject-and object coordinates, a subject and
         an object and their models in which they are contained.
         deletes the models from the models list, if they contain the subj. or obj.
@@ -574,9 +831,8 @@ class MainModule:
                             #print("try make false")
                             return ver_ans.make_false(proposition, subj_mod, premises)
                         #print("valid(pref_mod)")
-                        subj_mod[(20, 20, 20)] = "T" #add The T(true) as the answer to the model
-                        # in the interpret function, this position will be checked.
-                        return subj_mod # return True if the model does not try to falsify
+                        # return True if the model does not try to falsify
+                        return InterpretResult([subj_mod], True)
                     # try to make all PREMISES hold
                     if PRINT_MODEL:
                         print("verify returns false, the premise is invalid")
@@ -584,8 +840,8 @@ class MainModule:
                         #print("try make tue", proposition)
                         return ver_ans.make_true(proposition, subj_mod, premises)
                     #print("incorrect(pref_mod)")
-                    subj_mod[(20, 20, 20)] = "F" # add The F(false) as the answer to the model
-                    return subj_mod # return false beacause the model does not try to verify
+                    # return false beacause the model does not try to verify
+                    return InterpretResult([subj_mod], False)
                 # subj and obj both already exist, but in different models
                 if PRINT_MODEL:
                     print("combine")
@@ -607,7 +863,7 @@ class MainModule:
                     comb_model[(1, 0, 0)] = comb_model[(2, 0, 0)]
                     comb_model[(2, 0, 0)] = obj1
                     #print("swapped model: ", comb_model)
-                return comb_model
+                return InterpretResult([comb_model])
             if PRINT_MODEL:
                 print("add object to the model")
                 # convert relation because the object is added
@@ -622,8 +878,10 @@ class MainModule:
             if alt_params[1]:
                 # use the alternative version of insert
                 #print("alt insert")
-                return self.alt_insert(s_co, helper.convert(relation), object1, subj_mod)
-            return construct.add_item(s_co, helper.convert(relation), object1, subj_mod)
+                return InterpretResult([self.alt_insert(s_co, helper.convert(relation), object1,
+                                                        subj_mod)])
+            return InterpretResult([construct.add_item(s_co, helper.convert(relation), object1,
+                                                       subj_mod)])
         # object != Null but subject doesn't exist at this point
         if o_co is not None:
             if PRINT_MODEL:
@@ -635,8 +893,8 @@ class MainModule:
             if alt_params[1]:
                 # use the alternative version of insert
                 #print("alt insert")
-                return self.alt_insert(o_co, relation, subject, obj_mod)
-            return construct.add_item(o_co, relation, subject, obj_mod)
+                return InterpretResult([self.alt_insert(o_co, relation, subject, obj_mod)])
+            return InterpretResult([construct.add_item(o_co, relation, subject, obj_mod)])
         # sub and ob doesn't exist at the moment
         if PRINT_MODEL:
             print("startmod")
@@ -645,7 +903,7 @@ class MainModule:
             if PRINT_INDIVIDUAL:
                 print("param add item")
             relation = helper.invert_relation(relation)
-        return construct.startmod(relation, subject, object1)
+        return InterpretResult([construct.startmod(relation, subject, object1)])
 
 #-----------------------------Experimental Problem Set(figural effect)--------------------------
 #figural effect: the order/arrangement of l and r relations in the premises.
@@ -848,6 +1106,33 @@ class Tests(unittest.TestCase):
                          (-1, -1, 0))
         self.assertEqual(model.parse_relation(["A", "north-east", "B"]),
                          (1, 1, 0))
+        self.assertEqual(model.parse_relation(["A", "above", "B"]),
+                         (0, 0, -1))
+
+    def test_answer_distribution(self):
+        """Tests the distribution of the guessed answers and the seeded generators.
+        """
+        from spatial_reasoner import compiled_problem
+        model = MainModule()
+        verify = compiled_problem.compile_premises(
+            [["apple", "north", "pear"], ["pear", "east", "kiwi"], ["apple", "north", "kiwi"],
+             ["kiwi", "south", "pear"]], 4)
+        guessing = [[False] * 6, [False, True, False, False, False]]
+        self.assertEqual(model.answer_distribution(verify, guessing), [(True, 0.4),
+                                                                        (False, 0.6)])
+        choice = compiled_problem.compile_premises(
+            [["A", "north", "B"], ["B", "north", "C"]] + [["A", rel, "C"] for rel in
+                                                        ("north", "south", "east", "west",
+                                                         "north-east", "north-west",
+                                                         "south-east", "south-west")], 8, True)
+        self.assertEqual(model.answer_distribution(choice, [[False] * 6, [False] * 5]),
+                         [([["north", "A", "C"]], 1.0)])
+        self.assertAlmostEqual(model.answer_probability(choice, [[False] * 6, guessing[1]],
+                                                        [["south", "A", "C"]]), 0.125)
+        answers = [MainModule(participant_rng(7)).interpret_compiled(choice, [[False] * 6,
+                                                                             guessing[1]])
+                   for _ in range(2)]
+        self.assertEqual(answers[0], answers[1])
 
     def test_verbal_memory(self):
         """Tests the verbal memory function.
@@ -858,6 +1143,10 @@ class Tests(unittest.TestCase):
         self.assertEqual(model.verbal_memory(task_premises, question_premise), False)
         task_premises = [["B", "R", "A"], ["C", "R", "A"], ["C", "L", "D"], ["A", "L", "D"]]
         self.assertEqual(model.verbal_memory(task_premises, question_premise), True)
+        memory = model.verbal_memory_index(task_premises)
+        self.assertEqual(model.verbal_memory(task_premises, ["D", "R", "C"], memory), True)
+        self.assertEqual(model.verbal_memory(task_premises, ["A", "L", "C"], memory), True)
+        self.assertEqual(model.verbal_memory(task_premises, ["A", "R", "B"], memory), False)
 
     def test_altinsert(self):
         """Tests the alternative insertion
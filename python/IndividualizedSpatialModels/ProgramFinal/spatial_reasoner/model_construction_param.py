@@ -6,10 +6,10 @@ Created on 16.07.2018
 STATUS: Funktionsaufrufe müssen evtl geupdatet werden
 '''
 
-import copy
-
 from spatial_reasoner import low_level_functions_param as helper
 
+from spatial_reasoner.spatial_model import SpatialModel
+
 
 PRINT_BACKTRACK = False
 
@@ -20,13 +20,13 @@ PRINT_BACKTRACK = False
 def startmod(relation, subj, obj):
     """
     Function constructs a new model out of a given subject, object and relation from a
-    premise. It creates an empty dictionary, then adds the object and the subject of the
-    proposition as a new dictionary entry with "add_item" (was add_it in v.1).
+    premise. It creates a new model with the object at the origin, then adds the subject
+    of the proposition with "add_item" (was add_it in v.1).
     Returns the resulting Model.
     """
     if PRINT_BACKTRACK:
         print("startmod with rel,sub, obj:", relation, subj, obj)
-    model = {(0, 0, 0): obj} # add the obj to the origin directly
+    model = SpatialModel({(0, 0, 0): obj}) # add the obj to the origin directly
     # put subject at appropriate relation to object
     model = add_item((0, 0, 0), relation, subj, model)
     if PRINT_BACKTRACK:
@@ -41,47 +41,43 @@ def add_item(coordinates, relation, item, model):
     (relation and coordinates need to be tuples). Adds the relation to the coordinates
     in order to get the real coordinates that the item should have in the model by calling
     tuple_add.
-    If the relation is (0, 0, 0), gets the item at the target coordinates, if there is
-    an element, and concatenates item and this element. If the slot is still empty, the item
-    is simply inserted at this slot and afterwards the model is returned.
-    If the relation wasn´t (0, 0, 0), search for the first empty slot (by adding the relation
-    to the target coordinates until a free slot is reached), and insert the item.
+    If the relation is (0, 0, 0), the item is added to the target coordinates, the model
+    takes care of putting it together with an item that might already be there.
+    Afterwards the model is returned.
+    If the relation wasn´t (0, 0, 0), search for the first empty slot (the first free slot
+    that is reached by adding the relation to the target coordinates, see
+    SpatialModel.next_free), and insert the item.
     """
     target_coords = helper.tuple_add(coordinates, relation) # NOT IN TEMPORAL
     if PRINT_BACKTRACK:
         print("add_item: coords:", coordinates, "rel", relation, "--> target",
               target_coords, "item", item, "mod", model)
     if relation == (0, 0, 0):
-        # check if there is already an object at the given coords.
-        if model.get(target_coords) is not None:
-            if isinstance(model.get(target_coords),list):
-                model_item = model.get(target_coords)
-                model_item.append(item)
-                item = model_item
-            else:
-                item = [item, model.get(target_coords)] # add the item to the already existing one
-        model[target_coords] = item                 # add the item to the model at the coords
+        model.add(target_coords, item) # add the item to the model at the coords
         return model
     # check if there is another object at the current coords.
-    while model.get(target_coords) is not None:
-        # search the first free spot in the correlating axis in the model.
-        # add the relation to coords until a free spot is found.
-        target_coords = helper.tuple_add(target_coords, relation)
+    # search the first free spot in the correlating axis in the model.
+    # (the model searches its line index, instead of adding the relation to the
+    # coords until a free spot is found)
+    target_coords = model.next_free(target_coords, relation)
     if PRINT_BACKTRACK:
         print("add the item at coords:, ", item, target_coords)
-    model2 = copy.deepcopy(model) # NEW FOR TEMPORAL
-    model2[target_coords] = item # add the item to the model
+    model2 = model.copy() # NEW FOR TEMPORAL
+    model2.add(target_coords, item) # add the item to the model
     return model2
 
 # USED BY BOTH MODELS
 def combine(relation, s_co, o_co, subj_mod, obj_mod): # same as SPATIAL
     """
-    New version of combine with dictionaries.
+    New version of combine with spatial models.
     Function combines the subject model and the object model in a way that the relation
     between the subject and the object is satisfied.
     Calls dimensions_n_orig to find out what the new dimensions and origins
     need to be. Then the coordinates of all objects in both models are
-    shifted according to the new dimensions.
+    shifted according to the new dimensions. Shifting only changes the offset
+    of the models, so only the items of the smaller model are inserted into the
+    larger one. Items of the object model replace items of the subject model at
+    the same coordinates.
     returns the combined model.
     """
     if PRINT_BACKTRACK:
@@ -103,11 +99,16 @@ def combine(relation, s_co, o_co, subj_mod, obj_mod): # same as SPATIAL
     new_obj_mod = shift_origin_dict(obj_mod, new_obj_orig)
     if PRINT_BACKTRACK:
         print("Combine: after origin update, subj is: ", new_subj_mod, "obj is", new_obj_mod)
-    # just put the two dicts together to get the full combined model
-    new_subj_mod.update(new_obj_mod)
+    # put the smaller model into the larger one to get the full combined model
+    if len(new_subj_mod) >= len(new_obj_mod):
+        new_subj_mod.update(new_obj_mod)
+        combined_mod = new_subj_mod
+    else:
+        new_obj_mod.update(new_subj_mod, overwrite=False)
+        combined_mod = new_obj_mod
     if PRINT_BACKTRACK:
-        print("Combine: combined model is: ", new_subj_mod)
-    return new_subj_mod
+        print("Combine: combined model is: ", combined_mod)
+    return combined_mod
 
 # USED BY BOTH MODELS
 def find_new_origin_dict(relation, sub_dims, obj_dims, s_co, o_co):
@@ -172,12 +173,8 @@ def ortho(sub_cord, obj_cord): # same as spatial # Doc anpassen
 # USED BY BOTH MODELS
 def shift_origin_dict(dictionary1, origin_list):
     """
-    New version of "new_origin" used for dictionaries.
+    New version of "new_origin" used for spatial models.
     Shifts all coordinates of the elements in the model by the number given in origin_list.
     Returns the model with all items shifted according to new origin.
     """
-    new_dict = {}
-    for (x_co, y_co, z_co) in dictionary1.keys():
-        new_dict[x_co+origin_list[0], y_co+origin_list[1], z_co+origin_list[2]
-                ] = dictionary1[(x_co, y_co, z_co)]
-    return new_dict
+    return dictionary1.shifted(origin_list)
@@ -5,16 +5,18 @@ Created on 16.07.2018
 @author: Christian Breu <breuch@web.de>, Julia Mertesdorf<julia.mertesdorf@web.de>
 '''
 
-from copy import deepcopy
+import bisect
 
 from spatial_reasoner import model_construction_param as model_builder
 
 from spatial_reasoner import low_level_functions_param as helper
 
+from spatial_reasoner.spatial_model import SpatialModel
+
 PRINT_MODIFY = False
 
 def move(item, item_coord, relation, other_coord, model):
-    """new version of move for dictionaries. item_coord and other coord must
+    """new version of move for spatial models. item_coord and other coord must
     be tuples.
     Removes the item at the specified coordinates from the model, then computes
     a new position by calling new_posn. The new position satisfies the relation,
@@ -27,23 +29,10 @@ def move(item, item_coord, relation, other_coord, model):
     if PRINT_MODIFY:
         print("move with: item, item_coord, relation, other_coord, model: ", item,
               item_coord, relation, other_coord, model)
-    # use deepcopy to not manipulate the original model
-    move_model = deepcopy(model)
-    # remove the item
-    item_in_mod = move_model[item_coord]
-    if isinstance(item_in_mod, list):
-        if PRINT_MODIFY:
-            print("move: special case: the item at the item_coords are a list")
-        item_in_mod.remove(item)
-        # if the list contains only one item now, remove the list aswell.
-        if len(item_in_mod) == 1:
-            move_model[item_coord] = item_in_mod[0]
-        else:
-            # in this case there are still more items in at the specified coordinates.
-            move_model[item_coord] = item_in_mod
-    else:
-        #the usual case, the item of the model is just a single item(string)
-        move_model.pop(item_coord)
+    # use a copy to not manipulate the original model
+    move_model = model.copy()
+    # remove the item, the model removes the whole cell if no other item is left there.
+    move_model.remove(item_coord, item)
     # basic idea: just add the item to the model closest to the other coords,
     # if relation doesn't already hold in this dimension.
     new_position = new_posn(item_coord, relation, other_coord,
@@ -96,6 +85,8 @@ def shrink_dict(model):
     If there is an emtpy col between an item an the origin, substract 1 from
     the item coordinates to shift the items closer together and get rid of
     the gap. Returns the shrinked model. Only changes coordinates.
+    The new value of each used coordinate is computed only once, the items are
+    then moved with these values.
     """
     dict_dims = helper.dict_dimensions(model)
     dim1 = dict_dims[0]-1 # substract 1 because its about the indices.
@@ -105,23 +96,17 @@ def shrink_dict(model):
     rows = list_ints(dim2)
     plas = list_ints(dim3)
     empty_cols = emtpy_cols(cols, rows, plas, model)
-    # iterate through the model and check how many empty cols, rows and pals
-    # are infront of the coordinates. Changes coords accordingly.
-    shrink_mod = {}
+    # for each axis, the new coordinate is the old one minus the number of
+    # empty cols, rows or plas infront of it.
+    new_coords = []
+    for axis, empty in enumerate(empty_cols):
+        empty = sorted(empty)
+        new_coords.append({value: value - bisect.bisect_left(empty, value)
+                           for value in model.used_coordinates(axis)})
+    new_xs, new_ys, new_zs = new_coords
+    shrink_mod = SpatialModel()
     for (x_co, y_co, z_co), item in model.items():
-        new_x = x_co
-        new_y = y_co
-        new_z = z_co
-        for col in empty_cols[0]:
-            if x_co > col:
-                new_x -= 1
-        for row in empty_cols[1]:
-            if y_co > row:
-                new_y -= 1
-        for pla in empty_cols[2]:
-            if z_co > pla:
-                new_z -= 1
-        shrink_mod[new_x, new_y, new_z] = item
+        shrink_mod[new_xs[x_co], new_ys[y_co], new_zs[z_co]] = item
     if PRINT_MODIFY:
         print("shrinked model: ", shrink_mod)
     return shrink_mod
@@ -129,19 +114,16 @@ def shrink_dict(model):
 def emtpy_cols(cols, rows, plas, model):
     """
     Helper function for shrink_dict.
-    Iterates over the given model and removes all numbers of the coordinates
-    from the items in the model. this way there will be remaining lists of
-    empty cols, rows and plas. Returns a list of the 3 lists.
+    Removes all numbers of the coordinates of the items in the model from the
+    given lists. this way there will be remaining lists of empty cols, rows
+    and plas. The model counts the items for each coordinate, so only the given
+    numbers are looked up. Returns a list of the 3 lists.
     """
-    for (x_co, y_co, z_co) in model.keys():
-        # remove all coordinate components from the corresponding list.
-        if x_co in cols:
-            cols.remove(x_co)
-        if y_co in rows:
-            rows.remove(y_co)
-        if z_co in plas:
-            plas.remove(z_co)
-    return [cols, rows, plas]
+    result = []
+    for axis, values in enumerate((cols, rows, plas)):
+        used = model.used_coordinates(axis)
+        result.append([value for value in values if value not in used])
+    return result
 
 def swap(subj, s_coord, obj, o_coord, model):
     """
@@ -152,22 +134,11 @@ def swap(subj, s_coord, obj, o_coord, model):
     """
     if PRINT_MODIFY:
         print("swap with subj, obj, model: ", subj, obj, model)
-    new_model = deepcopy(model)
-    #check if the items at the coords are lists!
-    # if they are, just remove the obj/subj from the list and append the
-    # other item. check for both obj and subj.
-    if isinstance(new_model[s_coord], list):
-        new_model[s_coord].remove(subj)
-        new_model[s_coord].append(obj)
-    else:
-        #usual case
-        #update the values to swap the subject and object
-        new_model[s_coord] = obj
-    if isinstance(new_model[o_coord], list):
-        new_model[o_coord].remove(obj)
-        new_model[o_coord].append(subj)
-    else:
-        new_model[o_coord] = subj
+    new_model = model.copy()
+    # if there are several items at the coords, the model just removes the obj/subj
+    # from the cell and appends the other item. otherwise the item is replaced.
+    new_model.replace(s_coord, subj, obj)
+    new_model.replace(o_coord, obj, subj)
     if PRINT_MODIFY:
         print("swap model with swapped items: ", new_model)
     return new_model
@@ -0,0 +1,131 @@
+'''Module for the pre training of the individualized ccobra models with several processes.
+The ratings of the participants in the pre_train functions are independent from each
+other, since the rating counters are reset for each participant. So the participants
+are distributed to a process pool and only the rating vectors are summed up.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import multiprocessing
+
+import os
+
+import random
+
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+from copy import deepcopy
+
+# number of processes for the pre training. None uses one process per cpu core,
+# 1 computes the ratings in the main process.
+PROCESSES = None
+
+
+def rate_participants(model, dataset, rating_names, processes=None, seed=0):
+    """
+    Computes the ratings of all participants in the dataset and returns the sums
+    of the ratings, in the order of rating_names.
+    The participants are distributed to a process pool. The ratings are summed up
+    in the order of the dataset and each participant uses its own random seed, so
+    the result doesn't depend on the number of processes. The given model is not
+    changed.
+    Parameters
+    ----------
+    model : ccobra.CCobraModel
+        the individualized model with the predict and adapt_prior functions.
+
+    dataset : list(list(dict(str, object)))
+        Training data for the model(see pre_train).
+
+    rating_names : list
+        names of the rating attributes of the model, that are counted by adapt_prior.
+    """
+    if processes is None:
+        processes = PROCESSES or os.cpu_count() or 1
+    processes = min(processes, len(dataset))
+    seeds = range(seed, seed + len(dataset))
+    if processes <= 1:
+        ratings = [rate_participant(model, part_data, rating_names, part_seed)
+                   for part_data, part_seed in zip(dataset, seeds)]
+    else:
+        with ProcessPoolExecutor(processes, mp_context=_context()) as executor:
+            ratings = list(executor.map(rate_participant, [model] * len(dataset), dataset,
+                                        [rating_names] * len(dataset), seeds))
+    totals = [0] * len(rating_names)
+    for rating in ratings:
+        for i, value in enumerate(rating):
+            totals[i] += value
+    return totals
+
+def rate_participant(model, participant_data, rating_names, seed):
+    """
+    Computes the ratings of one participant with a copy of the model, like the
+    loop in the pre_train functions: predicts each problem with the standard
+    parameter assignment and calls adapt_prior. The guessing of the model uses its
+    own random number generator with the given seed. Returns the list of the ratings.
+    """
+    model = deepcopy(model)
+    part_data = deepcopy(participant_data) # refresh working copy of problems etc.
+    # reset the parameter assignment and the ratings for the participant
+    model.parameter_assignment = [[False, False, False, False, False, False],
+                                  [False, False, False, False, False]]
+    model.previous_model_ans = []
+    for name in rating_names:
+        setattr(model, name, 0)
+    model.rng = random.Random(seed)
+    for problem_data in part_data:
+        prob_item = problem_data['item'] # the data of the problem
+        prob_ans = problem_data['response'] # the response from the participant
+        model.predict(prob_item) # predict the answer with the currect parameters
+        # call adapt_prior to check if the individualization can
+        # change the result to the better
+        model.adapt_prior(prob_item, prob_ans)
+    return [getattr(model, name) for name in rating_names]
+
+def _context():
+    """
+    Returns the multiprocessing context for the process pool. The ccobra models are
+    loaded from their files and can't be imported by name, so the worker processes
+    are forked where this is supported.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class _CountingModel:
+    """Minimal model that counts the True responses in adapt_prior.
+    """
+    parameter_assignment = None
+    previous_model_ans = []
+    ind_rating = 0
+
+    def predict(self, item):
+        """Always predicts False."""
+        self.previous_model_ans.append(False)
+        return False
+
+    def adapt_prior(self, item, target):
+        """Counts the responses that differ from the prediction."""
+        if target != self.previous_model_ans[-1]:
+            self.ind_rating += item
+
+
+class Tests(unittest.TestCase):
+    """Unittest class for the parallel pre training.
+    """
+    def test_rate_participants(self):
+        """Tests that the ratings don't depend on the number of processes.
+        """
+        dataset = [[{'item': i, 'response': bool(i % 3)} for i in range(part, part + 5)]
+                   for part in range(6)]
+        model = _CountingModel()
+        sequential = rate_participants(model, dataset, ["ind_rating"], processes=1)
+        parallel = rate_participants(model, dataset, ["ind_rating"], processes=3)
+        self.assertEqual(sequential, parallel)
+        self.assertEqual(sequential, [sum([problem['item'] for part in dataset
+                                           for problem in part if problem['response']])])
+        self.assertEqual(model.ind_rating, 0)
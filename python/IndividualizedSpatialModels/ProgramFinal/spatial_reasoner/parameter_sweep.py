@@ -0,0 +1,198 @@
+'''Module for computing the answers of the spatial model for all parameter assignments
+at once. Used by the parameter approaches to find the assignments that lead to a
+given answer.
+
+The construction parameters are consumed two at a time, one pair for each of the first
+three premises. All assignments that agree on the first pairs build the same models
+for the first premises, so the assignments are explored as a tree: after each premise
+the current models are copied for each of the four values of the next pair. Branches
+that lead to the same models are only computed once.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import unittest
+
+from spatial_reasoner import main_module_param
+
+from spatial_reasoner import problem_cache
+
+# number of parameters for the model construction(understanding and building of the
+# first three premises)
+CONSTRUCTION_PARAMS = 6
+
+# the four values of a parameter pair, in the order of the binary assignment numbers
+PARAM_PAIRS = ((False, False), (False, True), (True, False), (True, True))
+
+
+def assignment(index, other_params=None):
+    """
+    Returns the parameter assignment with the given index in an answer table.
+    The index is the binary number of the assignment, like it is used by the find_params
+    functions(e.g. format(index, '08b')). If other_params is given, only the construction
+    parameters are encoded in the index and other_params is used as the second list.
+    Otherwise the last two bits are the verbal memory and guessing parameters.
+    """
+    if other_params is not None:
+        b_num = format(index, '0{}b'.format(CONSTRUCTION_PARAMS))
+        return [[bool(int(bit)) for bit in b_num], list(other_params)]
+    b_num = format(index, '0{}b'.format(CONSTRUCTION_PARAMS + 2))
+    return [[bool(int(bit)) for bit in b_num[:CONSTRUCTION_PARAMS]],
+            [bool(int(bit)) for bit in b_num[CONSTRUCTION_PARAMS:]]]
+
+def assignment_index(params, include_other=True):
+    """
+    Returns the index of the given parameter assignment in an answer table. This is
+    the inverse of the function assignment. If include_other is False, the index
+    only encodes the construction parameters.
+    """
+    bits = list(params[0])
+    if include_other:
+        bits += params[1][:2]
+    index = 0
+    for bit in bits:
+        index = index * 2 + int(bool(bit))
+    return index
+
+def answer_table(spatial_model, prem, single_choice=False, other_params=None):
+    """
+    Computes the answers to the problem for all parameter assignments. The entry at
+    index i of the table is the answer with the parameter assignment(index=i), see
+    the function assignment.
+    If other_params is given, the second parameter list is fixed and the table
+    contains the 64 answers for the construction parameters. Otherwise the verbal
+    memory and guessing parameters are part of the assignments, which results in
+    256 answers.
+    The answers are the same as the ones of interpret_spatial_parameters or
+    interpret_spatial2exp_parameters(for single choice problems). Random answers
+    (guessing) are drawn for each assignment separately.
+    The given problem is not changed.
+    """
+    if other_params is None:
+        other_list = [[False, False], [False, True], [True, False], [True, True]]
+        alt_params = []
+    else:
+        other_list = [list(other_params)]
+        alt_params = list(other_params[2:])
+    construction = construction_answers(spatial_model, prem, alt_params, single_choice)
+    table = []
+    for cons_answer in construction:
+        for other in other_list:
+            answer = None
+            if other[0] or other[1]:
+                # the strategies can change the premises, so they get a copy
+                prem_copy = [list(pre_) for pre_ in prem]
+                if single_choice:
+                    answer = spatial_model.single_choice_strategy(prem_copy, other)
+                else:
+                    answer = spatial_model.verification_strategy(prem_copy, other)
+            if answer is None:
+                if single_choice:
+                    answer = spatial_model.answer_premise(prem, cons_answer)
+                else:
+                    answer = cons_answer
+            table.append(answer)
+    return table
+
+def construction_answers(spatial_model, prem, alt_params=None, single_choice=False):
+    """
+    Computes the answers of the model construction for all 64 assignments of the
+    construction parameters. For verification problems the answers are True, False
+    or None. For single choice problems the answer is the index of the first
+    question premise that was verified, or None.
+    """
+    if alt_params is None:
+        alt_params = []
+    # parse the premises into new lists, the problem is not changed
+    prems = [[pre_[0], spatial_model.parse_relation(pre_), pre_[2]] for pre_ in prem]
+    cache_key = None
+    if main_module_param.USE_CACHE:
+        # the answers don't depend on the item names, see problem_cache
+        cache_key = problem_cache.answer_key(prems, (), alt_params, single_choice)
+        answers = problem_cache.TABLE_CACHE.get(cache_key)
+        if answers is not problem_cache.MISSING:
+            return list(answers)
+    answers = _sweep_premises(spatial_model, prems, 0, [], None, CONSTRUCTION_PARAMS,
+                              alt_params, single_choice, {})
+    if cache_key is not None:
+        problem_cache.TABLE_CACHE.put(cache_key, tuple(answers))
+    return answers
+
+def _sweep_premises(spatial_model, prems, index, mods, answer, n_params, alt_params,
+                    single_choice, memo):
+    """
+    Processes the premises from index on with the given models and answer so far.
+    Returns the answers for all assignments of the n_params remaining construction
+    parameters. The results are stored in memo with the models as key, so the
+    same models are only processed once for each premise.
+    """
+    if n_params == 0 or index == len(prems):
+        # the remaining premises don't use any of the parameters
+        while index < len(prems):
+            mods, answer = _process_premise(spatial_model, prems, index, mods, answer,
+                                            [], alt_params, single_choice)
+            index += 1
+        return [answer] * (2 ** n_params)
+    key = (index, answer, tuple([model.state_key() for model in mods]))
+    answers = memo.get(key)
+    if answers is not None:
+        return answers
+    answers = []
+    for pair in PARAM_PAIRS:
+        # the models are changed by the premise, so every branch works on copies
+        branch_mods = [model.copy() for model in mods]
+        branch_mods, branch_answer = _process_premise(
+            spatial_model, prems, index, branch_mods, answer, list(pair), alt_params,
+            single_choice)
+        answers.extend(_sweep_premises(spatial_model, prems, index + 1, branch_mods,
+                                       branch_answer, n_params - 2, alt_params,
+                                       single_choice, memo))
+    memo[key] = answers
+    return answers
+
+def _process_premise(spatial_model, prems, index, mods, answer, params, alt_params,
+                     single_choice):
+    """
+    Processes one premise like the interpret functions of the main module.
+    Returns the new models and the answer.
+    """
+    result = spatial_model.decide_spatial(prems[index], mods, prems, params, alt_params)
+    if single_choice:
+        if result.answer is True and answer is None:
+            answer = index
+    elif result.answer is True and answer is not False:
+        answer = True
+    elif result.answer is False:
+        answer = False
+    return result.models, answer
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the parameter sweep.
+    """
+    def test_answer_table(self):
+        """Tests that the table contains the answers of the interpret function.
+        """
+        spatial_model = main_module_param.MainModule()
+        problems = [[["A", "L", "B"], ["B", "L", "C"], ["C", "L", "D"], ["A", "L", "D"]],
+                    [["A", "L", "B"], ["C", "L", "B"], ["D", "L", "C"], ["A", "R", "D"]],
+                    [["B", "L", "A"], ["C", "L", "B"], ["D", "L", "C"], ["C", "R", "B"]]]
+        for prem in problems:
+            table = answer_table(spatial_model, prem)
+            self.assertEqual(len(table), 256)
+            for i, answer in enumerate(table):
+                params = assignment(i)
+                self.assertEqual(answer, spatial_model.interpret_spatial_parameters(
+                    [list(pre_) for pre_ in prem], params))
+
+    def test_assignment(self):
+        """Tests the conversion of the table indices to parameter assignments.
+        """
+        self.assertEqual(assignment(6), [[False, False, False, False, False, True],
+                                         [True, False]])
+        self.assertEqual(assignment(33, [False, False]),
+                         [[True, False, False, False, False, True], [False, False]])
+        for i in range(256):
+            self.assertEqual(assignment_index(assignment(i)), i)
+        self.assertEqual(assignment_index(assignment(33, [False, False]), False), 33)
@@ -0,0 +1,134 @@
+'''Module for caching the answers of the model construction. Many problems only differ
+in the names of the items(e.g. A, B, C, D or the names of the trees), the model
+construction gives the same answers for all of them. The problems are therefore mapped
+to a canonical form, where the items are numbered in the order of their first
+occurrence. The answers are cached with this form and the parameter assignment.
+The cache is global, so it is shared by all participants and models.
+
+Only the model construction is cached. The verbal memory and guessing depend on the
+item names or are random, so they are never cached.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+from collections import OrderedDict
+
+import unittest
+
+# marker for a key that is not in the cache(None is a valid answer).
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Simple cache with a maximum size. When the cache is full, the least recently
+    used entry is removed. Counts the hits and misses of get.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        """
+        Returns the cached value for the key, or default if the key is not cached.
+        """
+        value = self.entries.get(key, MISSING)
+        if value is MISSING:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores the value for the key and removes the least recently used entry,
+        if the cache is full.
+        """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+# cache for the answers of single interpret calls: (problem, parameters) -> answer
+ANSWER_CACHE = LRUCache(100000)
+
+# cache for the answer tables of the parameter sweep: (problem, alt parameters) -> answers
+TABLE_CACHE = LRUCache(10000)
+
+
+def canonical_problem(prems):
+    """
+    Returns the canonical form of the parsed premises: a tuple of
+    (subject number, relation, object number) tuples, where the items are numbered
+    in the order of their first occurrence. The relations need to be parsed
+    already(relation tuples). Problems that only differ in the item names
+    have the same canonical form.
+    """
+    numbers = {}
+    canonical = []
+    for pre_ in prems:
+        subj = numbers.setdefault(pre_[0], len(numbers))
+        obj = numbers.setdefault(pre_[2], len(numbers))
+        canonical.append((subj, tuple(pre_[1]), obj))
+    return tuple(canonical)
+
+def answer_key(prems, construction_params, alt_params, single_choice=False):
+    """
+    Returns the key of an answer in the cache for the parsed premises and the
+    parameters that are used by the model construction. Alternative parameters
+    with less than three values are replaced by the default, like in decide_spatial.
+    """
+    return parameter_key(canonical_problem(prems), construction_params, alt_params,
+                         single_choice)
+
+def parameter_key(canonical, construction_params, alt_params, single_choice=False):
+    """
+    Returns the key of an answer in the cache for a problem that is already in the
+    canonical form(e.g. the premises of a compiled problem).
+    """
+    if len(alt_params) < 3:
+        alt_params = [False, False, False]
+    return (canonical, tuple(construction_params), tuple(alt_params[:3]), single_choice)
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the problem cache.
+    """
+    def test_canonical_problem(self):
+        """Tests that only the item names are ignored.
+        """
+        prob1 = [["A", (-1, 0, 0), "B"], ["B", (-1, 0, 0), "C"], ["A", (-1, 0, 0), "C"]]
+        prob2 = [["lime", (-1, 0, 0), "fig"], ["fig", (-1, 0, 0), "plum"],
+                 ["lime", (-1, 0, 0), "plum"]]
+        prob3 = [["A", (-1, 0, 0), "B"], ["B", (-1, 0, 0), "C"], ["C", (-1, 0, 0), "A"]]
+        self.assertEqual(canonical_problem(prob1), canonical_problem(prob2))
+        self.assertNotEqual(canonical_problem(prob1), canonical_problem(prob3))
+        self.assertEqual(answer_key(prob1, [False] * 6, []),
+                         answer_key(prob2, [False] * 6, [False, False, False]))
+
+    def test_lru_cache(self):
+        """Tests that the least recently used entry is removed.
+        """
+        cache = LRUCache(2)
+        cache.put(1, None)
+        cache.put(2, True)
+        self.assertEqual(cache.get(1), None)
+        cache.put(3, False)
+        self.assertIs(cache.get(2), MISSING)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 2))
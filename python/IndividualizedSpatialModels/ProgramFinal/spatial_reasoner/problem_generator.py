@@ -0,0 +1,336 @@
+'''Module for generating spatial problems of any size, to measure how the model
+construction scales. The items are placed on a grid and the premises describe the
+positions of pairs of items, so the premises always have a model. Depending on the
+layout, the items are in a row(left/right), on a grid with the four directions
+(north/south/east/west) or on a grid with the combined directions(e.g. north-west),
+like parse_relation supports them.
+
+The first premises connect all items, further premises are added between random
+pairs of items. The kind of the problem is checked with the constraint oracle:
+    consistent: the question premise follows from the premises(answer True)
+    indeterminate: the question premise is possible, but doesn't follow(answer False)
+    inconsistent: one premise contradicts the other premises(answer None)
+
+The problems are given in the format of the spatial model([A, relation, B], the
+question premise is the last one) and in the CCOBRA item format.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+import random
+
+import unittest
+
+from spatial_reasoner import constraint_oracle
+
+from spatial_reasoner.main_module_param import MainModule
+
+# the kinds of problems
+CONSISTENT = "consistent"
+INDETERMINATE = "indeterminate"
+INCONSISTENT = "inconsistent"
+KINDS = (CONSISTENT, INDETERMINATE, INCONSISTENT)
+
+# the layouts of the items
+ONE_D = "1d" # items in a row, relations left and right
+TWO_D = "2d" # items on a grid, relations north, south, east and west
+COMBINED = "combined" # items on a grid, also with relations like north-west
+
+# the directions in which a new item can be placed next to another item
+DIRECTIONS = {ONE_D: ((1, 0), (-1, 0)),
+              TWO_D: ((1, 0), (-1, 0), (0, 1), (0, -1)),
+              COMBINED: ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1),
+                         (-1, -1))}
+
+# the answer choices of the single choice problems
+CHOICE_RELATIONS = ("north", "south", "east", "west", "north-east", "north-west",
+                    "south-east", "south-west")
+
+# the CCOBRA domain of the problems
+DOMAIN = "spatial-relational"
+
+
+class GeneratedProblem:
+    """
+    Generated problem. Contains the premises in the format of the spatial model(the
+    last premise is the question premise), the kind of the problem and the correct
+    answer of the verification task(see MainModule.ground_truth).
+    """
+    __slots__ = ("premises", "kind", "answer")
+
+    def __init__(self, premises, kind, answer):
+        self.premises = premises
+        self.kind = kind
+        self.answer = answer
+
+    def premise_list(self):
+        """
+        Returns the premises of the verification problem in new lists, since the
+        interpret functions change them.
+        """
+        return [list(pre_) for pre_ in self.premises]
+
+    def single_choice_premises(self):
+        """
+        Returns the premises of the single choice problem: the question premise is
+        replaced by the eight answer choices between its items.
+        """
+        subj, _, obj = self.premises[-1]
+        return [list(pre_) for pre_ in self.premises[:-1]] + [
+            [subj, relation, obj] for relation in CHOICE_RELATIONS]
+
+    def ccobra_record(self, single_choice=False):
+        """
+        Returns the problem as a row of a CCOBRA dataset(domain, task, response type
+        and choices in the string encoding of CCOBRA).
+        """
+        def encode(premises):
+            return "/".join(["{};{};{}".format(rel, subj, obj) for subj, rel, obj in premises])
+        if single_choice:
+            prem = self.single_choice_premises()
+            questions = prem[len(self.premises) - 1:]
+            choices = "|".join([encode([question]) for question in questions])
+            response_type = "single-choice"
+        else:
+            prem = self.premises
+            choices = encode(prem[-1:])
+            response_type = "verify"
+        return {"domain": DOMAIN, "task": encode(prem[:len(self.premises) - 1]),
+                "response_type": response_type, "choices": choices}
+
+    def ccobra_item(self, identifier=0, sequence_number=0, single_choice=False):
+        """
+        Returns the problem as a ccobra item. ccobra is only imported here, the
+        generator can be used without it.
+        """
+        import ccobra
+        record = self.ccobra_record(single_choice)
+        return ccobra.Item(identifier, record["domain"], record["task"],
+                           record["response_type"], record["choices"], sequence_number)
+
+    def __repr__(self):
+        return "GeneratedProblem({}, {}, {})".format(self.kind, self.answer, self.premises)
+
+
+def generate_problem(n_items, n_premises, kind=CONSISTENT, layout=TWO_D, rng=None,
+                     attempts=1000):
+    """
+    Generates a problem with n_items items and n_premises premises(without the
+    question premise) of the given kind and layout. rng is the random number
+    generator(e.g. random.Random(seed)), the global random module is used if None.
+    The premises have to connect all items, so at least n_items - 1 premises are
+    needed(n_items for inconsistent problems). Raises a ValueError, if no problem
+    could be found in the given number of attempts.
+    """
+    if rng is None:
+        rng = random
+    if kind not in KINDS:
+        raise ValueError("unknown kind of problem {}".format(kind))
+    consistent_premises = n_premises - 1 if kind == INCONSISTENT else n_premises
+    if n_items < 2 or consistent_premises < n_items - 1:
+        raise ValueError("{} premises can't connect {} items".format(n_premises, n_items))
+    for _ in range(attempts):
+        positions = _layout(n_items, layout, rng)
+        premises = _premises(positions, consistent_premises, layout, rng)
+        if premises is None:
+            continue
+        oracle = constraint_oracle.ConstraintOracle(_parsed(premises))
+        if kind == INCONSISTENT:
+            contradiction = _contradiction(positions, premises, layout, rng)
+            if contradiction is None:
+                continue
+            premises.insert(rng.randint(0, len(premises)), contradiction)
+            question = _question(positions, premises, layout, rng, lambda question: True)
+            answer = None
+        else:
+            # a question premise that is true in the layout is always possible
+            necessary = kind == CONSISTENT
+            question = _question(positions, premises, layout, rng,
+                                 lambda question: oracle.necessary(question) == necessary)
+            answer = necessary
+        if question is None:
+            continue
+        return GeneratedProblem(premises + [question], kind, answer)
+    raise ValueError("no {} problem with {} items and {} premises found".format(
+        kind, n_items, n_premises))
+
+def generate_problems(count, n_items, n_premises, kinds=KINDS, layout=TWO_D, seed=0):
+    """
+    Generates count problems, the kinds are used in turn. The problems only depend
+    on the seed.
+    """
+    rng = random.Random(seed)
+    return [generate_problem(n_items, n_premises, kinds[i % len(kinds)], layout, rng)
+            for i in range(count)]
+
+def relation_name(direction, layout):
+    """
+    Returns the relation for the direction(sign of the x and y difference of the
+    subject and the object), e.g. "left" or "north-west".
+    """
+    x_dir, y_dir = direction
+    if layout == ONE_D:
+        return "left" if x_dir < 0 else "right"
+    parts = []
+    if y_dir:
+        parts.append("north" if y_dir > 0 else "south")
+    if x_dir:
+        parts.append("east" if x_dir > 0 else "west")
+    return "-".join(parts)
+
+def _layout(n_items, layout, rng):
+    """
+    Places the items one after another next to a random item that is already placed.
+    Returns the list of the positions(x, y) of the items.
+    """
+    positions = [(0, 0)]
+    occupied = {(0, 0)}
+    directions = DIRECTIONS[layout]
+    for _ in range(n_items - 1):
+        x_co, y_co = rng.choice(positions)
+        x_dir, y_dir = rng.choice(directions)
+        distance = rng.randint(1, 2)
+        position = (x_co + distance * x_dir, y_co + distance * y_dir)
+        while position in occupied:
+            position = (position[0] + x_dir, position[1] + y_dir)
+        positions.append(position)
+        occupied.add(position)
+    return positions
+
+def _direction(positions, subj, obj):
+    """
+    Returns the signs of the x and y difference of the positions of two items.
+    """
+    x_diff = positions[subj][0] - positions[obj][0]
+    y_diff = positions[subj][1] - positions[obj][1]
+    return ((x_diff > 0) - (x_diff < 0), (y_diff > 0) - (y_diff < 0))
+
+def _allowed(direction, layout):
+    """
+    Returns True, if the direction can be expressed by a relation of the layout.
+    """
+    return layout == COMBINED or direction[0] == 0 or direction[1] == 0
+
+def _premise(positions, subj, obj, layout):
+    """
+    Returns the premise about two items, that is true in the layout.
+    """
+    return ["I{}".format(subj), relation_name(_direction(positions, subj, obj), layout),
+            "I{}".format(obj)]
+
+def _premises(positions, n_premises, layout, rng):
+    """
+    Returns n_premises premises in random order. The first premises connect each item
+    with an item that was placed before, in the order of the layout(so the directions
+    of the layout are used), the others are between random pairs of items. Returns
+    None, if there aren't enough pairs with relations of the layout.
+    """
+    pairs = set()
+    premises = []
+    for item in range(1, len(positions)):
+        # the item was placed next to one of the previous items in one of the
+        # directions of the layout
+        other = min([other for other in range(item) if _allowed(
+            _direction(positions, item, other), layout)], key=lambda other: abs(
+                positions[item][0] - positions[other][0]) + abs(
+                    positions[item][1] - positions[other][1]))
+        pairs.add(frozenset((item, other)))
+        premises.append(_random_order(positions, item, other, layout, rng))
+    candidates = [(subj, obj) for subj in range(len(positions)) for obj in range(subj)
+                  if frozenset((subj, obj)) not in pairs and _allowed(
+                      _direction(positions, subj, obj), layout)]
+    if len(premises) + len(candidates) < n_premises:
+        return None
+    for subj, obj in rng.sample(candidates, n_premises - len(premises)):
+        premises.append(_random_order(positions, subj, obj, layout, rng))
+    rng.shuffle(premises)
+    return premises
+
+def _random_order(positions, item1, item2, layout, rng):
+    """
+    Returns the premise about two items with a random item as the subject.
+    """
+    if rng.random() < 0.5:
+        return _premise(positions, item1, item2, layout)
+    return _premise(positions, item2, item1, layout)
+
+def _question(positions, premises, layout, rng, accept):
+    """
+    Returns a question premise that is true in the layout and accepted by the given
+    function, about a pair of items that isn't described by a premise if possible.
+    Returns None if there is no such question premise.
+    """
+    used = set([frozenset((pre_[0], pre_[2])) for pre_ in premises])
+    questions = []
+    for subj in range(len(positions)):
+        for obj in range(len(positions)):
+            if subj != obj and _allowed(_direction(positions, subj, obj), layout):
+                question = _premise(positions, subj, obj, layout)
+                new_pair = frozenset((question[0], question[2])) not in used
+                questions.append((not new_pair, rng.random(), question))
+    questions.sort()
+    for _, _, question in questions:
+        if accept(_parsed([question])[0]):
+            return question
+    return None
+
+def _contradiction(positions, premises, layout, rng):
+    """
+    Returns a premise that contradicts the premises: the inverted relation of a
+    random pair of items, whose relation follows from the premises. Returns None if
+    there is no such pair.
+    """
+    items = list(range(len(positions)))
+    rng.shuffle(items)
+    for subj in items:
+        for obj in items:
+            if subj == obj or not _allowed(_direction(positions, subj, obj), layout):
+                continue
+            obj_name, relation, subj_name = _premise(positions, obj, subj, layout)
+            premise = [subj_name, relation, obj_name]
+            oracle = constraint_oracle.ConstraintOracle(_parsed(premises + [premise]))
+            if not oracle.consistent():
+                return premise
+    return None
+
+def _parsed(premises):
+    """
+    Returns the premises with parsed relations, in new lists.
+    """
+    return [[pre_[0], MainModule.parse_relation(pre_), pre_[2]] for pre_ in premises]
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the problem generator.
+    """
+    def test_kinds(self):
+        """Tests that the generated problems have the requested kind and answer.
+        """
+        spatial_model = MainModule()
+        for layout in (ONE_D, TWO_D, COMBINED):
+            problems = generate_problems(12, 6, 7, layout=layout, seed=3)
+            for problem in problems:
+                self.assertEqual(len(problem.premises), 8)
+                self.assertEqual(spatial_model.ground_truth(problem.premises), problem.answer)
+            self.assertEqual([problem.kind for problem in problems[:3]], list(KINDS))
+        relations = set([pre_[1] for problem in generate_problems(
+            6, 8, 10, layout=ONE_D, seed=1) for pre_ in problem.premises])
+        self.assertTrue(relations <= {"left", "right"})
+        self.assertEqual(generate_problems(3, 5, 6, seed=2)[2].premises,
+                         generate_problems(3, 5, 6, seed=2)[2].premises)
+        with self.assertRaises(ValueError):
+            generate_problem(5, 3)
+
+    def test_ccobra_item(self):
+        """Tests the conversion to ccobra items.
+        """
+        problem = GeneratedProblem([["I0", "left", "I1"], ["I1", "left", "I2"],
+                                    ["I0", "left", "I2"]], CONSISTENT, True)
+        self.assertEqual(problem.ccobra_record(), {
+            "domain": DOMAIN, "task": "left;I0;I1/left;I1;I2", "response_type": "verify",
+            "choices": "left;I0;I2"})
+        item = problem.ccobra_item(single_choice=True)
+        self.assertEqual(item.task, [["left", "I0", "I1"], ["left", "I1", "I2"]])
+        self.assertEqual(len(item.choices), 8)
+        self.assertEqual(item.choices[0], [["north", "I0", "I2"]])
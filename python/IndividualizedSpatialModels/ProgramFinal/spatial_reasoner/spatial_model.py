@@ -0,0 +1,726 @@
+'''Module for the compact representation of a spatial model.
+Replaces the plain coordinate dictionaries that were used by the spatial model before.
+
+@author: Christian Breu <breuch@web.de>
+'''
+
+from bisect import bisect_left, insort
+
+import unittest
+
+# Global intern table for the item names. Every item name that is added to a model
+# gets a small integer id, the models only store these ids.
+_ITEM_IDS = {}
+_ITEM_NAMES = []
+
+
+def intern_item(item):
+    """
+    Returns the interned id of the given item name. If the name wasn't seen
+    before, the next free id is assigned to it.
+    """
+    item_id = _ITEM_IDS.get(item)
+    if item_id is None:
+        item_id = len(_ITEM_NAMES)
+        _ITEM_IDS[item] = item_id
+        _ITEM_NAMES.append(item)
+    return item_id
+
+def item_name(item_id):
+    """
+    Returns the item name for the given interned id.
+    """
+    return _ITEM_NAMES[item_id]
+
+
+class SpatialModel:
+    """
+    Compact spatial model. Maps (x, y, z) coordinate tuples to the items at these
+    coordinates. Each cell stores a tuple of interned item ids, so that a single
+    item and several items at the same position are handled the same way.
+    The cells are a sparse dictionary instead of an array: the coordinates of a
+    model are unbounded and can be negative, and most models only have a few
+    items, so an array would have to be resized and shifted while items are added.
+    The model keeps its bounding box up to date while items are added, so the
+    dimensions of the model don't need to be computed by iterating over all
+    coordinates. For each axis it counts the occupied cells per coordinate, so empty
+    rows, columns and planes are found without a search and the box is computed from
+    these counts when a cell on its border was removed. Additionally, an index from
+    the item ids to their coordinates is kept in sync with the cells, so items can
+    be found without a search.
+    For the search of free cells, the model can keep an index of the occupied cells
+    of each line(sorted coordinates for each axis and the other two coordinates).
+    The line index is built when it is needed for the first time and then updated
+    with the cells.
+    Copies of a model are copy-on-write: the copy shares the cells and the index
+    with the original model until one of them is changed. The cells themselves
+    are immutable tuples, so they are never copied.
+    The model has a translation offset: the cells are stored with their own
+    coordinates and the offset is added to them for all functions of the model.
+    So shifting a model(e.g. normalize_coords) only returns a copy with another
+    offset, the cells are not moved.
+    The model can be used like the old dictionary models: indexing a coordinate
+    returns the item name, or a list of names if there are several items at
+    the coordinate.
+    """
+    __slots__ = ("_cells", "_index", "_mins", "_maxs", "_counts", "_shared", "_lines",
+                 "_own_lines", "_offset")
+
+    def __init__(self, cells=None):
+        """
+        Creates a new model. cells can be a dictionary in the old model format
+        (coordinates to item name or list of item names).
+        """
+        self._cells = {}
+        self._index = {} # item id -> coordinates of the item
+        self._mins = None # None if the model is empty or the box needs to be recomputed
+        self._maxs = None
+        self._counts = ({}, {}, {}) # for each axis: coordinate -> number of occupied cells
+        self._shared = False # True if the cells are shared with a copy of the model
+        self._lines = None # line -> sorted coordinates of the occupied cells, None if not built
+        self._own_lines = set() # lines that are not shared with a copy of the model
+        self._offset = None # translation of the stored coordinates, None for (0, 0, 0)
+        if cells:
+            for coords, value in cells.items():
+                self[coords] = value
+
+    # ---------------------------- DICTIONARY INTERFACE -------------------------------------------
+
+    def __getitem__(self, coords):
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        return _cell_value(self._cells[coords])
+
+    def get(self, coords, default=None):
+        """
+        Returns the item(s) at the given coordinates or default, if the cell is empty.
+        """
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        cell = self._cells.get(coords)
+        if cell is None:
+            return default
+        return _cell_value(cell)
+
+    def __setitem__(self, coords, value):
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        if isinstance(value, list):
+            self._set_cell(coords, tuple([intern_item(item) for item in value]))
+        else:
+            self._set_cell(coords, (intern_item(value),))
+
+    def __delitem__(self, coords):
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        self._del_cell(coords)
+
+    def pop(self, coords):
+        """
+        Removes the cell at the given coordinates and returns the item(s) of it.
+        """
+        value = self[coords]
+        del self[coords]
+        return value
+
+    def __contains__(self, coords):
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        return coords in self._cells
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """
+        Returns all occupied coordinates of the model.
+        """
+        if self._offset is None:
+            return self._cells.keys()
+        offset = self._offset
+        return [_add(coords, offset) for coords in self._cells]
+
+    def values(self):
+        """
+        Returns the item(s) of all occupied cells.
+        """
+        return [_cell_value(cell) for cell in self._cells.values()]
+
+    def items(self):
+        """
+        Returns (coordinates, item(s)) pairs for all occupied cells.
+        """
+        if self._offset is None:
+            return [(coords, _cell_value(cell)) for coords, cell in self._cells.items()]
+        offset = self._offset
+        return [(_add(coords, offset), _cell_value(cell))
+                for coords, cell in self._cells.items()]
+
+    def update(self, other, overwrite=True):
+        """
+        Adds all cells of the other model to this model. Cells that are occupied
+        in both models get the items of the other model, or keep their items if
+        overwrite is False.
+        """
+        shift = _subtract(other._offset or (0, 0, 0), self._offset or (0, 0, 0))
+        cells = self._cells
+        for coords, cell in other._cells.items():
+            if shift != (0, 0, 0):
+                coords = _add(coords, shift)
+            if overwrite or coords not in cells:
+                self._set_cell(coords, cell)
+
+    def __eq__(self, other):
+        if isinstance(other, SpatialModel):
+            if self._offset == other._offset:
+                return self._cells == other._cells
+            return len(self._cells) == len(other._cells) and dict(
+                self._shifted_cells()) == dict(other._shifted_cells())
+        if isinstance(other, dict):
+            return self == SpatialModel(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        # the cells are immutable, so a copy of the model is already a deep copy.
+        return self.copy()
+
+    def __getstate__(self):
+        # the item ids are only valid in this process, so pickle the item names.
+        return dict(self.items())
+
+    def __setstate__(self, state):
+        self._cells = {}
+        self._index = {}
+        self._mins = None
+        self._maxs = None
+        self._counts = ({}, {}, {})
+        self._shared = False
+        self._lines = None
+        self._own_lines = set()
+        self._offset = None
+        for coords, value in state.items():
+            self[coords] = value
+
+    # ---------------------------- MODEL FUNCTIONS ------------------------------------------------
+
+    def copy(self):
+        """
+        Returns a copy of the model. The copy shares the cells with this model,
+        the first change of one of the two models copies the cell dictionary.
+        """
+        new_model = SpatialModel.__new__(SpatialModel)
+        new_model._cells = self._cells
+        new_model._index = self._index
+        new_model._mins = self._mins
+        new_model._maxs = self._maxs
+        new_model._counts = self._counts
+        new_model._shared = True
+        new_model._lines = self._lines
+        new_model._own_lines = set()
+        new_model._offset = self._offset
+        self._shared = True
+        self._own_lines = set()
+        return new_model
+
+    def add(self, coords, item):
+        """
+        Adds the item at the given coordinates. If there is a single item at these
+        coordinates, the new item is put in front of it, if there are already several
+        items, the new item is appended.
+        """
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        item_id = intern_item(item)
+        cell = self._cells.get(coords)
+        if cell is None:
+            self._set_cell(coords, (item_id,))
+        elif len(cell) == 1:
+            self._set_cell(coords, (item_id, cell[0]))
+        else:
+            self._set_cell(coords, cell + (item_id,))
+
+    def remove(self, coords, item):
+        """
+        Removes the item from the cell at the given coordinates. The cell is
+        removed when it doesn't contain any other item.
+        """
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        cell = self._cells[coords]
+        if len(cell) == 1:
+            self._del_cell(coords)
+            return
+        cell = list(cell)
+        cell.remove(intern_item(item))
+        self._set_cell(coords, tuple(cell))
+
+    def replace(self, coords, old_item, new_item):
+        """
+        Replaces the old item by the new item at the given coordinates. If there
+        are several items at the coordinates, the new item is appended after the
+        others.
+        """
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        cell = self._cells[coords]
+        if len(cell) == 1:
+            self._set_cell(coords, (intern_item(new_item),))
+            return
+        cell = list(cell)
+        cell.remove(intern_item(old_item))
+        cell.append(intern_item(new_item))
+        self._set_cell(coords, tuple(cell))
+
+    def find(self, item):
+        """
+        Returns the coordinates of the given item or None, if the item is not in
+        the model.
+        """
+        coords = self._index.get(_ITEM_IDS.get(item))
+        if coords is None or self._offset is None:
+            return coords
+        return _add(coords, self._offset)
+
+    def next_free(self, coords, relation):
+        """
+        Returns the first free coordinates, that are found by adding the relation to
+        the given coordinates until the cell is empty. If the relation is along one
+        axis, the end of the occupied cells is found in the line index by bisection.
+        """
+        offset = self._offset
+        if offset is not None:
+            coords = _subtract(coords, offset)
+        if coords not in self._cells:
+            return coords if offset is None else _add(coords, offset)
+        axis = _line_axis(relation)
+        if axis is None:
+            while coords in self._cells:
+                coords = _add(coords, relation)
+            return coords if offset is None else _add(coords, offset)
+        line = self._line_index().get(_line_key(axis, coords))
+        value = coords[axis]
+        start = bisect_left(line, value)
+        # the cells from start on are occupied without a gap as long as
+        # line[i] - i doesn't change, these values are sorted.
+        run_value = value - start
+        if relation[axis] > 0:
+            low, high = start, len(line) - 1
+            while low < high:
+                middle = (low + high + 1) // 2
+                if line[middle] - middle == run_value:
+                    low = middle
+                else:
+                    high = middle - 1
+            free = line[low] + 1
+        else:
+            low, high = 0, start
+            while low < high:
+                middle = (low + high) // 2
+                if line[middle] - middle == run_value:
+                    high = middle
+                else:
+                    low = middle + 1
+            free = line[low] - 1
+        free_coords = list(coords)
+        free_coords[axis] = free
+        if offset is None:
+            return tuple(free_coords)
+        return _add(free_coords, offset)
+
+    def item_coordinates(self):
+        """
+        Returns the (interned item id, coordinates) pairs of all items in the model.
+        """
+        if self._offset is None:
+            return self._index.items()
+        offset = self._offset
+        return [(item_id, _add(coords, offset)) for item_id, coords in self._index.items()]
+
+    def items_at(self, coords):
+        """
+        Returns a tuple of all item names at the given coordinates.
+        """
+        if self._offset is not None:
+            coords = _subtract(coords, self._offset)
+        return tuple([_ITEM_NAMES[item_id] for item_id in self._cells.get(coords, ())])
+
+    def mins(self):
+        """
+        Returns a tuple with the minimum x, y and z coordinate of the model.
+        """
+        if self._mins is None:
+            self._compute_box()
+        if self._offset is None:
+            return self._mins
+        return _add(self._mins, self._offset)
+
+    def maxs(self):
+        """
+        Returns a tuple with the maximum x, y and z coordinate of the model.
+        """
+        if self._maxs is None:
+            self._compute_box()
+        if self._offset is None:
+            return self._maxs
+        return _add(self._maxs, self._offset)
+
+    def used_coordinates(self, axis):
+        """
+        Returns the coordinates of the axis(0, 1 or 2 for x, y and z), at which at
+        least one cell is occupied.
+        """
+        if self._offset is None:
+            return self._counts[axis].keys()
+        shift = self._offset[axis]
+        return set([value + shift for value in self._counts[axis]])
+
+    def dimensions(self):
+        """
+        Returns a tuple with the max values of indices from the coords + 1.
+        """
+        maxs = self.maxs()
+        return (maxs[0] + 1, maxs[1] + 1, maxs[2] + 1)
+
+    def state_key(self):
+        """
+        Returns a hashable snapshot of the cells. Two models have the same key if
+        and only if they are equal.
+        """
+        if self._offset is None:
+            return frozenset(self._cells.items())
+        return frozenset(self._shifted_cells())
+
+    def canonical_key(self):
+        """
+        Returns a hashable key of the normalized and shrunk model: the coordinates
+        in each axis are replaced by their rank among the used coordinates of that
+        axis. Models that only differ by a translation or by empty rows, columns
+        and planes have the same key.
+        """
+        ranks = []
+        for axis in range(3):
+            values = sorted(set([coords[axis] for coords in self._cells]))
+            ranks.append({value: rank for rank, value in enumerate(values)})
+        x_ranks, y_ranks, z_ranks = ranks
+        return frozenset([((x_ranks[x_co], y_ranks[y_co], z_ranks[z_co]), cell)
+                          for (x_co, y_co, z_co), cell in self._cells.items()])
+
+    def shifted(self, shift):
+        """
+        Returns a new model where all coordinates are shifted by the given
+        3-tuple. Only the offset of the copy is changed, the cells are shared.
+        """
+        new_model = self.copy()
+        offset = _add(self._offset or (0, 0, 0), shift)
+        new_model._offset = None if offset == (0, 0, 0) else offset
+        return new_model
+
+    # ---------------------------- INTERNAL FUNCTIONS ---------------------------------------------
+
+    def _line_index(self):
+        """
+        Returns the line index and builds it, if it doesn't exist yet.
+        """
+        if self._lines is None:
+            lines = {}
+            for coords in self._cells:
+                for axis in range(3):
+                    lines.setdefault(_line_key(axis, coords), []).append(coords[axis])
+            for line in lines.values():
+                line.sort()
+            self._lines = lines
+            self._own_lines = set(lines)
+        return self._lines
+
+    def _update_lines(self, coords, add):
+        """
+        Adds(or removes) the coordinates to(from) the three lines through them. Lines
+        that are shared with a copy are copied before the change.
+        """
+        lines = self._lines
+        own_lines = self._own_lines
+        for axis in range(3):
+            key = _line_key(axis, coords)
+            line = lines.get(key)
+            if line is None:
+                line = []
+            elif key not in own_lines:
+                line = list(line)
+            lines[key] = line
+            own_lines.add(key)
+            if add:
+                insort(line, coords[axis])
+            else:
+                del line[bisect_left(line, coords[axis])]
+                if not line:
+                    del lines[key]
+                    own_lines.discard(key)
+
+    def _set_cell(self, coords, cell):
+        """
+        Sets the cell at the coordinates and updates the item index and the
+        bounding box.
+        """
+        if self._shared:
+            self._unshare()
+        index = self._index
+        old_cell = self._cells.get(coords)
+        if old_cell is not None:
+            for item_id in old_cell:
+                if index.get(item_id) == coords:
+                    del index[item_id]
+        self._cells[coords] = cell
+        if old_cell is None:
+            for axis_counts, value in zip(self._counts, coords):
+                axis_counts[value] = axis_counts.get(value, 0) + 1
+            if self._lines is not None:
+                self._update_lines(coords, True)
+        for item_id in cell:
+            index[item_id] = coords
+        mins = self._mins
+        if mins is None:
+            if len(self._cells) == 1:
+                self._mins = coords
+                self._maxs = coords
+            return
+        maxs = self._maxs
+        if (coords[0] < mins[0]) or (coords[1] < mins[1]) or (coords[2] < mins[2]):
+            self._mins = (min(coords[0], mins[0]), min(coords[1], mins[1]),
+                          min(coords[2], mins[2]))
+        if (coords[0] > maxs[0]) or (coords[1] > maxs[1]) or (coords[2] > maxs[2]):
+            self._maxs = (max(coords[0], maxs[0]), max(coords[1], maxs[1]),
+                          max(coords[2], maxs[2]))
+
+    def _del_cell(self, coords):
+        """
+        Removes the cell at the coordinates and its items from the index. If the
+        cell was the last one on a border of the bounding box, the box will be
+        computed from the counts the next time it is needed.
+        """
+        if self._shared:
+            self._unshare()
+        index = self._index
+        for item_id in self._cells.pop(coords):
+            if index.get(item_id) == coords:
+                del index[item_id]
+        if self._lines is not None:
+            self._update_lines(coords, False)
+        mins = self._mins
+        maxs = self._maxs
+        for axis, (axis_counts, value) in enumerate(zip(self._counts, coords)):
+            if axis_counts[value] > 1:
+                axis_counts[value] -= 1
+                continue
+            del axis_counts[value]
+            # the box only changes, if a row, column or plane on its border became empty.
+            if mins is not None and (value == mins[axis] or value == maxs[axis]):
+                self._mins = None
+                self._maxs = None
+
+    def _unshare(self):
+        """
+        Copies the cells and the index before the first change of a model that
+        shares them with a copy.
+        """
+        self._cells = self._cells.copy()
+        self._index = self._index.copy()
+        self._counts = tuple([axis_counts.copy() for axis_counts in self._counts])
+        if self._lines is not None:
+            self._lines = self._lines.copy()
+        self._own_lines = set()
+        self._shared = False
+
+    def _shifted_cells(self):
+        """
+        Returns the (coordinates, cell) pairs with the offset added to the coordinates.
+        """
+        offset = self._offset
+        if offset is None:
+            return self._cells.items()
+        return [(_add(coords, offset), cell) for coords, cell in self._cells.items()]
+
+    def _compute_box(self):
+        """
+        Computes the bounding box from the occupied coordinates of each axis.
+        """
+        if not self._cells:
+            raise ValueError("the bounding box of an empty model is not defined")
+        x_counts, y_counts, z_counts = self._counts
+        self._mins = (min(x_counts), min(y_counts), min(z_counts))
+        self._maxs = (max(x_counts), max(y_counts), max(z_counts))
+
+
+def _add(coords, shift):
+    """
+    Returns the sum of the coordinates and the shift as a tuple.
+    """
+    return (coords[0] + shift[0], coords[1] + shift[1], coords[2] + shift[2])
+
+def _subtract(coords, shift):
+    """
+    Returns the coordinates minus the shift as a tuple.
+    """
+    return (coords[0] - shift[0], coords[1] - shift[1], coords[2] - shift[2])
+
+def _line_axis(relation):
+    """
+    Returns the axis of a relation that only moves one step along one axis,
+    otherwise None.
+    """
+    axis = None
+    for index, value in enumerate(relation):
+        if value:
+            if axis is not None or value not in (-1, 1):
+                return None
+            axis = index
+    return axis
+
+def _line_key(axis, coords):
+    """
+    Returns the key of the line along the axis through the coordinates.
+    """
+    if axis == 0:
+        return (0, coords[1], coords[2])
+    if axis == 1:
+        return (1, coords[0], coords[2])
+    return (2, coords[0], coords[1])
+
+def _cell_value(cell):
+    """
+    Converts a cell of interned ids to the old value format: the item name for
+    a single item, a list of names for several items.
+    """
+    if len(cell) == 1:
+        return _ITEM_NAMES[cell[0]]
+    return [_ITEM_NAMES[item_id] for item_id in cell]
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the spatial model representation.
+    """
+    def test_dictionary_interface(self):
+        """Tests that the model behaves like the old dictionary models.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): ["B", "C"]})
+        self.assertEqual(model[(0, 0, 0)], "A")
+        self.assertEqual(model.get((1, 0, 0)), ["B", "C"])
+        self.assertEqual(model.get((2, 0, 0)), None)
+        self.assertEqual(model, {(0, 0, 0): "A", (1, 0, 0): ["B", "C"]})
+        self.assertEqual(model.find("C"), (1, 0, 0))
+        self.assertEqual(model.find("D"), None)
+
+    def test_add_remove(self):
+        """Tests adding and removing items and the bounding box.
+        """
+        model = SpatialModel({(0, 0, 0): "A"})
+        model.add((0, 0, 0), "B")
+        model.add((0, 0, 0), "C")
+        self.assertEqual(model[(0, 0, 0)], ["B", "A", "C"])
+        model.add((-1, 2, 0), "D")
+        self.assertEqual(model.mins(), (-1, 0, 0))
+        self.assertEqual(model.dimensions(), (1, 3, 1))
+        model.remove((-1, 2, 0), "D")
+        model.remove((0, 0, 0), "A")
+        self.assertEqual(model, {(0, 0, 0): ["B", "C"]})
+        self.assertEqual(model.dimensions(), (1, 1, 1))
+
+    def test_used_coordinates(self):
+        """Tests the occupied coordinates of the axes and the box after removing a
+        cell on its border.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (2, 0, 0): "B", (2, 1, 0): "C"})
+        self.assertEqual(sorted(model.used_coordinates(0)), [0, 2])
+        self.assertEqual(sorted(model.shifted((1, 0, 0)).used_coordinates(0)), [1, 3])
+        del model[(2, 1, 0)]
+        self.assertEqual(sorted(model.used_coordinates(1)), [0])
+        self.assertEqual(model.maxs(), (2, 0, 0))
+        del model[(0, 0, 0)]
+        self.assertEqual(model.mins(), (2, 0, 0))
+
+    def test_copy(self):
+        """Tests that copies of a model are independent from each other.
+        """
+        model = SpatialModel({(0, 0, 0): "A"})
+        copy_model = model.copy()
+        copy_model.add((1, 0, 0), "B")
+        self.assertEqual(model, {(0, 0, 0): "A"})
+        self.assertEqual(model.find("B"), None)
+        model.add((0, 0, 0), "C")
+        self.assertEqual(copy_model, {(0, 0, 0): "A", (1, 0, 0): "B"})
+        self.assertEqual(copy_model.shifted((1, 0, 0)), {(1, 0, 0): "A", (2, 0, 0): "B"})
+
+    def test_item_index(self):
+        """Tests that the item index follows the items when the model changes.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): "B"})
+        model.replace((1, 0, 0), "B", "C")
+        self.assertEqual(model.find("B"), None)
+        self.assertEqual(model.find("C"), (1, 0, 0))
+        model.update(SpatialModel({(1, 0, 0): "D", (2, 0, 0): "C"}))
+        self.assertEqual(model.find("D"), (1, 0, 0))
+        self.assertEqual(model.find("C"), (2, 0, 0))
+        model.remove((0, 0, 0), "A")
+        self.assertEqual(model.find("A"), None)
+        self.assertEqual(model.shifted((0, 1, 0)).find("C"), (2, 1, 0))
+
+    def test_next_free(self):
+        """Tests the search of free cells with the line index.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): "B", (2, 0, 0): "C", (4, 0, 0): "D",
+                              (-1, 0, 0): "E", (0, 1, 0): "F"})
+        self.assertEqual(model.next_free((0, 0, 0), (1, 0, 0)), (3, 0, 0))
+        self.assertEqual(model.next_free((1, 0, 0), (-1, 0, 0)), (-2, 0, 0))
+        self.assertEqual(model.next_free((0, 0, 0), (0, 1, 0)), (0, 2, 0))
+        self.assertEqual(model.next_free((0, 0, 0), (1, 1, 0)), (1, 1, 0))
+        self.assertEqual(model.next_free((3, 0, 0), (1, 0, 0)), (3, 0, 0))
+        copy_model = model.copy()
+        copy_model.add((3, 0, 0), "G")
+        model.remove((1, 0, 0), "B")
+        self.assertEqual(copy_model.next_free((0, 0, 0), (1, 0, 0)), (5, 0, 0))
+        self.assertEqual(model.next_free((0, 0, 0), (1, 0, 0)), (1, 0, 0))
+        self.assertEqual(model.next_free((2, 0, 0), (-1, 0, 0)), (1, 0, 0))
+
+    def test_offset(self):
+        """Tests that a shifted model works with the shifted coordinates and that
+        the original model isn't changed.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): "B"})
+        shifted = model.shifted((1, 2, 0))
+        self.assertEqual(shifted, {(1, 2, 0): "A", (2, 2, 0): "B"})
+        self.assertEqual(shifted.mins(), (1, 2, 0))
+        self.assertEqual(shifted.next_free((1, 2, 0), (1, 0, 0)), (3, 2, 0))
+        shifted.add((3, 2, 0), "C")
+        self.assertTrue((3, 2, 0) in shifted)
+        self.assertEqual(model, {(0, 0, 0): "A", (1, 0, 0): "B"})
+        self.assertEqual(shifted.shifted((-1, -2, 0)),
+                         {(0, 0, 0): "A", (1, 0, 0): "B", (2, 0, 0): "C"})
+        model.update(SpatialModel({(0, 0, 0): "D", (1, 0, 0): "E"}).shifted((1, 0, 0)),
+                     overwrite=False)
+        self.assertEqual(model, {(0, 0, 0): "A", (1, 0, 0): "B", (2, 0, 0): "E"})
+        self.assertEqual(model.find("E"), (2, 0, 0))
+
+    def test_canonical_key(self):
+        """Tests that translated and shrunk models have the same canonical key.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (2, 0, 0): "B", (2, 1, 0): "C"})
+        self.assertEqual(model.canonical_key(),
+                         model.shifted((-3, 2, 1)).canonical_key())
+        self.assertEqual(model.canonical_key(), SpatialModel(
+            {(0, 0, 0): "A", (1, 0, 0): "B", (1, 1, 0): "C"}).canonical_key())
+        self.assertNotEqual(model.canonical_key(), SpatialModel(
+            {(0, 0, 0): "B", (1, 0, 0): "A", (1, 1, 0): "C"}).canonical_key())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,9 @@ Created on 16.07.2018
 
 @author: Christian Breu <breuch@web.de>, Julia Mertesdorf<julia.mertesdorf@web.de>
 '''
-from copy import deepcopy
+import unittest
+
+import numpy as np
 
 from spatial_reasoner import low_level_functions_param as helper
 
@@ -11,8 +13,25 @@ from spatial_reasoner import low_level_functions_param as helper
 
 from spatial_reasoner import modify_model_param as modify
 
+from spatial_reasoner.interpret_result import InterpretResult
+
+from spatial_reasoner import problem_cache
+
+from spatial_reasoner.spatial_model import SpatialModel, intern_item
+
 PRINT_MODEL = False # zwischenloesung
 
+# minimum number of premises for checking the conflicts of all premises at once with
+# arrays(see PremiseBatch). For less premises, the loop over the premises is faster.
+BATCH_MIN_PREMISES = 32
+
+# cache for the arrays of the premise lists: premises -> PremiseBatch
+BATCH_CACHE = problem_cache.LRUCache(1000)
+
+# maximum number of switch calls in one search of make. If the budget is used up, the
+# search fails like a search that can't make all premises hold.
+MAX_SWITCH_CALLS = 1000
+
 #ANSWER = "NO ANSWER YET"
 
 
@@ -35,8 +54,8 @@ def verify_spatial(proposition, model):
     relation = proposition[1]
     subj = proposition[0]
     obj = proposition[2]
-    subj_coords = helper.find_first_item(subj, [model])[0]
-    obj_coords = helper.find_first_item(obj, [model])[0]
+    subj_coords = model.find(subj)
+    obj_coords = model.find(obj)
     if PRINT_MODEL:
         print("verify_spatial: subj_coords, obj_coords, relation",
               subj_coords, obj_coords, relation)
@@ -72,31 +91,27 @@ def conflict(premises, model):
     premise(prop) with verify_spatial.
     If it can't be verified, add the premise(prop) to the result list of
     conflicted props. Returns a list of conflicting premises.
+    Long premise lists are checked at once with a PremiseBatch.
     """
     if PRINT_MODEL:
         print("conflict: prems, model: ", premises, model)
     if not premises:
         return None
-    result_list = []
-    #print("conflict with premises: ", premises)
-    for prem in premises:
-        prop = prem
-        subj = prem[0]
-        obj = prem[2]
-        if PRINT_MODEL:
-            print("conflict: subj, obj", subj, obj)
-        #check if the premise can be parsed(should be always the case)
-        # and the subject  and object are in the model.
-        # call new_find_item with a list!!!
-        if(prop is None) or ((helper.find_first_item(subj, [model]))
-                             and (helper.find_first_item(obj, [model]))):
-            #if subj + obj are in the model, try to verify_temporal. if verify_temporal
-            # returns false, add the proposition to the conflicted props.
-            if not verify_spatial(prop, model):
-                if PRINT_MODEL:
+    if PRINT_MODEL:
+        result_list = []
+        for prop in premises:
+            print("conflict: subj, obj", prop[0], prop[2])
+            #check if the subject and object are in the model.
+            if (model.find(prop[0]) is not None) and (model.find(prop[2]) is not None):
+                #if subj + obj are in the model, try to verify_temporal. if verify_temporal
+                # returns false, add the proposition to the conflicted props.
+                if not verify_spatial(prop, model):
                     print("conflicted premise in prems: with model", prop, model)
-                result_list.append(prop)
-    return result_list
+                    result_list.append(prop)
+        return result_list
+    if len(premises) >= BATCH_MIN_PREMISES:
+        return premise_batch(premises).conflicts(model)
+    return _conflict_loop(premises, model, True)
 
 # ONLY USED IN SPATIAL
 def conflict_props(propositions, model):
@@ -109,14 +124,84 @@ def conflict_props(propositions, model):
         print("conflict_props with prop, model: ", propositions, model)
     if propositions is None:
         return None
-    conflict_list = []
-    for prop in propositions:
-        if not verify_spatial(prop, model):
-            conflict_list.append(prop)
-    return conflict_list
+    if PRINT_MODEL:
+        return [prop for prop in propositions if not verify_spatial(prop, model)]
+    if len(propositions) >= BATCH_MIN_PREMISES:
+        conflicts = premise_batch(propositions).conflicts(model, False)
+        if conflicts is not None:
+            return conflicts
+    return _conflict_loop(propositions, model, False)
+
+def _conflict_loop(props, model, skip_missing):
+    """
+    Returns the props that don't hold in the model, with the same checks as
+    verify_spatial. If skip_missing is True, props with items that are not in the
+    model are skipped.
+    """
+    conflicts = []
+    find = model.find
+    for prop in props:
+        subj_coords = find(prop[0])
+        obj_coords = find(prop[2])
+        if skip_missing and (subj_coords is None or obj_coords is None):
+            continue
+        for index, value in enumerate(prop[1]):
+            difference = subj_coords[index] - obj_coords[index]
+            if ((value > 0 and difference <= 0) or (value < 0 and difference >= 0)
+                    or (value == 0 and difference != 0)):
+                conflicts.append(prop)
+                break
+    return conflicts
+
+def premise_batch(premises):
+    """
+    Returns the PremiseBatch of the premises. The batches are cached, since make
+    checks the same premises with many models.
+    """
+    key = tuple([(prop[0], tuple(prop[1]), prop[2]) for prop in premises])
+    batch = BATCH_CACHE.get(key)
+    if batch is problem_cache.MISSING:
+        batch = PremiseBatch(premises)
+        BATCH_CACHE.put(key, batch)
+    return batch
+
+
+class PremiseBatch:
+    """
+    Premises as arrays: the interned ids of the subjects and objects and the signs
+    of the relations. All premises are checked at once: a premise holds in a model,
+    if sign(subject coordinates - object coordinates) is the sign of the relation
+    in every axis(like in verify_spatial).
+    """
+    def __init__(self, premises):
+        self.premises = list(premises)
+        self.subj_ids = np.array([intern_item(prop[0]) for prop in premises], dtype=np.intp)
+        self.obj_ids = np.array([intern_item(prop[2]) for prop in premises], dtype=np.intp)
+        self.signs = np.sign(np.array([prop[1] for prop in premises], dtype=np.int64))
+        self.size = int(max(self.subj_ids.max(), self.obj_ids.max())) + 1
+
+    def conflicts(self, model, skip_missing=True):
+        """
+        Returns the premises that don't hold in the model. If skip_missing is True,
+        premises with items that are not in the model are skipped, otherwise None is
+        returned if there is such a premise.
+        """
+        coords = np.zeros((self.size, 3), dtype=np.int64)
+        present = np.zeros(self.size, dtype=bool)
+        pairs = [(item_id, item_coords) for item_id, item_coords in model.item_coordinates()
+                 if item_id < self.size]
+        if pairs:
+            ids, item_coords = zip(*pairs)
+            coords[list(ids)] = item_coords
+            present[list(ids)] = True
+        found = present[self.subj_ids] & present[self.obj_ids]
+        holds = (np.sign(coords[self.subj_ids] - coords[self.obj_ids]) == self.signs).all(axis=1)
+        if not skip_missing and not found.all():
+            return None
+        return [self.premises[i] for i in np.flatnonzero(found & ~holds)]
 
 # ONLY USED IN SPATIAL
-def make(prop_list, fix_props, model, premises):
+def make(prop_list, fix_props, model, premises, stats=None):
     """
     Iterates over the given prop-list and tries to make the props true by
     calling switch. If the resulting model is not None, switch was able to
@@ -126,13 +211,44 @@ def make(prop_list, fix_props, model, premises):
     with this prop_list. After each iteration through the prop_list, set the
     prop_list to all the conflicting props in the current model.
     If there are no conflicts, return the model.
+    The search remembers the states(normalized and shrunk model, props and fix_props)
+    at the beginning of each round. If a state is repeated, the search would run in
+    a cycle, so None is returned. None is also returned if more than
+    MAX_SWITCH_CALLS switch calls are needed.
+    If a stats dictionary is given, the number of rounds, switch calls, repeated
+    states and exhausted budgets are counted in it.
     """
     if PRINT_MODEL:
         print("make with prop_list, fix_props, model, premises", prop_list,
               fix_props, model, premises)
+    if stats is None:
+        stats = {}
+    seen_states = set() # transposition table of the search
+    switch_calls = 0
+    rounds = 0
     while prop_list:
+        rounds += 1
+        # most searches end after the first round, so the states are only remembered
+        # from the second round on. A cycle is still found, when it is repeated.
+        if rounds > 1:
+            state = (model.canonical_key(), tuple([tuple(prop) for prop in prop_list]),
+                     frozenset([tuple(prop) for prop in fix_props]))
+            if state in seen_states:
+                if PRINT_MODEL:
+                    print("make: the state was already seen, stop the search")
+                stats["repeated_states"] = stats.get("repeated_states", 0) + 1
+                return None
+            seen_states.add(state)
+        stats["make_rounds"] = stats.get("make_rounds", 0) + 1
         #first, iterate over the prop list and call switch on the props
         for prop in prop_list:#for each proposition, call switch and change the model with this
+            if switch_calls >= MAX_SWITCH_CALLS:
+                if PRINT_MODEL:
+                    print("make: the budget of switch calls is used up")
+                stats["budget_exhausted"] = stats.get("budget_exhausted", 0) + 1
+                return None
+            switch_calls += 1
+            stats["switch_calls"] = stats.get("switch_calls", 0) + 1
             model = switch(prop, fix_props, model)
             # if switch could make the prop hold in the model, add it to the fix props
             if model is not None:
@@ -169,43 +285,44 @@ def make_false(proposition, model, premises):
     """
     Tries to make the model hold with a negated relation from the premise.
     If this is possible, the proposition is falsified. If not, the premise
-    is valid in the model. The original model is returned with a statement.
+    is valid in the model. Returns an InterpretResult with the original model
+    and the answer.
     """
     if PRINT_MODEL:
         print("make-false with prop: ", proposition)
     prems = remove_prem(proposition, premises)
-    prop = deepcopy(proposition)
-    prop[1] = helper.invert_relation(prop[1])#negate the proposition
+    # negate the proposition in a new premise list, the original one is not changed.
+    prop = [proposition[0], helper.invert_relation(proposition[1]), proposition[2]]
     #print("call make with the negated premise: ", prop)
-    new_mod = make([prop], [prop], model, deepcopy(prems))
+    # make doesn't change the premises, so they don't need to be copied.
+    stats = {}
+    new_mod = make([prop], [prop], model, prems, stats)
     if (new_mod is not None) and (verify_spatial(prop, new_mod)):
         #print("could be made incorrect")
         #print("model + premise that holds now: ", prop, new_mod)
-        model[(20, 20, 20)] = "F" #add The T(true) as the answer to the model
-        return model
+        return InterpretResult([model], False, stats)
     #print("valid")
-    model[(20, 20, 20)] = "T" #add The T(true) as the answer to the model
-    return model
+    return InterpretResult([model], True, stats)
 
 # ONLY USED IN SPATIAL
 def make_true(proposition, model, premises):
     """
     Tries to find a way to make the proposition hold in model.
     Modifies the model in different ways to see if the proposition and all
-    the other premises do hold then. If this suceeds, returns the new model.
+    the other premises do hold then. If this suceeds, returns an InterpretResult
+    with the new model and the answer True, otherwise with the original model.
     Calls make to modify the model.
     """
     if PRINT_MODEL:
         print("make true with premise, model: ", proposition, model)
     prems = remove_prem(proposition, premises)
-    new_mod = make([proposition], [proposition], model, deepcopy(prems))
+    stats = {}
+    new_mod = make([proposition], [proposition], model, prems, stats)
     if (new_mod is not None) and (verify_spatial(proposition, new_mod)):
         #print("could be made valid")
-        new_mod[(20, 20, 20)] = "T" #add The T(true) as the answer to the model
-        return new_mod
+        return InterpretResult([new_mod], True, stats)
     #print("incorrect")
-    model[(20, 20, 20)] = "F" #add The T(true) as the answer to the model
-    return model
+    return InterpretResult([model], False, stats)
 
 # ONLY USED IN SPATIAL
 def negate_prop(proposition):
@@ -241,9 +358,9 @@ def switch(new_prop, fix_props, model):
     # just use the string of the item
     subj = new_prop[0]
     obj = new_prop[2]
-    # call new_find_item with a list!!!
-    s_coord = helper.find_first_item(subj, [model])[0] # s_coord + o_coord are tuples
-    o_coord = helper.find_first_item(obj, [model])[0]# only get the coordinates
+    # the model finds the items with its item index.
+    s_coord = model.find(subj) # s_coord + o_coord are tuples
+    o_coord = model.find(obj) # only get the coordinates
     # check if the relation of subj and obj is converse to the relation of the proposition.
     if find_rel_prop(s_coord, o_coord) == helper.convert(relation):
         # only if first condition holds, try to swap the items.
@@ -322,3 +439,45 @@ def list_substract(list1, list2):
     for count, value in enumerate(list1):
         result_list.append(value - list2[count])
     return result_list
+
+# ---------------------------- UNIT TESTS ------------------------------------------------------
+
+class Tests(unittest.TestCase):
+    """Unittest class for the search for counterexamples.
+    """
+    def test_make_statistics(self):
+        """Tests the statistics of make and the budget of switch calls.
+        """
+        global MAX_SWITCH_CALLS
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): "B", (2, 0, 0): "C"})
+        premises = [["A", (-1, 0, 0), "B"], ["B", (-1, 0, 0), "C"]]
+        prop = ["A", (1, 0, 0), "C"]
+        result = make_false(["A", (-1, 0, 0), "C"], model, premises + [prop])
+        self.assertEqual(result.answer, True)
+        self.assertEqual(result.model, model)
+        stats = {}
+        self.assertIsNotNone(make([prop], [prop], model, [], stats))
+        self.assertEqual(stats, {"make_rounds": 1, "switch_calls": 1})
+        budget = MAX_SWITCH_CALLS
+        MAX_SWITCH_CALLS = 0
+        try:
+            stats = {}
+            self.assertIsNone(make([prop], [prop], model, [], stats))
+            self.assertEqual(stats["budget_exhausted"], 1)
+        finally:
+            MAX_SWITCH_CALLS = budget
+
+    def test_premise_batch(self):
+        """Tests that the arrays find the same conflicts as verify_spatial.
+        """
+        model = SpatialModel({(0, 0, 0): "A", (1, 0, 0): "B", (1, 1, 0): "C"})
+        relations = [(-1, 0, 0), (1, 0, 0), (0, 1, 0), (-1, -1, 0), (1, 1, 0), (0, 0, 0)]
+        premises = [[subj, relation, obj] for subj in "ABCD" for obj in "ABC"
+                    for relation in relations if subj != obj]
+        conflicts = [prop for prop in premises if model.find(prop[0]) is not None
+                     and not verify_spatial(prop, model)]
+        self.assertEqual(premise_batch(premises).conflicts(model), conflicts)
+        self.assertEqual(_conflict_loop(premises, model, True), conflicts)
+        self.assertEqual(conflict(premises, model), conflicts)
+        self.assertIsNone(premise_batch(premises).conflicts(model, False))
+
@@ -0,0 +1,48 @@
+'''Module for the visualization of spatial models. Uses matplotlib, so this module
+should only be imported when models are actually printed.
+Created on 16.07.2018
+
+@author: Christian Breu <breuch@web.de>, Julia Mertesdorf<julia.mertesdorf@web.de>
+'''
+
+import numpy as np
+
+import matplotlib.pyplot as plt
+from mpl_toolkits import mplot3d # registers the 3d projection
+
+
+# ONLY USED BY SPATIAL MODEL (AUFWEITEN AUF TEMPORAL?)
+def print_models(model_list):
+    """
+    Prints all models in a given model_list the way they should look.
+    Uses matplotlib scatterplot.
+    """
+    plt.ioff()
+    fig = plt.figure()
+    model_objects = {'[]':'s', 'V': '^', 'O': 'o', 'I': '|', '+': 'X',
+                     'L': '$L$', 'A': '$A$','B': '$B$','C': '$C$','D': '$D$',
+                     '^': '$V$', '*': '*', 'S': '$S$'}
+    # compute the square root from the number of elements and then adjust the
+    # size for the grid to fit the number of models.
+    rows_cols = int(np.sqrt(len(model_list))+0.5)+1
+    #print("rows_cols ", rows_cols)
+    # iterate through the models
+    for index, model in enumerate(model_list):
+        ax_ = fig.add_subplot(rows_cols, rows_cols, index+1, projection='3d')
+        ax_.set_xlabel('X-Axis')
+        ax_.set_ylabel('Y-Axis')
+        ax_.set_zlabel('Z-Axis')
+        for (x_co, y_co, z_co), value in model.items():
+            if isinstance(value, list):
+                #model_obj = ''
+                for item in value:
+                    ax_.scatter(x_co, y_co, z_co, s=50, marker=model_objects[item])
+                    ax_.annotate("test", (x_co, y_co))
+
+                # print("double item found in model:", model_obj)
+            else:
+                ax_.scatter(x_co, y_co, z_co, s=40, marker=model_objects[value])
+    # print an asnwer or sth. like that
+    #fig.text(.5, .05, answer, ha='center')
+    fig.text(.5, .05, "all created models in their creation order", ha='center')
+    plt.show()